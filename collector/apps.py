@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CollectorConfig(AppConfig):
+    name = 'collector'
+
+    def ready(self):
+        # Target save/delete → change feed voor de run_scheduler daemon
+        from collector.scheduler import feed  # noqa: F401
@@ -0,0 +1,49 @@
+"""
+Adaptieve intervallen herberekenen (zie collector/scheduler/adaptive.py)
+
+Draait ook als Celery task (adapt_intervals_task), dit command is voor
+handmatig draaien en om de beslissingen eerst te bekijken.
+
+Run:
+    python manage.py adapt_intervals --dry-run
+    python manage.py adapt_intervals --target 3
+"""
+
+from django.core.management.base import BaseCommand
+
+from collector.scheduler.adaptive import update_adaptive_intervals
+
+
+class Command(BaseCommand):
+    help = 'Herbereken het scan interval van adaptieve targets op basis van hun wijzigingen'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            type=int,
+            help='ID van target (default: alle actieve adaptieve targets)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Alleen tonen, niks opslaan'
+        )
+
+    def handle(self, *args, **options):
+        target_ids = [options['target']] if options['target'] else None
+        decisions = update_adaptive_intervals(target_ids, dry_run=options['dry_run'])
+
+        if not decisions:
+            self.stdout.write('Geen actieve targets met adaptive_interval')
+            return
+
+        for decision in decisions:
+            marker = '→' if decision['new'] != decision['old'] else '='
+            self.stdout.write(
+                f"   #{decision['target_id']}: {decision['old']} {marker} {decision['new']} min "
+                f"({decision['changes']} wijzigingen in {decision['window_minutes'] // 60} uur)"
+            )
+
+        changed = sum(decision['new'] != decision['old'] for decision in decisions)
+        suffix = ' (dry-run, niks opgeslagen)' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(f"✅ {changed}/{len(decisions)} intervallen aangepast{suffix}"))
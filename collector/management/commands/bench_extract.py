@@ -0,0 +1,123 @@
+"""
+Benchmark extractor backends op opgeslagen pagina's
+
+Vergelijkt het originele BeautifulSoup pad (decompose + get_text + find_all)
+met de extractor backends uit collector/scanner/extractors.py, en checkt
+dat text / images / hash identiek zijn.
+
+Run:
+    python manage.py bench_extract
+    python manage.py bench_extract pagina1.html pagina2.html --repeat 20
+"""
+
+import hashlib
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand, CommandError
+
+from collector.scanner.extractors import EXTRACTORS, get_extractor
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent.parent / 'scanner' / 'fixtures'
+
+
+def legacy_extract_content(html) -> dict:
+    """
+    Het originele extract_content algoritme (referentie).
+
+    Waarom bewaard: Nieuwe backends moeten hier exact mee overeenkomen,
+    anders krijgen alle bestaande targets een 'wijziging'.
+    """
+    soup = html if isinstance(html, BeautifulSoup) else BeautifulSoup(html, 'lxml')
+    for script in soup(['script', 'style', 'meta', 'noscript', 'head']):
+        script.decompose()
+
+    text = soup.get_text(separator=' ', strip=True)
+    text = ' '.join(text.split())
+
+    images = []
+    for img in soup.find_all('img', src=True):
+        images.append(img['src'])
+
+    content = f"{text}|{'|'.join(images)}"
+    content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
+
+    return {
+        'text': text,
+        'images': images,
+        'image_count': len(images),
+        'hash': content_hash
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark extract_content backends (BeautifulSoup vs streaming lxml)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            help='HTML bestanden of directories (default: collector/scanner/fixtures)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=10,
+            help='Aantal runs per pagina per backend'
+        )
+
+    def handle(self, *args, **options):
+        pages = self._collect_pages(options['paths'] or [FIXTURES_DIR])
+        if not pages:
+            raise CommandError('Geen HTML bestanden gevonden')
+
+        repeat = options['repeat']
+        backends = [('legacy', legacy_extract_content)] + [
+            (name, get_extractor(name).extract) for name in EXTRACTORS
+        ]
+
+        self.stdout.write(f"📊 Benchmark: {len(pages)} pagina's, {repeat} runs per backend\n")
+
+        totals = {name: 0.0 for name, _ in backends}
+        mismatches = 0
+
+        for path in pages:
+            html = path.read_bytes()
+            self.stdout.write(f"\n📄 {path.name} ({len(html) / 1024:.0f} KB)")
+
+            reference = legacy_extract_content(html)
+            for name, extract in backends:
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    output = extract(html)
+                elapsed = (time.perf_counter() - start) / repeat
+                totals[name] += elapsed
+
+                # Waarom alleen de legacy keys: Backends leveren ook secties (extra)
+                identical = {key: output[key] for key in reference} == reference
+                mismatches += not identical
+                marker = '✅' if identical else '❌ OUTPUT VERSCHILT'
+                self.stdout.write(f"   {name:<8} {elapsed * 1000:8.1f} ms  {marker}")
+
+        self.stdout.write('\n' + '=' * 50)
+        baseline = totals['legacy']
+        for name, total in totals.items():
+            speedup = baseline / total if total else 0
+            self.stdout.write(f"   {name:<8} {total * 1000:8.1f} ms totaal  ({speedup:.1f}x)")
+
+        if mismatches:
+            raise CommandError(f'{mismatches} backend output(s) wijken af van het originele pad')
+        self.stdout.write(self.style.SUCCESS('\n✅ Alle backends geven identieke text/images/hash'))
+
+    def _collect_pages(self, paths) -> list:
+        pages = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                pages.extend(sorted(path.glob('*.html')))
+            elif path.exists():
+                pages.append(path)
+            else:
+                raise CommandError(f'Bestand niet gevonden: {path}')
+        return pages
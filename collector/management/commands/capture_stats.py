@@ -0,0 +1,77 @@
+"""
+Capture tijden en requests, met en zonder request blocking (zie collector/scanner/blocking.py)
+
+Vergelijkt de laatste scans met Scan.capture_stats: gemiddelde capture tijd
+(Scan.stage_seconds), geladen bytes, geblokkeerde requests en hoe lang we
+op een stille pagina wachtten (readiness.py, 'max' = bovengrens geraakt). Zet
+CAPTURE_BLOCKING_ENABLED=False voor een tijdje om een 'zonder' groep te krijgen.
+
+Run:
+    python manage.py capture_stats
+    python manage.py capture_stats --limit 500 --reasons
+"""
+
+import statistics
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from shared.models import Scan
+
+
+class Command(BaseCommand):
+    help = 'Vergelijk capture tijd, geladen bytes en requests met en zonder request blocking'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=200,
+            help='Aantal recente scans (default 200)'
+        )
+        parser.add_argument(
+            '--reasons',
+            action='store_true',
+            help='Ook de meest geblokkeerde domeinen/types tonen'
+        )
+
+    def handle(self, *args, **options):
+        scans = Scan.objects.filter(capture_stats__isnull=False).order_by('-scanned_at').values_list(
+            'capture_stats', 'stage_seconds'
+        )[:options['limit']]
+
+        groups = {True: [], False: []}
+        reasons = Counter()
+        for stats, stages in scans:
+            groups[bool(stats.get('blocking'))].append((stats, (stages or {}).get('capture')))
+            reasons.update(stats.get('blocked_by_reason') or {})
+
+        if not any(groups.values()):
+            self.stdout.write('Nog geen captures met stats')
+            return
+
+        self.stdout.write(
+            f"{'blocking':<9} {'captures':>9} {'capture':>9} {'klaar':>7} {'max':>5} {'requests':>9} {'geblokt':>8} "
+            f"{'geladen MB':>11}"
+        )
+        for blocking in (True, False):
+            rows = groups[blocking]
+            if not rows:
+                continue
+            seconds = [capture for _, capture in rows if capture is not None]
+            capture = f"{statistics.mean(seconds):.1f}s" if seconds else '-'
+            ready = [stats['ready_seconds'] for stats, _ in rows if 'ready_seconds' in stats]
+            ready_avg = f"{statistics.mean(ready):.1f}s" if ready else '-'
+            timeouts = sum(1 for stats, _ in rows if stats.get('ready_timeout'))
+            requests = statistics.mean(stats.get('requests', 0) for stats, _ in rows)
+            blocked = statistics.mean(stats.get('requests_blocked', 0) for stats, _ in rows)
+            megabytes = statistics.mean(stats.get('bytes_loaded', 0) for stats, _ in rows) / 1_000_000
+            self.stdout.write(
+                f"{'aan' if blocking else 'uit':<9} {len(rows):>9} {capture:>9} {ready_avg:>7} {timeouts:>5} {requests:>9.0f} "
+                f"{blocked:>8.0f} {megabytes:>11.2f}"
+            )
+
+        if options['reasons'] and reasons:
+            self.stdout.write('\nMeest geblokkeerd:')
+            for reason, count in reasons.most_common(15):
+                self.stdout.write(f"   {count:>6}  {reason}")
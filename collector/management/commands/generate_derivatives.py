@@ -0,0 +1,45 @@
+"""
+Thumbnails/previews maken voor scans van vóór de derivatives (zie collector/scanner/derivatives.py)
+
+Nieuwe scans krijgen ze in de pipeline. Dit zet Scan.screenshot_digest
+voor oude scans, daarna toont het dashboard ook daar de srcset.
+Ontbrekende bestanden van scans mét digest maakt de view zelf.
+
+Run:
+    python manage.py generate_derivatives
+    python manage.py generate_derivatives --limit 100
+"""
+
+from django.core.management.base import BaseCommand
+
+from collector.scanner.derivatives import make_derivatives, screenshot_file
+from shared.models import Scan
+
+
+class Command(BaseCommand):
+    help = 'Maak thumbnails/previews voor scans zonder screenshot_digest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Maximaal aantal scans'
+        )
+
+    def handle(self, *args, **options):
+        scans = Scan.objects.filter(screenshot_digest='').exclude(screenshot_path='').order_by('-scanned_at')
+        if options['limit']:
+            scans = scans[:options['limit']]
+
+        done = missing = 0
+        for scan in scans.only('id', 'screenshot_path'):
+            source = screenshot_file(scan.screenshot_path)
+            if not source.exists():
+                missing += 1
+                continue
+            digest = make_derivatives(source)
+            Scan.objects.filter(id=scan.id).update(screenshot_digest=digest)
+            done += 1
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {done} scans bijgewerkt, {missing} zonder screenshot bestand"))
@@ -0,0 +1,42 @@
+"""
+Wachttijden van de politeness limiter per domein (zie collector/scanner/politeness.py)
+
+Met Redis: alle workers samen. Zonder Redis alleen dit process (dus leeg).
+
+Run:
+    python manage.py politeness_stats
+    python manage.py politeness_stats --reset
+"""
+
+from django.core.management.base import BaseCommand
+
+from collector.scanner.politeness import limits_for, reset_stats, wait_stats
+
+
+class Command(BaseCommand):
+    help = 'Toon per domein hoe vaak en hoe lang scout/capture op de politeness limiter wachtten (of overgeslagen werden)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Tellers daarna op nul zetten'
+        )
+
+    def handle(self, *args, **options):
+        stats = wait_stats()
+        if not stats:
+            self.stdout.write('Nog geen requests geteld')
+        else:
+            self.stdout.write(f"{'domein':<30} {'limiet':>12} {'requests':>9} {'gewacht':>8} {'gem.':>7} {'max':>7} {'overgeslagen':>13}")
+            for domain, row in sorted(stats.items(), key=lambda item: -item[1]['total_wait']):
+                rate, burst = limits_for(domain)
+                average = row['total_wait'] / row['waited'] if row['waited'] else 0
+                self.stdout.write(
+                    f"{domain:<30} {f'{rate:g}/s ({burst:g})':>12} {row['acquired']:>9} {row['waited']:>8} "
+                    f"{average:>6.1f}s {row['max_wait']:>6.1f}s {row['deferred']:>13}"
+                )
+
+        if options['reset']:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS('✅ Tellers gereset'))
@@ -0,0 +1,111 @@
+"""
+Dry-run van noise rules op opgeslagen scans
+
+Herberekent de hash van elke opgeslagen scan (Scan.page_text / page_images)
+met de noise rules, en telt hoeveel 'wijzigingen' de rules onderdrukt
+zouden hebben. Er wordt niks opgeslagen.
+
+Waarom ook Gemini's oordeel tonen: Een onderdrukte scan die Gemini
+'critical' vond is een echte wijziging die de rules zouden verbergen.
+
+Let op: drop_selectors werken op de HTML, die bewaren we niet.
+De opgeslagen tekst is al gefilterd met de selectors van toen.
+
+Run:
+    python manage.py replay_noise_rules
+    python manage.py replay_noise_rules --target 3 --rules '{"text_patterns": ["\\d+ mensen bekijken dit"]}'
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from collector.scanner.extractors import content_hash
+from collector.scanner.noise import build_noise_rules
+from shared.models import Target
+
+
+class Command(BaseCommand):
+    help = 'Dry-run: hoeveel oude wijzigingen zouden de noise rules onderdrukt hebben?'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            type=int,
+            help='ID van target (default: alle targets)'
+        )
+        parser.add_argument(
+            '--rules',
+            help='Noise rules als JSON (default: de huidige Target.noise_rules)'
+        )
+
+    def handle(self, *args, **options):
+        override = None
+        if options['rules']:
+            try:
+                override = json.loads(options['rules'])
+            except json.JSONDecodeError as e:
+                raise CommandError(f'--rules is geen geldige JSON: {e}')
+
+        targets = Target.objects.all()
+        if options['target']:
+            targets = targets.filter(id=options['target'])
+            if not targets.exists():
+                raise CommandError(f"Target {options['target']} niet gevonden")
+
+        totals = {'changes': 0, 'suppressed': 0, 'critical': 0}
+        for target in targets.order_by('id'):
+            raw_rules = override if override is not None else target.noise_rules
+            try:
+                rules = build_noise_rules(raw_rules)
+            except ValueError as e:
+                raise CommandError(f'{target.name}: {e}')
+
+            report = self.replay(target, rules)
+            if report is None:
+                continue
+            for key in totals:
+                totals[key] += report[key]
+
+        self.stdout.write('\n' + '=' * 50)
+        self.stdout.write(
+            f"   {totals['suppressed']}/{totals['changes']} wijzigingen onderdrukt"
+            f" ({totals['critical']} daarvan 'critical' volgens Gemini)"
+        )
+        if totals['critical']:
+            self.stdout.write(self.style.WARNING('⚠️  Rules verbergen echte wijzigingen, check de patterns'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ Geen critical scans onderdrukt'))
+
+    def replay(self, target, rules) -> dict:
+        """
+        Speel de scan historie van één target opnieuw af.
+
+        Waarom t.o.v. de laatste NIET onderdrukte scan: Zo werkt scout ook,
+        een onderdrukte scan verandert last_hash niet.
+        """
+        scans = list(target.scans.filter(page_text__isnull=False).exclude(status='pending').order_by('scanned_at', 'id'))
+        if len(scans) < 2:
+            return None
+
+        report = {'changes': len(scans) - 1, 'suppressed': 0, 'critical': 0}
+        self.stdout.write(f"\n🎯 {target.name}: {len(scans)} scans met opgeslagen tekst")
+        if rules and rules.selectors:
+            self.stdout.write('   ℹ️  drop_selectors worden niet opnieuw toegepast (alleen tekst bewaard)')
+
+        baseline = content_hash(scans[0].page_text, scans[0].page_images or [], rules)
+        for scan in scans[1:]:
+            scan_hash = content_hash(scan.page_text, scan.page_images or [], rules)
+            if scan_hash != baseline:
+                baseline = scan_hash
+                continue
+
+            report['suppressed'] += 1
+            analysis_type = scan.analysis_type or 'geen analyse'
+            if analysis_type == 'critical':
+                report['critical'] += 1
+            marker = '⚠️ ' if analysis_type == 'critical' else '✓'
+            self.stdout.write(f"   {marker} Scan #{scan.id} ({scan.scanned_at:%d %b %H:%M}) onderdrukt [{analysis_type}]")
+
+        self.stdout.write(f"   {report['suppressed']}/{report['changes']} wijzigingen onderdrukt")
+        return report
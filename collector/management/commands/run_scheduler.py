@@ -0,0 +1,47 @@
+"""
+Scheduler daemon: scout targets precies op hun next_scan_at
+
+Vervangt de beat tick van check_and_scan_targets (elke 60 sec) door een
+timer heap die tot de vroegste deadline slaapt. Wijzigingen aan targets
+komen binnen via de Redis change feed (collector/scheduler/feed.py).
+
+Run:
+    python manage.py run_scheduler
+    python manage.py run_scheduler --no-feed    # zonder Redis, alleen resync
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from collector.scheduler.daemon import Scheduler
+from collector.scheduler.feed import get_redis
+from collector.tasks import enqueue_scout_batches
+
+
+class Command(BaseCommand):
+    help = 'Scheduler daemon: dispatch targets op hun next_scan_at (timer heap + change feed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-feed',
+            action='store_true',
+            help='Geen Redis change feed, alleen periodiek resyncen uit de DB'
+        )
+
+    def handle(self, *args, **options):
+        feed = None
+        if not options['no_feed']:
+            # Waarom eerst subscriben, dan laden: Een wijziging tussen load en
+            # subscribe zou anders tot de volgende resync gemist worden
+            feed = get_redis().pubsub()
+            feed.subscribe(settings.SCHEDULER_CHANNEL)
+            self.stdout.write(f"📡 Listening on {settings.SCHEDULER_CHANNEL}")
+
+        scheduler = Scheduler(enqueue_scout_batches, feed=feed)
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('\n👋 Scheduler stopped')
+        finally:
+            if feed is not None:
+                feed.close()
@@ -0,0 +1,124 @@
+"""
+Simulatie: queue depth van de scheduler, vóór en na spreiding
+
+Simuleert N targets die samen aangemaakt zijn (zelfde interval) en toont
+per minuut hoe vol de scout queue staat:
+
+- before: beat tick elke 60 sec, next = last_scan_at + interval, geen budget
+- after: fase per target (collector/scheduler/phase.py), daemon dispatch
+  per seconde, max SCAN_MAX_IN_FLIGHT targets tegelijk onderweg
+
+Niks uit de database, niks naar de broker.
+
+Run:
+    python manage.py simulate_schedule
+    python manage.py simulate_schedule --targets 2000 --interval 15 --workers 20 --max-in-flight 50
+"""
+
+import heapq
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from collector.scheduler.phase import next_slot
+
+
+def simulate(targets: int, interval: int, minutes: int, scan_seconds: int, workers: int,
+             spread: bool, max_in_flight: int = 0, tick: int = 60) -> list:
+    """
+    Simuleer de scheduler (stappen van 1 sec).
+
+    Args:
+        spread: True = fase + budget (nieuw), False = oude gedrag
+        max_in_flight: Max targets onderweg (0 = geen limiet)
+        tick: Om de hoeveel seconden de scheduler kijkt wat DUE is
+
+    Returns:
+        Per minuut: {'queued': max wachtende scans, 'running': max bezette workers}
+    """
+    interval_seconds = interval * 60
+    due = [(0, target_id) for target_id in range(1, targets + 1)]  # allemaal nu aangemaakt
+    heapq.heapify(due)
+    queue = []      # gedispatcht, wacht op een worker (FIFO)
+    running = []    # heap van (klaar_om, target_id)
+    in_flight = 0
+    minutes_stats = []
+
+    for now in range(minutes * 60):
+        # Klaar: volgende scan plannen
+        while running and running[0][0] <= now:
+            _, target_id = heapq.heappop(running)
+            in_flight -= 1
+            if spread:
+                heapq.heappush(due, (next_slot(now, target_id, interval_seconds), target_id))
+            else:
+                heapq.heappush(due, (now + interval_seconds, target_id))
+
+        # Scheduler: DUE targets naar de queue (binnen het budget)
+        if now % tick == 0:
+            while due and due[0][0] <= now:
+                if max_in_flight and in_flight >= max_in_flight:
+                    break
+                _, target_id = heapq.heappop(due)
+                queue.append(target_id)
+                in_flight += 1
+
+        # Workers pakken werk uit de queue
+        while queue and len(running) < workers:
+            heapq.heappush(running, (now + scan_seconds, queue.pop(0)))
+
+        if now % 60 == 0:
+            minutes_stats.append({'queued': 0, 'running': 0})
+        stats = minutes_stats[-1]
+        stats['queued'] = max(stats['queued'], len(queue))
+        stats['running'] = max(stats['running'], len(running))
+
+    return minutes_stats
+
+
+class Command(BaseCommand):
+    help = 'Simuleer de scout queue depth voor N targets, vóór en na spreiding + budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--targets', type=int, default=1000, help='Aantal targets (default: 1000)')
+        parser.add_argument('--interval', type=int, default=15, help='Interval in minuten (default: 15)')
+        parser.add_argument('--minutes', type=int, default=60, help='Gesimuleerde tijd (default: 60)')
+        parser.add_argument('--scan-seconds', type=int, default=5, help='Duur van één scan (default: 5)')
+        parser.add_argument('--workers', type=int, default=20, help='Gelijktijdige scans (default: 20)')
+        parser.add_argument(
+            '--max-in-flight',
+            type=int,
+            default=settings.SCAN_MAX_IN_FLIGHT,
+            help='Budget na spreiding (default: SCAN_MAX_IN_FLIGHT)'
+        )
+
+    def handle(self, *args, **options):
+        common = {
+            'targets': options['targets'],
+            'interval': options['interval'],
+            'minutes': options['minutes'],
+            'scan_seconds': options['scan_seconds'],
+            'workers': options['workers'],
+        }
+        before = simulate(spread=False, **common)
+        after = simulate(spread=True, max_in_flight=options['max_in_flight'], tick=1, **common)
+
+        peak = max(max(row['queued'] for row in before), 1)
+        width = 30
+        self.stdout.write(
+            f"\n📊 {options['targets']} targets, interval {options['interval']} min, "
+            f"{options['workers']} workers, {options['scan_seconds']}s per scan\n"
+        )
+        self.stdout.write(f"{'min':>4}  {'before (queued)':<{width + 7}}  after (queued)")
+        for minute, (old, new) in enumerate(zip(before, after)):
+            old_bar = '█' * round(old['queued'] / peak * width)
+            new_bar = '█' * round(new['queued'] / peak * width)
+            self.stdout.write(f"{minute:>4}  {old_bar:<{width}} {old['queued']:>6}  {new_bar:<{width}} {new['queued']:>6}")
+
+        self.stdout.write('')
+        for name, rows in (('before', before), ('after', after)):
+            busy = sum(row['running'] for row in rows) / len(rows)
+            self.stdout.write(
+                f"{name:>6}: max queue {max(row['queued'] for row in rows)}, "
+                f"gem. bezette workers {busy:.1f}/{options['workers']}"
+            )
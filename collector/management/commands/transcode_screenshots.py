@@ -0,0 +1,125 @@
+"""
+Bestaande PNG screenshots omzetten naar het ingestelde formaat (zie collector/scanner/encoding.py)
+
+Encodeert alle PNG's in storage/screenshots parallel (process pool, encoden
+is CPU werk) en zet Scan.screenshot_path van de bijbehorende scans om.
+De PNG wordt pas weggegooid als het nieuwe bestand er staat.
+
+Pagina's hoger dan CAPTURE_SCREENSHOT_MAX_HEIGHT worden altijd in delen
+opgeslagen (ook als CAPTURE_SCREENSHOT_OVERFLOW 'truncate' is), de delen
+komen in capture_stats['screenshot_parts'] van de scan, net als bij capture.
+Waarom: Het archief is er maar één keer, afkappen gooit de rest voorgoed weg.
+
+Run:
+    python manage.py transcode_screenshots --dry-run
+    python manage.py transcode_screenshots --format webp --quality 80 --workers 4
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from collector.scanner.encoding import FORMATS, encode_screenshot
+from shared.models import Scan
+
+
+class Command(BaseCommand):
+    help = 'Zet bestaande PNG screenshots om naar WebP/AVIF/JPEG en werk Scan.screenshot_path bij'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=list(FORMATS),
+            default=None,
+            help='Doelformaat (default CAPTURE_SCREENSHOT_FORMAT)'
+        )
+        parser.add_argument(
+            '--quality',
+            type=int,
+            default=None,
+            help='Kwaliteit voor webp/avif/jpeg (default CAPTURE_SCREENSHOT_QUALITY)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Aantal processen (default: aantal CPU\'s)'
+        )
+        parser.add_argument(
+            '--dir',
+            default=str(Path(settings.MEDIA_ROOT) / 'screenshots'),
+            help='Screenshot map (default storage/screenshots)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Alleen tellen, niks omzetten'
+        )
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or settings.CAPTURE_SCREENSHOT_FORMAT
+        if fmt == 'png':
+            raise CommandError('Doelformaat is png, er valt niks om te zetten')
+
+        directory = Path(options['dir'])
+        sources = sorted(directory.glob('*.png'))
+        total = sum(source.stat().st_size for source in sources)
+        self.stdout.write(f"📂 {len(sources)} PNG's in {directory} ({total / 1_000_000:.1f} MB) → {fmt}")
+        if not sources or options['dry_run']:
+            return
+
+        # Waarom settings als argumenten: De workers lezen zelf geen settings
+        encode_args = {
+            'fmt': fmt,
+            'quality': options['quality'] or settings.CAPTURE_SCREENSHOT_QUALITY,
+            'max_height': settings.CAPTURE_SCREENSHOT_MAX_HEIGHT,
+            'overflow': 'tile',
+            'remove_source': False,
+        }
+        started = time.monotonic()
+        converted = failed = updated = 0
+        before = after = 0
+        with ProcessPoolExecutor(max_workers=max(options['workers'], 1)) as pool:
+            futures = {pool.submit(encode_screenshot, str(source), **encode_args): source for source in sources}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    encoded = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f"   ⚠️ {source.name}: {e}"))
+                    continue
+
+                # Waarom PNG pas na de update weg: Een afgebroken run laat geen
+                # scans naar een weggegooide PNG wijzen
+                converted += 1
+                before += encoded['source_bytes']
+                after += encoded['bytes']
+                updated += self._update_scans(source, encoded)
+                if encoded['truncated']:
+                    self.stdout.write(self.style.WARNING(f"   ⚠️ {source.name}: afgekapt, PNG bewaard"))
+                    continue
+                source.unlink()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {converted} omgezet, {failed} mislukt, {updated} scans bijgewerkt in "
+            f"{time.monotonic() - started:.1f}s"
+        ))
+        if converted:
+            self.stdout.write(f"   {before / 1_000_000:.1f} MB → {after / 1_000_000:.1f} MB")
+
+    def _update_scans(self, source: Path, encoded: dict) -> int:
+        """Nieuw pad (en de overige delen) op de scans van deze PNG zetten"""
+        parts = [f"screenshots/{Path(part).name}" for part in encoded['parts'][1:]]
+        updated = 0
+        for scan in Scan.objects.filter(screenshot_path=f'screenshots/{source.name}'):
+            scan.screenshot_path = f"screenshots/{Path(encoded['path']).name}"
+            if parts:
+                scan.capture_stats = {**(scan.capture_stats or {}), 'screenshot_parts': parts}
+            scan.save(update_fields=['screenshot_path', 'capture_stats'])
+            updated += 1
+        return updated
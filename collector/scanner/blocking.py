@@ -0,0 +1,132 @@
+"""
+Request filtering - Trackers, ads, video en fonts niet laden bij capture
+
+Concurrentpagina's laden tientallen third-party scripts: analytics beacons,
+ad netwerken, chat widgets, autoplay video. Dat kost laadtijd en bandbreedte,
+en 'networkidle' wordt er bijna nooit door bereikt. Voor een screenshot
+voor Gemini zijn ze niet nodig.
+
+Hoe: Playwright route op de (verse) context van elke capture. Per request:
+- Resource type in CAPTURE_BLOCK_RESOURCE_TYPES (media, font, websocket, ...) → abort,
+  ook op het domein van de target zelf (self-hosted fonts, autoplay video)
+- Domein (of subdomein) in CAPTURE_BLOCK_DOMAINS → abort, behalve het
+  domein van de target zelf
+- Anders gewoon door
+
+Nooit geblokkeerd: alles in de allowlist van de target
+(Target.capture_allowlist: domeinen of resource types), voor sites die
+zonder een bepaalde font/CDN niet goed renderen.
+
+Per capture tellen we requests (geladen/geblokkeerd, per reden) en de
+geladen bytes (Content-Length), zie Scan.capture_stats en
+python manage.py capture_stats.
+"""
+
+from collections import Counter
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+from collector.scanner.breaker import domain_of
+
+# Trackers, ad netwerken, chat widgets en video embeds
+# Let op: consent platforms (OneTrust, Cookiebot) staan hier bewust NIET in,
+# de cookie banner moet kunnen laden (zie consent.py)
+DEFAULT_BLOCK_DOMAINS = (
+    # Analytics / tag managers
+    'google-analytics.com', 'googletagmanager.com', 'analytics.google.com',
+    'hotjar.com', 'clarity.ms', 'segment.io', 'segment.com', 'mixpanel.com',
+    'amplitude.com', 'fullstory.com', 'mouseflow.com', 'newrelic.com', 'nr-data.net',
+    'adobedtm.com', 'omtrdc.net', 'demdex.net', 'bat.bing.com',
+    # Ad netwerken / pixels
+    'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'adservice.google.com',
+    'connect.facebook.net', 'facebook.com/tr', 'criteo.com', 'criteo.net', 'taboola.com',
+    'outbrain.com', 'adnxs.com', 'rubiconproject.com', 'pubmatic.com', 'snap.licdn.com',
+    'px.ads.linkedin.com', 'analytics.tiktok.com', 'ads-twitter.com',
+    # Chat widgets
+    'intercom.io', 'intercomcdn.com', 'zopim.com', 'zdassets.com', 'livechatinc.com',
+    'tawk.to', 'drift.com', 'crisp.chat',
+    # Video
+    'youtube.com', 'youtube-nocookie.com', 'ytimg.com', 'vimeo.com', 'vimeocdn.com',
+)
+
+
+def _matches(host: str, domain: str) -> bool:
+    """host is domain of een subdomein daarvan"""
+    return host == domain or host.endswith('.' + domain)
+
+
+class RequestFilter:
+    """
+    Route handler voor één capture (telt ook wat er gebeurt).
+
+    Args:
+        target_url: Domein van de target valt niet onder de domein blocklist
+        allow: Target.capture_allowlist (domeinen en/of resource types)
+    """
+
+    def __init__(self, target_url: str, allow: list = None):
+        self.enabled = settings.CAPTURE_BLOCKING_ENABLED
+        self.own_domain = domain_of(target_url)
+        self.allow = set(allow or [])
+        self.block_types = set(settings.CAPTURE_BLOCK_RESOURCE_TYPES) - self.allow
+        self.block_domains = [
+            domain for domain in (*DEFAULT_BLOCK_DOMAINS, *settings.CAPTURE_BLOCK_DOMAINS)
+            if domain not in self.allow
+        ]
+        self.requests = 0
+        self.blocked = Counter()
+        self.bytes_loaded = 0
+
+    def block_reason(self, url: str, resource_type: str) -> str:
+        """
+        Returns:
+            Reden ('type:font', 'domain:hotjar.com') of None (laden)
+        """
+        if not self.enabled:
+            return None
+        parsed = urlparse(url)
+        host = (parsed.hostname or '').lower()
+        if not host or any(_matches(host, domain) for domain in self.allow):
+            return None
+        if resource_type in self.block_types:
+            return f'type:{resource_type}'
+        # Waarom hier pas: Eigen fonts en video blokkeren we wel, de rest van het eigen domein niet
+        if _matches(host, self.own_domain):
+            return None
+        for domain in self.block_domains:
+            # 'facebook.com/tr': domein + pad prefix
+            domain_part, _, path = domain.partition('/')
+            if _matches(host, domain_part) and parsed.path.lstrip('/').startswith(path):
+                return f'domain:{domain}'
+        return None
+
+    async def handle(self, route):
+        """Playwright route handler (context.route('**/*', ...))"""
+        request = route.request
+        self.requests += 1
+        reason = self.block_reason(request.url, request.resource_type)
+        if reason:
+            self.blocked[reason] += 1
+            await route.abort('blockedbyclient')
+        else:
+            await route.continue_()
+
+    def on_response(self, response):
+        """page.on('response'): geladen bytes (Content-Length, zonder header telt 0)"""
+        try:
+            self.bytes_loaded += int(response.headers.get('content-length') or 0)
+        except ValueError:
+            pass
+
+    def stats(self) -> dict:
+        """Voor Scan.capture_stats"""
+        blocked = sum(self.blocked.values())
+        return {
+            'blocking': self.enabled,
+            'requests': self.requests,
+            'requests_loaded': self.requests - blocked,
+            'requests_blocked': blocked,
+            'blocked_by_reason': dict(self.blocked.most_common()),
+            'bytes_loaded': self.bytes_loaded,
+        }
@@ -0,0 +1,149 @@
+"""
+Circuit breaker per domein - Kapotte sites niet blijven scannen
+
+Zonder breaker kost een site die plat ligt (of ons blokkeert) elke
+interval opnieuw een scout request, een browser slot en 3 retries.
+
+States (shared.models.DomainHealth):
+- closed: Gewoon scannen. Elke mislukte scout/capture telt op.
+- open: Na BREAKER_FAILURE_THRESHOLD fouten op rij: overslaan tot retry_at.
+  Elke nieuwe opening wacht twee keer zo lang (BREAKER_BASE_SECONDS ..
+  BREAKER_MAX_SECONDS).
+- half_open: retry_at verstreken: precies één target van het domein mag
+  een proefscan doen. Slaagt die → closed, faalt die → weer open (langer).
+
+Waarom alleen scout en capture tellen: Dat zegt iets over de site.
+Een Gemini fout ligt aan ons, niet aan het domein.
+"""
+
+import logging
+from datetime import timedelta
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from shared.models import DomainHealth
+
+logger = logging.getLogger(__name__)
+
+
+def domain_of(url: str) -> str:
+    """Hostname zonder www. (www.example.nl en example.nl delen een breaker)"""
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def backoff_seconds(failures: int) -> int:
+    """Hoe lang de breaker open blijft na `failures` fouten op rij (exponentieel, begrensd)"""
+    extra = max(failures - settings.BREAKER_FAILURE_THRESHOLD, 0)
+    return min(settings.BREAKER_BASE_SECONDS * 2 ** min(extra, 20), settings.BREAKER_MAX_SECONDS)
+
+
+def _try_probe(domain: str, now) -> bool:
+    """
+    Open breaker met verstreken retry_at: proefscan claimen (compare-and-set).
+
+    Waarom retry_at = now + SCAN_LEASE_TTL: Crasht de proefscan zonder
+    success/failure te melden, dan mag er daarna een nieuwe.
+    """
+    return bool(DomainHealth.objects.filter(
+        Q(state='open') | Q(state='half_open'),
+        domain=domain,
+        retry_at__lte=now
+    ).update(state='half_open', retry_at=now + timedelta(seconds=settings.SCAN_LEASE_TTL)))
+
+
+def allow_scan(url: str, now=None) -> bool:
+    """Mag deze URL gescand worden? (claimt bij een open breaker de proefscan)"""
+    now = now or timezone.now()
+    domain = domain_of(url)
+    health = DomainHealth.objects.filter(domain=domain).exclude(state='closed').first()
+    if health is None:
+        return True
+    return _try_probe(domain, now)
+
+
+def filter_allowed(urls: list, now=None) -> tuple:
+    """
+    Batch variant van allow_scan (één query voor de gezonde domeinen).
+
+    Per open domein mag maximaal één URL door als proefscan.
+
+    Returns:
+        (allowed_urls, blocked_urls)
+    """
+    now = now or timezone.now()
+    unhealthy = set(DomainHealth.objects.filter(
+        domain__in={domain_of(url) for url in urls}
+    ).exclude(state='closed').values_list('domain', flat=True))
+
+    allowed, blocked = [], []
+    probed = set()
+    for url in urls:
+        domain = domain_of(url)
+        if domain not in unhealthy:
+            allowed.append(url)
+        elif domain not in probed and _try_probe(domain, now):
+            probed.add(domain)
+            allowed.append(url)
+        else:
+            blocked.append(url)
+    return allowed, blocked
+
+
+def record_success(urls):
+    """Scout/capture gelukt: breaker van deze domeinen dicht (alleen als er iets te resetten is)"""
+    if isinstance(urls, str):
+        urls = [urls]
+    DomainHealth.objects.filter(
+        domain__in={domain_of(url) for url in urls}
+    ).exclude(state='closed', consecutive_failures=0).update(
+        state='closed',
+        consecutive_failures=0,
+        retry_at=None
+    )
+
+
+def record_failure(url: str, error: str = None, now=None) -> DomainHealth:
+    """
+    Scout/capture mislukt: fout optellen, breaker openen bij de drempel.
+
+    Een mislukte proefscan (half_open) opent de breaker meteen weer.
+    """
+    now = now or timezone.now()
+    domain = domain_of(url)
+    with transaction.atomic():
+        health, _ = DomainHealth.objects.select_for_update().get_or_create(domain=domain)
+        health.consecutive_failures += 1
+        health.last_error = error
+        health.last_failure_at = now
+        if health.state == 'half_open' or health.consecutive_failures >= settings.BREAKER_FAILURE_THRESHOLD:
+            wait = backoff_seconds(health.consecutive_failures)
+            health.state = 'open'
+            health.retry_at = now + timedelta(seconds=wait)
+            logger.warning(
+                f"⛔ Circuit open voor {domain}: {health.consecutive_failures} fouten op rij, "
+                f"volgende proefscan over {wait // 60} min ({error})"
+            )
+        health.save()
+    return health
+
+
+def reset_breaker(domain: str):
+    """Handmatig weer vrijgeven (admin)"""
+    DomainHealth.objects.filter(domain=domain).update(
+        state='closed',
+        consecutive_failures=0,
+        retry_at=None
+    )
+
+
+def breaker_states(domains) -> dict:
+    """{domain: DomainHealth} van de domeinen waarvan de breaker niet dicht is (dashboard)"""
+    return {
+        health.domain: health
+        for health in DomainHealth.objects.filter(domain__in=set(domains)).exclude(state='closed')
+    }
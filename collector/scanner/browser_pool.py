@@ -0,0 +1,300 @@
+"""
+Browser Pool - Warme Chromium instances voor Capture Mode
+
+Waarom een pool:
+- Chromium launchen kost seconden en honderden MB per screenshot
+- Eén pool per worker process: browsers blijven warm tussen captures
+- Elke capture krijgt een verse, geïsoleerde context (geen cookies/cache lekken)
+
+Waarom een eigen thread + event loop:
+- Playwright objecten horen bij de event loop waarin ze gemaakt zijn
+- Captures komen uit sync code (Celery, threads) én uit async code
+- De pool loop blijft draaien, callers sturen hun werk erheen
+
+Recycling:
+- Na CAPTURE_BROWSER_MAX_PAGES captures wordt een browser herstart
+- Of zodra het RSS geheugen boven CAPTURE_BROWSER_MAX_RSS_MB komt
+"""
+
+import asyncio
+import atexit
+import threading
+from contextlib import asynccontextmanager
+
+import psutil
+from django.conf import settings
+from playwright.async_api import async_playwright
+
+
+# Context settings per capture
+# Waarom realistic: Sommige sites blokkeren headless defaults
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'locale': 'nl-NL',
+    'timezone_id': 'Europe/Amsterdam',
+    # Waarom: Requests van een service worker gaan langs context.route (blocking.py)
+    'service_workers': 'block',
+}
+
+
+def _child_pids() -> set:
+    """Alle child processen van dit process (Playwright driver + Chromium)."""
+    try:
+        return {p.pid for p in psutil.Process().children(recursive=True)}
+    except psutil.Error:
+        return set()
+
+
+class PooledBrowser:
+    """
+    Eén warme Chromium instance met gebruiksstatistieken.
+
+    Waarom pids bijhouden: Playwright geeft geen pid van de browser,
+    maar we willen het RSS geheugen per browser kunnen meten.
+    """
+
+    def __init__(self, browser, pids: set):
+        self.browser = browser
+        self.pids = pids
+        self.pages = 0
+
+    def rss_mb(self) -> float:
+        """Totaal RSS geheugen van deze browser (alle Chromium processen)."""
+        total = 0
+        for pid in self.pids:
+            try:
+                total += psutil.Process(pid).memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+
+class BrowserPool:
+    """
+    Worker-lifetime pool van N warme Chromium browsers.
+
+    Usage (async):
+        result = await pool.run(my_coroutine_function, url)
+        # my_coroutine_function(context, url) krijgt een verse BrowserContext
+
+    Usage (sync):
+        result = pool.run_sync(my_coroutine_function, url)
+    """
+
+    def __init__(self, size: int = None, max_pages: int = None, max_rss_mb: int = None):
+        self.size = size or settings.CAPTURE_BROWSER_POOL_SIZE
+        self.max_pages = max_pages or settings.CAPTURE_BROWSER_MAX_PAGES
+        self.max_rss_mb = max_rss_mb or settings.CAPTURE_BROWSER_MAX_RSS_MB
+
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._idle = None
+        self._browsers = []
+        self._launch_lock = None
+        self._start_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and self._playwright is not None
+
+    def start(self):
+        """
+        Start de pool thread en launch N browsers.
+
+        Waarom lazy: Na een Celery fork erft het child process geen threads,
+        dus de pool wordt pas gestart bij de eerste capture in dat process.
+        """
+        with self._start_lock:
+            if self.running:
+                return
+
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever,
+                name='browser-pool',
+                daemon=True
+            )
+            self._thread.start()
+
+            try:
+                asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+            except Exception:
+                # Half gestarte pool opruimen, volgende capture probeert opnieuw
+                self._stop_loop()
+                raise
+
+    async def _start(self):
+        print(f"   🌐 Starting browser pool ({self.size} browsers)...")
+        self._playwright = await async_playwright().start()
+        self._idle = asyncio.Queue()
+        self._launch_lock = asyncio.Lock()
+        try:
+            for _ in range(self.size):
+                self._idle.put_nowait(await self._launch())
+        except Exception:
+            # Playwright driver netjes stoppen voordat de loop sluit
+            await self._shutdown()
+            raise
+
+    def shutdown(self):
+        """
+        Sluit alle browsers en stop de pool thread.
+
+        Waarom: Bij Celery worker stop willen we geen zombie Chromium processen.
+        """
+        with self._start_lock:
+            if self._thread is None:
+                return
+            if self._thread.is_alive() and self._playwright is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=30)
+                except Exception as e:
+                    print(f"   ⚠️ Browser pool shutdown error: {str(e)[:80]}")
+            self._stop_loop()
+
+    async def _shutdown(self):
+        for pooled in list(self._browsers):
+            await self._close(pooled)
+        try:
+            await self._playwright.stop()
+        except Exception:
+            pass
+        self._playwright = None
+
+    def _stop_loop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._loop is not None and not self._loop.is_running():
+            self._loop.close()
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browsers = []
+
+    # ------------------------------------------------------------------
+    # Browsers
+    # ------------------------------------------------------------------
+
+    async def _launch(self) -> PooledBrowser:
+        # Waarom lock: Nieuwe pids toewijzen werkt alleen als launches na elkaar gebeuren
+        async with self._launch_lock:
+            before = _child_pids()
+            browser = await self._playwright.chromium.launch(headless=True)
+            pooled = PooledBrowser(browser, _child_pids() - before)
+        self._browsers.append(pooled)
+        return pooled
+
+    async def _close(self, pooled: PooledBrowser):
+        if pooled in self._browsers:
+            self._browsers.remove(pooled)
+        try:
+            await pooled.browser.close()
+        except Exception:
+            pass
+
+    async def _replace(self, pooled: PooledBrowser) -> PooledBrowser:
+        await self._close(pooled)
+        return await self._launch()
+
+    def should_recycle(self, pooled: PooledBrowser) -> bool:
+        """Moet deze browser herstart worden? (page count of geheugen)"""
+        if pooled.pages >= self.max_pages:
+            return True
+        return pooled.rss_mb() >= self.max_rss_mb
+
+    @asynccontextmanager
+    async def _context(self, storage_state: dict = None):
+        """
+        Leen een browser uit de pool en geef een verse context.
+
+        Waarom altijd een nieuwe context: Isolatie tussen captures
+        (cookies, localStorage, cache) zonder de browser te herstarten.
+        storage_state: Cookies + localStorage om mee te starten (cookie
+        consent van het domein, zie consent.py).
+        """
+        pooled = await self._idle.get()
+        try:
+            if not pooled.browser.is_connected():
+                # Browser gecrasht → vervangen
+                pooled = await self._replace(pooled)
+
+            context = await pooled.browser.new_context(**CONTEXT_OPTIONS, storage_state=storage_state)
+            try:
+                yield context
+            finally:
+                pooled.pages += 1
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+
+            if self.should_recycle(pooled):
+                print(f"   ♻️ Recycling browser after {pooled.pages} pages ({pooled.rss_mb():.0f} MB)")
+                pooled = await self._replace(pooled)
+        finally:
+            # Altijd terug in de pool, ook bij errors
+            # Een dode browser wordt bij de volgende capture vervangen
+            self._idle.put_nowait(pooled)
+
+    async def _run(self, func, *args, storage_state: dict = None, **kwargs):
+        async with self._context(storage_state) as context:
+            return await func(context, *args, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Voer func(context, *args, **kwargs) uit op de pool loop.
+
+        Werkt vanuit elke event loop: de coroutine draait in de pool thread
+        en het resultaat wordt teruggegeven aan de aanroepende loop.
+        storage_state (keyword) gaat naar de nieuwe context, niet naar func.
+        """
+        if not self.running:
+            await asyncio.to_thread(self.start)
+        future = asyncio.run_coroutine_threadsafe(self._run(func, *args, **kwargs), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def run_sync(self, func, *args, **kwargs):
+        """Sync variant van run() voor Celery tasks en management commands."""
+        if not self.running:
+            self.start()
+        future = asyncio.run_coroutine_threadsafe(self._run(func, *args, **kwargs), self._loop)
+        return future.result()
+
+
+# Eén pool per process
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Haal de process-brede browser pool op (maakt hem aan als nodig)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+        return _pool
+
+
+def shutdown_browser_pool():
+    """Sluit de process-brede browser pool (veilig om meerdere keren aan te roepen)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+# Waarom atexit: Ook buiten Celery (management commands) geen zombie browsers
+atexit.register(shutdown_browser_pool)
@@ -15,111 +15,93 @@ Trade-off:
 
 Update: Added robust error handling for navigation events during scrolling
         which can happen with sites like kpn.com that redirect after cookie consent.
+
+Update: Browsers komen uit een worker-lifetime pool (browser_pool.py).
+        Geen Chromium launch meer per screenshot, wel een verse context per capture.
+
+Update: Cookie consent per domein onthouden (consent.py). De context start
+        met de opgeslagen cookies, de banner wordt met één script gezocht.
+
+Update: Trackers, ads, video en fonts worden geblokkeerd (blocking.py),
+        het result bevat per capture de request stats.
+
+Update: Geen vaste sleeps meer: readiness.py wacht op netwerk, DOM en
+        images (begrensd), de wachttijd komt in de stats.
+
+Update: De PNG van Playwright wordt daarna WebP/AVIF/JPEG (encoding.py),
+        screenshot_path in het result is het geëncodeerde bestand.
 """
 
 import asyncio
 from pathlib import Path
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+from django.conf import settings
+from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+from collector.scanner.blocking import RequestFilter
+from collector.scanner.breaker import domain_of
+from collector.scanner.browser_pool import get_browser_pool
+from collector.scanner.encoding import encode_screenshot
+from collector.scanner.consent import MARKER, candidates_for, load_consent, probe_consent, save_consent
+from collector.scanner.politeness import PolitenessDeferred, acquire
+from collector.scanner.readiness import PageReadiness
 
 
-async def capture_screenshot(target_url: str, output_path: str, fast_mode: bool = True) -> dict:
+async def capture_screenshot(target_url: str, output_path: str, fast_mode: bool = True, allow: list = None) -> dict:
     """
-    Maak een full-page screenshot met direct Playwright.
+    Maak een full-page screenshot met een warme browser uit de pool.
     
     Args:
         target_url: URL om te screenshotten
-        output_path: Waar de screenshot opslaan (absoluut pad!)
+        output_path: Waar de PNG opslaan (absoluut pad!), het geëncodeerde
+            bestand komt ernaast (zelfde naam, andere extensie)
         fast_mode: If True, use faster loading strategy (default)
+        allow: Niet blokkeren (Target.capture_allowlist, zie blocking.py)
         
     Returns:
         {
             'success': bool,
-            'screenshot_path': str,
-            'error': str (optional)
+            'screenshot_path': str,   # Geëncodeerd bestand (eerste deel)
+            'screenshot_parts': [str],   # Overige delen (CAPTURE_SCREENSHOT_OVERFLOW='tile')
+            'stats': dict,   # Requests geladen/geblokkeerd, bytes (ook bij een error), readiness, encoding
+            'error': str (optional),
+            'deferred': bool   # Domein te druk (politeness.py): niet geprobeerd, geen failure
         }
     """
     result = {
         'success': False,
         'screenshot_path': None,
-        'error': None
+        'screenshot_parts': [],
+        'stats': None,
+        'error': None,
+        'deferred': False
     }
+    request_filter = RequestFilter(target_url, allow)
+    readiness = None
+    encoding = {}
     
-    browser = None
     try:
-        async with async_playwright() as p:
-            # Launch browser
-            print(f"   🌐 Launching browser...")
-            browser = await p.chromium.launch(headless=True)
-            
-            # Create context met realistic settings
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                locale='nl-NL',
-                timezone_id='Europe/Amsterdam',
-            )
-            
-            # Open page
-            page = await context.new_page()
-            
-            print(f"   🌐 Loading page: {target_url}")
-            # Navigate to URL - use domcontentloaded for speed (don't wait for tracking/ads)
-            wait_strategy = 'domcontentloaded' if fast_mode else 'networkidle'
-            try:
-                await page.goto(target_url, wait_until=wait_strategy, timeout=30000)
-            except PlaywrightTimeout:
-                # Retry with longer timeout and less strict wait
-                print(f"   ⏳ Timeout, retrying with load strategy...")
-                await page.goto(target_url, wait_until='load', timeout=45000)
-            print(f"   ✅ Page loaded: {page.url}")
-            
-            # Wait a moment for any initial redirects/JS to settle
-            await asyncio.sleep(1)
-            
-            # Cookie banner handling (with shorter timeout)
-            cookie_clicked = await handle_cookie_banner(page)
-            if cookie_clicked:
-                print(f"   🍪 Cookie banner accepted")
-                # Wait for any navigation/reload after cookie consent
-                await asyncio.sleep(2)
-                # Wait for page to stabilize after potential navigation
-                try:
-                    await page.wait_for_load_state('domcontentloaded', timeout=5000)
-                except:
-                    pass
-            else:
-                print(f"   🍪 No cookie banner found")
-            
-            # Fast scroll for lazy loading - wrapped in try/except for navigation safety
-            try:
-                if fast_mode:
-                    await scroll_page_fast(page)
-                else:
-                    await scroll_page(page)
-                print(f"   📜 Scrolled page")
-            except Exception as scroll_error:
-                print(f"   ⚠️ Scroll skipped (navigation detected): {str(scroll_error)[:50]}")
-                # Page may have navigated, wait and continue
-                await asyncio.sleep(1)
-            
-            # Wait for images to load
-            await asyncio.sleep(1.5)
-            
-            # Take screenshot with retry on failure
-            print(f"   📸 Taking screenshot...")
-            try:
-                await page.screenshot(path=output_path, full_page=True, timeout=30000)
-            except Exception as ss_error:
-                print(f"   ⚠️ Full page screenshot failed, trying viewport only...")
-                await page.screenshot(path=output_path, full_page=False, timeout=15000)
-            print(f"   ✅ Screenshot saved to: {output_path}")
-            
-            # Close browser
-            await browser.close()
-            
-            result['success'] = True
-            result['screenshot_path'] = output_path
+        # Waarom vóór de pool: Wachten op het domein (politeness.py) houdt
+        # geen browser bezet
+        await acquire(target_url)
+        
+        # Waarom pool: Geen Chromium launch per screenshot
+        # Elke capture krijgt wel een verse, geïsoleerde context
+        consent = load_consent(domain_of(target_url))
+        readiness = await get_browser_pool().run(
+            _capture_in_context, target_url, output_path, fast_mode, consent, request_filter,
+            storage_state=(consent or {}).get('storage_state')
+        )
+        
+        # Waarom in een thread: Encoden is CPU werk, de loop moet door kunnen
+        encoded, encoding = await asyncio.to_thread(_encode, output_path)
+        result['success'] = True
+        result['screenshot_path'] = encoded[0]
+        result['screenshot_parts'] = encoded[1:]
             
+    except PolitenessDeferred as e:
+        result['error'] = str(e)
+        result['deferred'] = True
+        print(f"   ⏳ {str(e)}")
     except PlaywrightTimeout as e:
         result['error'] = f'Timeout: {str(e)}'
         print(f"   ❌ Timeout: {str(e)}")
@@ -128,128 +110,142 @@ async def capture_screenshot(target_url: str, output_path: str, fast_mode: bool
         print(f"   ❌ Error: {str(e)}")
         import traceback
         traceback.print_exc()
-    finally:
-        # Ensure browser is closed
-        if browser:
-            try:
-                await browser.close()
-            except:
-                pass
     
+    result['stats'] = {**request_filter.stats(), **(readiness or {}), **encoding}
     return result
 
 
-async def handle_cookie_banner(page) -> bool:
-    """
-    Probeer cookie banner weg te klikken.
-    Returns True if a cookie button was clicked.
+def _encode(png_path: str) -> tuple:
     """
-    # Extended list of cookie consent selectors for Dutch and English sites
-    cookie_selectors = [
-        # Dutch
-        'button:has-text("Accepteren")',
-        'button:has-text("Alles accepteren")',
-        'button:has-text("Alle cookies accepteren")',
-        'button:has-text("Akkoord")',
-        'button:has-text("Ja, ik accepteer")',
-        # English
-        'button:has-text("Accept")',
-        'button:has-text("Accept all")',
-        'button:has-text("Accept All Cookies")',
-        'button:has-text("Agree")',
-        'button:has-text("Allow all")',
-        'button:has-text("OK")',
-        # Generic selectors
-        '[class*="cookie"] button:has-text("Accept")',
-        '[class*="cookie"] button:has-text("Accepteren")',
-        '[id*="cookie"] button',
-        '[class*="consent"] button',
-        '[data-testid*="cookie"] button',
-        '#onetrust-accept-btn-handler',
-        '.onetrust-accept-btn-handler',
-        '#accept-cookies',
-        '.accept-cookies',
-        '[aria-label*="cookie"] button',
-        '[aria-label*="Accept"]',
-    ]
+    PNG naar het ingestelde formaat (encoding.py).
     
-    for selector in cookie_selectors:
-        try:
-            button = await page.wait_for_selector(selector, timeout=1500)
-            if button and await button.is_visible():
-                await button.click()
-                return True
-        except:
-            continue
+    Waarom de PNG houden bij een fout: Een screenshot in het verkeerde
+    formaat is beter dan een mislukte capture.
     
-    return False
+    Returns:
+        ([paden], stats) - stats voor Scan.capture_stats
+    """
+    try:
+        encoded = encode_screenshot(png_path)
+    except Exception as e:
+        print(f"   ⚠️ Encoding failed, keeping PNG: {str(e)[:80]}")
+        return [png_path], {}
+    print(f"   🗜️ Encoded as {encoded['format']}: {encoded['source_bytes'] // 1024} KB → {encoded['bytes'] // 1024} KB"
+          + (" (truncated)" if encoded['truncated'] else ""))
+    return encoded['parts'], {
+        'screenshot_format': encoded['format'],
+        'screenshot_bytes': encoded['bytes'],
+        'png_bytes': encoded['source_bytes'],
+        'screenshot_height': encoded['height'],
+        'screenshot_truncated': encoded['truncated'],
+    }
 
 
-async def scroll_page(page):
+async def _capture_in_context(context, target_url: str, output_path: str, fast_mode: bool = True, consent: dict = None,
+                              request_filter: RequestFilter = None):
     """
-    Scroll langzaam naar beneden voor lazy loading.
-    Handles navigation events gracefully.
+    Laad de pagina in een (verse) browser context en sla de screenshot op.
+    
+    Draait op de browser pool loop. De context wordt door de pool gesloten.
+    consent: Opgeslagen consent van het domein (de context heeft de cookies al)
+    request_filter: Blokkeert trackers/ads/media en telt de requests
+    
+    Returns:
+        Readiness stats (zie PageReadiness.settle)
     """
+    if request_filter is not None:
+        # Waarom op de context: Geldt ook voor iframes en popups
+        await context.route('**/*', request_filter.handle)
+    
+    # Open page
+    page = await context.new_page()
+    if request_filter is not None:
+        page.on('response', request_filter.on_response)
+    readiness = PageReadiness(page)
+    await readiness.install()
+    
+    print(f"   🌐 Loading page: {target_url}")
+    # Navigate to URL - use domcontentloaded for speed (don't wait for tracking/ads)
+    wait_strategy = 'domcontentloaded' if fast_mode else 'networkidle'
     try:
-        page_height = await page.evaluate('document.body.scrollHeight')
-        viewport_height = 1080
-        current_position = 0
-        
-        while current_position < page_height:
-            current_position += viewport_height
-            try:
-                await page.evaluate(f'window.scrollTo(0, {current_position})')
-            except:
-                break  # Page navigated
-            await asyncio.sleep(0.5)
-        
-        # Scroll back to top
+        await page.goto(target_url, wait_until=wait_strategy, timeout=30000)
+    except PlaywrightTimeout:
+        # Retry with longer timeout and less strict wait
+        print(f"   ⏳ Timeout, retrying with load strategy...")
+        await page.goto(target_url, wait_until='load', timeout=45000)
+    print(f"   ✅ Page loaded: {page.url}")
+    
+    # Cookie banner handling
+    # Waarom geen vaste sleep meer: De probe pollt zelf tot de banner er is
+    candidate = await handle_cookie_banner(page, consent)
+    if candidate:
+        print(f"   🍪 Cookie banner accepted ({candidate[0]})")
+        # Wait for page to stabilize after potential navigation/reload
         try:
-            await page.evaluate('window.scrollTo(0, 0)')
+            await page.wait_for_load_state('load', timeout=5000)
         except:
             pass
-        await asyncio.sleep(0.5)
-    except Exception as e:
-        print(f"   ⚠️ Scroll error (continuing): {str(e)[:50]}")
+    else:
+        print(f"   🍪 No cookie banner found" + (" (consent already stored)" if consent else ""))
+    
+    # Consent onthouden: bij een klik de nieuwe cookies + kandidaat
+    # Waarom niet zonder banner: Misschien was hij alleen te traag, de
+    # volgende capture moet dan weer de volledige timeout krijgen
+    if candidate:
+        try:
+            save_consent(domain_of(target_url), candidate, await context.storage_state())
+        except Exception as consent_error:
+            print(f"   ⚠️ Consent not saved: {str(consent_error)[:50]}")
+    
+    # Lazy loading + wachten tot netwerk, DOM en images stil zijn (begrensd)
+    ready = await readiness.settle(max_steps=20 if fast_mode else 50)
+    if ready['ready_timeout']:
+        print(f"   ⏱️ Not settled after {ready['ready_seconds']}s (waiting on {', '.join(ready['ready_pending'])})")
+    else:
+        print(f"   ⏱️ Page ready after {ready['ready_seconds']}s ({ready['scroll_steps']} scroll steps)")
+    
+    # Take screenshot with retry on failure
+    print(f"   📸 Taking screenshot...")
+    try:
+        await page.screenshot(path=output_path, full_page=True, timeout=30000)
+    except Exception as ss_error:
+        print(f"   ⚠️ Full page screenshot failed, trying viewport only...")
+        await page.screenshot(path=output_path, full_page=False, timeout=15000)
+    print(f"   ✅ Screenshot saved to: {output_path}")
+    return ready
 
 
-async def scroll_page_fast(page):
+async def handle_cookie_banner(page, consent: dict = None):
     """
-    Snelle scroll voor lazy loading - geoptimaliseerd voor snelheid.
-    Handles navigation events gracefully.
+    Cookie banner wegklikken (zie consent.py).
+    
+    Eén script zoekt alle kandidaten tegelijk, de onthouden kandidaat van
+    het domein eerst. Hebben we opgeslagen cookies voor het domein, dan
+    alleen een korte check: de banner is dan meestal al weg.
+    
+    Returns:
+        De kandidaat die geklikt is ([css, tekst]), of None
     """
+    stored = bool((consent or {}).get('storage_state'))
+    timeout_ms = settings.CAPTURE_CONSENT_RECHECK_MS if stored else settings.CAPTURE_CONSENT_TIMEOUT_MS
+    candidate = await probe_consent(page, candidates_for(consent), timeout_ms)
+    if candidate is None:
+        return None
     try:
-        page_height = await page.evaluate('document.body.scrollHeight')
-        viewport_height = 1080
-        current_position = 0
-        max_scrolls = 20  # Prevent infinite scrolling
-        scroll_count = 0
-        
-        # Fast scroll - 0.15s per viewport instead of 0.5s
-        while current_position < page_height and scroll_count < max_scrolls:
-            current_position += viewport_height
-            scroll_count += 1
-            try:
-                await page.evaluate(f'window.scrollTo(0, {current_position})')
-            except:
-                break  # Page navigated or context destroyed
-            await asyncio.sleep(0.15)
-        
-        # Quick scroll back to top
-        try:
-            await page.evaluate('window.scrollTo(0, 0)')
-        except:
-            pass
-        await asyncio.sleep(0.2)
-    except Exception as e:
-        print(f"   ⚠️ Fast scroll error (continuing): {str(e)[:50]}")
+        await page.click(f'[{MARKER}]', timeout=2000)
+    except Exception:
+        return None
+    return candidate
 
 
-def capture_screenshot_sync(target_url: str, output_path: str, fast_mode: bool = True) -> dict:
+def capture_screenshot_sync(target_url: str, output_path: str, fast_mode: bool = True, allow: list = None) -> dict:
     """
     Synchronous wrapper voor capture_screenshot.
+    
+    Waarom via capture_screenshot: Zelfde flow (politeness, request filter,
+    stats), de capture zelf draait toch op de loop van de browser pool.
     """
-    return asyncio.run(capture_screenshot(target_url, output_path, fast_mode))
+    return asyncio.run(capture_screenshot(target_url, output_path, fast_mode=fast_mode, allow=allow))
 
 
 # Test functie
@@ -0,0 +1,150 @@
+"""
+Cookie consent - Eén keer accepteren per domein, daarna hergebruiken
+
+Voorheen probeerde handle_cookie_banner 22 selectors na elkaar met elk
+1,5 sec timeout: op een pagina zonder (herkende) banner 33 sec wachten.
+
+Nu:
+- Alle kandidaten in één evaluatie in de pagina (wait_for_function, pollt
+  tot de banner verschijnt of CAPTURE_CONSENT_TIMEOUT_MS verstreken is)
+- De kandidaat die werkte wordt per domein onthouden en de volgende keer
+  eerst geprobeerd
+- Na het accepteren slaan we de cookies + localStorage op (Playwright
+  storage_state). Een nieuwe context voor dat domein start daarmee, de
+  banner komt dan meestal niet eens meer.
+
+Opslag: storage/consent/<domain>.json (gedeelde storage, net als de
+screenshots, zodat alle capture workers er bij kunnen).
+Alleen een geklikte banner wordt onthouden, en alleen dan volgt een korte
+check. Waarom "geen banner" niet: Een banner die één keer te laat kwam,
+zou dan 30 dagen lang in elk screenshot staan.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+# (css, tekst): element dat matcht op css én (hoofdletterongevoelig) de tekst bevat.
+# Volgorde = prioriteit. Zelfde kandidaten als de oude :has-text() selectors.
+CONSENT_CANDIDATES = [
+    # Dutch
+    ('button', 'Accepteren'),
+    ('button', 'Alles accepteren'),
+    ('button', 'Alle cookies accepteren'),
+    ('button', 'Akkoord'),
+    ('button', 'Ja, ik accepteer'),
+    # English
+    ('button', 'Accept'),
+    ('button', 'Accept all'),
+    ('button', 'Accept All Cookies'),
+    ('button', 'Agree'),
+    ('button', 'Allow all'),
+    ('button', 'OK'),
+    # Generic selectors
+    ('[class*="cookie"] button', 'Accept'),
+    ('[class*="cookie"] button', 'Accepteren'),
+    ('[id*="cookie"] button', None),
+    ('[class*="consent"] button', None),
+    ('[data-testid*="cookie"] button', None),
+    ('#onetrust-accept-btn-handler', None),
+    ('.onetrust-accept-btn-handler', None),
+    ('#accept-cookies', None),
+    ('.accept-cookies', None),
+    ('[aria-label*="cookie"] button', None),
+    ('[aria-label*="Accept"]', None),
+]
+
+# Markering van de gevonden knop, Playwright klikt daarna echt (muis events)
+MARKER = 'data-meerkat-consent'
+
+# Draait in de pagina: index + 1 van de eerste zichtbare kandidaat, of null (blijft pollen)
+# Waarom + 1: wait_for_function wacht op een truthy waarde, index 0 zou nooit matchen
+PROBE_SCRIPT = """
+(candidates) => {
+    const visible = (el) => {
+        const style = window.getComputedStyle(el);
+        const rect = el.getBoundingClientRect();
+        return style.visibility !== 'hidden' && style.display !== 'none' && rect.width > 0 && rect.height > 0;
+    };
+    for (let i = 0; i < candidates.length; i++) {
+        const [css, text] = candidates[i];
+        let elements;
+        try { elements = document.querySelectorAll(css); } catch (e) { continue; }
+        for (const el of elements) {
+            if (text && !(el.innerText || '').toLowerCase().includes(text.toLowerCase())) continue;
+            if (!visible(el)) continue;
+            document.querySelectorAll('[MARKER]').forEach((old) => old.removeAttribute('MARKER'));
+            el.setAttribute('MARKER', '');
+            return i + 1;
+        }
+    }
+    return null;
+}
+""".replace('MARKER', MARKER)
+
+
+def _consent_file(domain: str) -> Path:
+    return Path(settings.CAPTURE_CONSENT_DIR) / f'{domain}.json'
+
+
+def load_consent(domain: str) -> dict:
+    """
+    Opgeslagen consent van een domein.
+
+    Returns:
+        {'candidate': [css, tekst] of None, 'storage_state': dict of None, 'saved_at': float}
+        of None (nooit gezien, verlopen of onleesbaar)
+    """
+    try:
+        consent = json.loads(_consent_file(domain).read_text())
+    except (OSError, ValueError):
+        return None
+    if time.time() - consent.get('saved_at', 0) > settings.CAPTURE_CONSENT_MAX_AGE_DAYS * 86400:
+        return None
+    return consent
+
+
+def save_consent(domain: str, candidate=None, storage_state: dict = None):
+    """
+    Consent van een domein opslaan (atomair: tijdelijk bestand + rename).
+
+    Waarom atomair: Meerdere capture workers kunnen tegelijk hetzelfde
+    domein opslaan, een half geschreven bestand mag nooit gelezen worden.
+    """
+    path = _consent_file(domain)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps({
+        'candidate': list(candidate) if candidate else None,
+        'storage_state': storage_state,
+        'saved_at': time.time(),
+    }))
+    os.replace(tmp, path)
+
+
+def candidates_for(consent: dict = None) -> list:
+    """Alle kandidaten, de onthouden kandidaat van dit domein vooraan"""
+    candidates = [list(candidate) for candidate in CONSENT_CANDIDATES]
+    remembered = (consent or {}).get('candidate')
+    if remembered:
+        candidates = [remembered] + [c for c in candidates if c != remembered]
+    return candidates
+
+
+async def probe_consent(page, candidates: list, timeout_ms: int):
+    """
+    Zoek de consent knop met één script in de pagina (pollt tot timeout_ms).
+
+    Returns:
+        De kandidaat ([css, tekst]) waarvan de knop gemarkeerd is, of None
+    """
+    try:
+        handle = await page.wait_for_function(PROBE_SCRIPT, arg=candidates, timeout=timeout_ms, polling=250)
+    except Exception:
+        # Timeout (geen banner) of de pagina navigeerde
+        return None
+    index = await handle.json_value()
+    return candidates[index - 1] if index else None
@@ -0,0 +1,114 @@
+"""
+Screenshot derivatives - Thumbnails en previews voor de dashboard timeline
+
+De timeline toont tot 20 full-page screenshots van 1920 px breed. Ook met
+loading="lazy" is dat tientallen MB per page view, terwijl de kolom maar
+een paar honderd pixels breed is.
+
+Hoe:
+- Na elke capture (in de pipeline, niet in een request) maken we per
+  breedte in SCREENSHOT_DERIVATIVE_WIDTHS een kleine WebP
+- Bestandsnaam = content hash van het screenshot + breedte
+  (storage/derivatives/<digest>-<breedte>.webp). Verandert het screenshot,
+  dan verandert de naam: browser en nginx mogen ze dus oneindig cachen.
+- De template kiest via srcset (dashboard_extras.screenshot_srcset)
+- Ontbreekt een bestand (nieuwe breedte, opgeruimde map), dan maakt de
+  view het bij de eerste request alsnog (dashboard.views.screenshot_derivative)
+
+Oude scans zonder digest: python manage.py generate_derivatives
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from PIL import Image
+
+# Breedte van het origineel (viewport van de capture, zie browser_pool.CONTEXT_OPTIONS)
+ORIGINAL_WIDTH = 1920
+
+
+def screenshot_file(screenshot_path: str) -> Path:
+    """Absoluut pad van Scan.screenshot_path (relatief t.o.v. MEDIA_ROOT)"""
+    return Path(settings.MEDIA_ROOT) / screenshot_path
+
+
+def file_digest(path) -> str:
+    """Content hash van een bestand (16 hex tekens, genoeg voor een bestandsnaam)"""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()[:16]
+
+
+def derivative_name(digest: str, width: int) -> str:
+    return f'{digest}-{width}.webp'
+
+
+def derivative_path(digest: str, width: int) -> Path:
+    return Path(settings.SCREENSHOT_DERIVATIVE_DIR) / derivative_name(digest, width)
+
+
+def media_url() -> str:
+    """
+    MEDIA_URL als absoluut pad ('media/' → '/media/').
+
+    Waarom: Een relatieve srcset URL resolvet onder /dashboard/... en geeft een 404
+    """
+    url = settings.MEDIA_URL
+    if url.startswith(('/', 'http://', 'https://')):
+        return url
+    return '/' + url
+
+
+def derivative_url(digest: str, width: int) -> str:
+    return f'{media_url()}derivatives/{derivative_name(digest, width)}'
+
+
+def make_derivatives(source, digest: str = None, widths: list = None) -> str:
+    """
+    Maak de ontbrekende derivatives van een screenshot.
+
+    Args:
+        source: Pad van het screenshot
+        digest: Bekende content hash (anders berekend)
+        widths: Default SCREENSHOT_DERIVATIVE_WIDTHS
+
+    Returns:
+        De digest (voor Scan.screenshot_digest)
+    """
+    digest = digest or file_digest(source)
+    missing = [
+        width for width in (widths or settings.SCREENSHOT_DERIVATIVE_WIDTHS)
+        if not derivative_path(digest, width).exists()
+    ]
+    if not missing:
+        return digest
+
+    with Image.open(source) as image:
+        image = image.convert('RGB')
+    Path(settings.SCREENSHOT_DERIVATIVE_DIR).mkdir(parents=True, exist_ok=True)
+    for width in missing:
+        # Nooit vergroten, en binnen de WebP limiet (16383 px hoog)
+        scale = min(width / image.width, 16383 / image.height, 1)
+        size = (max(round(image.width * scale), 1), max(round(image.height * scale), 1))
+        path = derivative_path(digest, width)
+        # Waarom tijdelijk bestand: De view kan tegelijk hetzelfde bestand maken
+        tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        image.resize(size, Image.Resampling.LANCZOS).save(
+            tmp, format='WEBP', quality=settings.SCREENSHOT_DERIVATIVE_QUALITY, method=4
+        )
+        os.replace(tmp, path)
+    return digest
+
+
+def srcset(scan) -> str:
+    """srcset voor <img>: de derivatives + het origineel, of '' zonder digest"""
+    if not scan.screenshot_digest or not scan.screenshot_path:
+        return ''
+    candidates = [
+        f'{derivative_url(scan.screenshot_digest, width)} {width}w'
+        for width in sorted(settings.SCREENSHOT_DERIVATIVE_WIDTHS)
+    ]
+    candidates.append(f'{media_url()}{scan.screenshot_path} {ORIGINAL_WIDTH}w')
+    return ', '.join(candidates)
@@ -0,0 +1,114 @@
+"""
+Screenshot encoding - Compacte screenshots (WebP/AVIF/JPEG) i.p.v. PNG
+
+Een full-page PNG van 1920 px breed is op een lange pagina al snel
+meerdere MB's. Playwright kan alleen PNG/JPEG, dus we maken eerst de PNG
+en encoden die daarna met Pillow:
+- CAPTURE_SCREENSHOT_FORMAT: webp (default), avif, jpeg of png
+- CAPTURE_SCREENSHOT_QUALITY: kwaliteit voor webp/avif/jpeg
+- CAPTURE_SCREENSHOT_MAX_HEIGHT: hoger wordt afgekapt (truncate) of in
+  delen opgeslagen (tile: <naam>.part2.webp, ...), zie
+  CAPTURE_SCREENSHOT_OVERFLOW. Het eerste deel is altijd de bovenkant
+  van de pagina, dat is wat Gemini krijgt.
+
+Gemini (PIL.Image.open) en de dashboard <img> lezen alle formaten.
+Bestaande PNG's omzetten: python manage.py transcode_screenshots
+"""
+
+import os
+from pathlib import Path
+
+from django.conf import settings
+from PIL import Image
+
+# format -> (Pillow format, extensie)
+FORMATS = {
+    'webp': ('WEBP', '.webp'),
+    'avif': ('AVIF', '.avif'),
+    'jpeg': ('JPEG', '.jpg'),
+    'png': ('PNG', '.png'),
+}
+
+# Harde limieten van het formaat (pixels hoog)
+FORMAT_MAX_HEIGHT = {
+    'webp': 16383,
+    'jpeg': 65500,
+}
+
+
+def _save_options(fmt: str, quality: int) -> dict:
+    if fmt == 'png':
+        return {'optimize': True}
+    if fmt == 'jpeg':
+        return {'quality': quality, 'optimize': True, 'progressive': True}
+    if fmt == 'avif':
+        return {'quality': quality, 'speed': 6}
+    return {'quality': quality, 'method': 4}
+
+
+def encode_screenshot(source, fmt: str = None, quality: int = None, max_height: int = None,
+                      overflow: str = None, remove_source: bool = True) -> dict:
+    """
+    Encode een PNG screenshot naar het ingestelde formaat (naast de PNG).
+
+    Args:
+        source: Pad van de PNG
+        fmt, quality, max_height, overflow: Default uit settings (CAPTURE_SCREENSHOT_*)
+        remove_source: PNG daarna weggooien
+
+    Returns:
+        {
+            'path': str,          # Eerste (of enige) deel
+            'parts': [str],       # Alle delen, inclusief path (tile)
+            'format': str,
+            'bytes': int,         # Alle delen samen
+            'source_bytes': int,
+            'height': int,        # Originele hoogte
+            'truncated': bool     # Afgekapt (truncate), niet alles opgeslagen
+        }
+    """
+    fmt = (fmt or settings.CAPTURE_SCREENSHOT_FORMAT).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Onbekend screenshot formaat '{fmt}' (kies uit {', '.join(FORMATS)})")
+    quality = quality or settings.CAPTURE_SCREENSHOT_QUALITY
+    max_height = max_height or settings.CAPTURE_SCREENSHOT_MAX_HEIGHT
+    overflow = overflow or settings.CAPTURE_SCREENSHOT_OVERFLOW
+    pil_format, extension = FORMATS[fmt]
+    limit = min(max_height, FORMAT_MAX_HEIGHT.get(fmt, max_height))
+
+    source = Path(source)
+    source_bytes = source.stat().st_size
+    with Image.open(source) as image:
+        # Waarom RGB: Een screenshot heeft geen transparantie, alpha kost alleen ruimte
+        image = image.convert('RGB') if fmt != 'png' else image.copy()
+
+    width, height = image.size
+    if height <= limit:
+        tiles = [image]
+    elif overflow == 'tile':
+        tiles = [image.crop((0, top, width, min(top + limit, height))) for top in range(0, height, limit)]
+    else:
+        tiles = [image.crop((0, 0, width, limit))]
+
+    parts = []
+    for index, tile in enumerate(tiles):
+        name = f'{source.stem}{extension}' if index == 0 else f'{source.stem}.part{index + 1}{extension}'
+        path = source.with_name(name)
+        # Waarom tijdelijk bestand: Bij png overschrijven we de bron zelf
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        tile.save(tmp, format=pil_format, **_save_options(fmt, quality))
+        os.replace(tmp, path)
+        parts.append(str(path))
+
+    if remove_source and str(source) not in parts:
+        source.unlink()
+
+    return {
+        'path': parts[0],
+        'parts': parts,
+        'format': fmt,
+        'bytes': sum(Path(part).stat().st_size for part in parts),
+        'source_bytes': source_bytes,
+        'height': height,
+        'truncated': height > limit and overflow != 'tile',
+    }
@@ -0,0 +1,271 @@
+"""
+Content Extractors - Pluggable backends voor extract_content
+
+Twee backends met identieke output (text / images / hash):
+
+- 'soup': BeautifulSoup tree (het originele pad)
+- 'lxml': lxml parser target, single-pass streaming (SAX-style)
+
+Waarom een streaming backend:
+- Telecom landing pages zijn 1-3 MB HTML
+- BeautifulSoup bouwt een Python object per node, daarna decompose()
+  en nog twee volledige passes (get_text + find_all('img'))
+- De lxml parser target krijgt start/end/data events direct uit libxml2,
+  zonder tree. Eén pass, geen decompose.
+
+Waarom identiek: Beide backends voeden dezelfde ContentCollector.
+BeautifulSoup gebruikt zelf ook de lxml parser target, dus de events
+(en dus de hashes van bestaande targets) zijn gelijk.
+
+Naast de page hash levert de collector ook section hashes + een Merkle
+root (zie sections.py), zodat we weten WAAR een pagina veranderd is.
+
+Noise rules (noise.py) per target: drop_selectors werken hier tijdens het
+parsen, text/image normalisatie alleen op de hashes.
+
+Kiezen: settings.SCOUT_EXTRACTOR of get_extractor('soup' / 'lxml').
+"""
+
+import hashlib
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+from bs4.dammit import EncodingDetector
+from django.conf import settings
+from lxml import etree
+from collector.scanner.fingerprint import simhash
+from collector.scanner.sections import SectionTracker, merkle_root
+
+
+# Tags die niet zichtbaar zijn voor de gebruiker (inclusief alles erin)
+# Waarom ook images: De originele code deed decompose() vóór find_all('img')
+SKIP_TAGS = {'script', 'style', 'meta', 'noscript', 'head'}
+
+# Tags waarvan BeautifulSoup de tekst niet meetelt in get_text()
+# (TemplateString / RubyTextString / RubyParenthesisString), images wel
+TEXTLESS_TAGS = {'template', 'rt', 'rp'}
+
+# String types die get_text() meetelt (geen comments, doctype, etc)
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+
+def content_hash(text: str, images: list, rules=None) -> str:
+    """
+    MD5 van tekst + images, na de noise rules van de target.
+
+    Zonder rules identiek aan het originele algoritme.
+    """
+    if rules:
+        text, images = rules.normalize_text(text), rules.normalize_images(images)
+
+    # Maak hash van tekst + images gecombineerd
+    # Waarom: Als tekst OF images veranderen, verandert hash
+    content = f"{text}|{'|'.join(images)}"
+    return hashlib.md5(content.encode('utf-8')).hexdigest()
+
+
+class ContentCollector:
+    """
+    Verzamelt zichtbare tekst en image URLs uit parser events.
+
+    Werkt als lxml parser target (start/end/data/comment/pi/doctype/close)
+    en wordt ook gevoed door de BeautifulSoup tree walk.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = rules
+        # Waarom apart: Zonder selectors geen extra call per element
+        self._drops = rules.drops if rules and rules.selectors else None
+        self.tokens = []
+        self.images = []
+        self.sections = SectionTracker()
+        self._data = []
+        self._skip_depth = 0
+        self._textless_depth = 0
+
+    def flush(self):
+        """
+        Aaneengesloten tekst afsluiten.
+
+        Waarom bufferen: lxml kan één text node in meerdere data() calls
+        leveren. BeautifulSoup plakt die eerst aan elkaar (endData),
+        anders zou 'Inter' + 'net' twee woorden worden.
+        """
+        if self._data:
+            tokens = ''.join(self._data).split()
+            self.tokens.extend(tokens)
+            self.sections.add_tokens(tokens)
+            self._data = []
+
+    def start(self, tag, attrib):
+        self.flush()
+        if self._skip_depth or tag in SKIP_TAGS or (self._drops and self._drops(tag, attrib)):
+            self._skip_depth += 1
+            return
+        if tag in TEXTLESS_TAGS:
+            self._textless_depth += 1
+        self.sections.start(tag, attrib)
+        if tag == 'img' and 'src' in attrib:
+            self.images.append(attrib['src'])
+            self.sections.add_image(attrib['src'])
+
+    def end(self, tag):
+        self.flush()
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return
+        if tag in TEXTLESS_TAGS:
+            self._textless_depth -= 1
+        self.sections.end(tag)
+
+    def data(self, data):
+        if not self._skip_depth and not self._textless_depth:
+            self._data.append(data)
+
+    def comment(self, text):
+        self.flush()
+
+    def pi(self, target, data=None):
+        self.flush()
+
+    def doctype(self, *args):
+        self.flush()
+
+    def close(self):
+        self.flush()
+        return self.result()
+
+    def result(self) -> dict:
+        # Normalize whitespace (meerdere spaties -> 1 spatie)
+        text = ' '.join(self.tokens)
+        images = self.images
+
+        sections = self.sections.result(self.rules)
+
+        # Noise rules één keer toepassen, voor hash én fingerprint
+        hash_text, hash_images = text, images
+        if self.rules:
+            hash_text = self.rules.normalize_text(text)
+            hash_images = self.rules.normalize_images(images)
+
+        return {
+            'text': text,
+            'images': images,
+            'image_count': len(images),
+            'hash': content_hash(hash_text, hash_images),
+            # Waarom naast de MD5: Zegt ook HOEVEEL er veranderd is (fingerprint.py)
+            'simhash': simhash(hash_text, hash_images),
+            # Waarom naast 'hash': De page hash blijft gelijk aan het originele
+            # algoritme, de secties zeggen waar het verschil zit
+            'sections': sections,
+            'merkle_root': merkle_root(sections)
+        }
+
+
+class SoupExtractor:
+    """
+    BeautifulSoup backend (origineel pad).
+
+    Accepteert ook een al geparsede BeautifulSoup (zoals Crawlee die levert).
+    """
+
+    name = 'soup'
+
+    def extract(self, html, rules=None) -> dict:
+        soup = html if isinstance(html, BeautifulSoup) else BeautifulSoup(html, 'lxml')
+        collector = ContentCollector(rules)
+        self._walk(soup, collector)
+        return collector.close()
+
+    def _walk(self, soup: BeautifulSoup, collector: ContentCollector):
+        """
+        Loop de tree door in document volgorde.
+
+        Waarom een eigen stack: Geen RecursionError op diep geneste pagina's.
+        """
+        stack = [iter(soup.contents)]
+        names = []
+        while stack:
+            for child in stack[-1]:
+                if isinstance(child, Tag):
+                    attrs = {
+                        key: ' '.join(value) if isinstance(value, list) else value
+                        for key, value in child.attrs.items()
+                    }
+                    collector.start(child.name, attrs)
+                    stack.append(iter(child.contents))
+                    names.append(child.name)
+                    break
+                if type(child) in TEXT_STRING_TYPES:
+                    collector.data(str(child))
+                else:
+                    # Comment, doctype, etc: niet zichtbaar, wel een grens tussen strings
+                    collector.flush()
+            else:
+                stack.pop()
+                if names:
+                    collector.end(names.pop())
+
+
+class LxmlExtractor:
+    """
+    Streaming backend: lxml HTMLParser met ContentCollector als target.
+
+    Geen tree, geen decompose, één pass over de HTML.
+    """
+
+    name = 'lxml'
+
+    # Waarom chunks: Werkt ook als de HTML binnenstroomt, geen tweede kopie in geheugen
+    CHUNK_SIZE = 64 * 1024
+
+    def extract(self, html, rules=None) -> dict:
+        if isinstance(html, BeautifulSoup):
+            return SoupExtractor().extract(html, rules)
+
+        last_error = None
+        for markup, encoding in self._candidates(html):
+            collector = ContentCollector(rules)
+            try:
+                # Waarom in de try: Een encoding die lxml niet kent (cp1006) faalt al hier
+                parser = etree.HTMLParser(target=collector, recover=True, encoding=encoding)
+                for start in range(0, max(len(markup), 1), self.CHUNK_SIZE):
+                    parser.feed(markup[start:start + self.CHUNK_SIZE])
+                return parser.close()
+            except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+                # Zelfde fallback als BeautifulSoup: volgende encoding proberen
+                last_error = e
+        raise ValueError(f'Could not parse HTML: {last_error}')
+
+    def _candidates(self, html):
+        """
+        Encodings in dezelfde volgorde als BeautifulSoup's lxml builder.
+
+        Waarom: Zonder charset in de HTML moet de tekst (en dus de hash)
+        op dezelfde manier gedecodeerd worden als voorheen.
+        """
+        if isinstance(html, str):
+            if html[:1] == '\N{BYTE ORDER MARK}':
+                html = html[1:]
+            yield html, None
+            yield html.encode('utf8'), 'utf8'
+            return
+
+        detector = EncodingDetector(html, is_html=True)
+        for encoding in detector.encodings:
+            yield detector.markup, encoding
+
+
+EXTRACTORS = {
+    SoupExtractor.name: SoupExtractor,
+    LxmlExtractor.name: LxmlExtractor,
+}
+
+
+def get_extractor(name: str = None):
+    """Extractor backend op naam (default: settings.SCOUT_EXTRACTOR)."""
+    if name is None:
+        # Waarom settings.configured: scout.py kan ook standalone draaien
+        name = settings.SCOUT_EXTRACTOR if settings.configured else LxmlExtractor.name
+    try:
+        return EXTRACTORS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown extractor '{name}' (choose from: {', '.join(EXTRACTORS)})")
@@ -0,0 +1,88 @@
+"""
+Fingerprint - SimHash van de zichtbare tekst + images
+
+De MD5 hash is exact: één teken in de footer = 'wijziging' = capture + Gemini.
+SimHash is locality-sensitive: bijna dezelfde pagina = bijna dezelfde
+fingerprint. similarity() zegt hoeveel van de 64 bits gelijk zijn.
+
+Features:
+- Woord 3-shingles van de tekst ("internet vanaf 45")
+- Elke image URL
+
+Waarom zo gebouwd (pure Python, geen numpy):
+- Elk woord wordt één keer gehasht (8 bytes van de MD5)
+- Een shingle is a ^ rot(b) ^ rot(c) over de woord hashes, voor alle
+  shingles tegelijk als één grote int XOR (in C)
+- De bits worden per kolom geteld met int.bit_count (ook in C)
+"""
+
+import hashlib
+from array import array
+
+
+FINGERPRINT_BITS = 64
+FEATURE_SIZE = FINGERPRINT_BITS // 8
+
+
+def _digest(value: str) -> bytes:
+    return hashlib.md5(value.encode('utf-8')).digest()[:FEATURE_SIZE]
+
+
+def _rotate(packed: bytes, shift: int) -> bytes:
+    """Roteer elke 8-byte feature met `shift` bytes (zelfde woord, andere positie in de shingle)."""
+    rotated = bytearray(len(packed))
+    for index in range(FEATURE_SIZE):
+        rotated[(index + shift) % FEATURE_SIZE::FEATURE_SIZE] = packed[index::FEATURE_SIZE]
+    return bytes(rotated)
+
+
+def _xor(*parts: bytes) -> bytes:
+    result = 0
+    for part in parts:
+        result ^= int.from_bytes(part, 'little')
+    return result.to_bytes(len(parts[0]), 'little')
+
+
+def simhash(text: str, images: list) -> str:
+    """
+    64-bit SimHash als hex string (16 tekens).
+
+    Args:
+        text: Zichtbare tekst (na noise rules)
+        images: Image URLs (na noise rules)
+    """
+    words = text.split()
+    digests = {word: _digest(word) for word in set(words)}
+    packed = b''.join([digests[word] for word in words])
+
+    if len(words) >= 3:
+        step = FEATURE_SIZE
+        packed = _xor(packed[:-2 * step], _rotate(packed[step:-step], 1), _rotate(packed[2 * step:], 2))
+    packed += b''.join(_digest(f'img:{src}') for src in images)
+
+    if not packed:
+        return '0' * (FINGERPRINT_BITS // 4)
+
+    # Dubbele shingles tellen één keer
+    # Waarom array('Q'): Alleen om te dedupliceren, de bytes blijven gelijk
+    features = array('Q')
+    features.frombytes(packed)
+    features = array('Q', set(features))
+    packed = features.tobytes()
+
+    # Bit i staat aan als meer dan de helft van de features bit i heeft
+    count = len(features)
+    masks = [int.from_bytes(bytes([1 << bit]) * count, 'little') for bit in range(8)]
+    fingerprint = 0
+    for byte_index in range(FEATURE_SIZE):
+        column = int.from_bytes(packed[byte_index::FEATURE_SIZE], 'little')
+        for bit, mask in enumerate(masks):
+            if (column & mask).bit_count() * 2 > count:
+                fingerprint |= 1 << (byte_index * 8 + bit)
+    return f'{fingerprint:016x}'
+
+
+def similarity(a: str, b: str) -> float:
+    """Fractie gelijke bits tussen twee fingerprints (1.0 = identiek)."""
+    distance = (int(a, 16) ^ int(b, 16)).bit_count()
+    return 1 - distance / FINGERPRINT_BITS
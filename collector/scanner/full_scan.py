@@ -6,8 +6,9 @@ Combineert Scout + Capture + Gemini:
 1. Scout check (snel, goedkoop)
 2. Als hash ZELFDE → Stop (geen wijziging)
 3. Als hash ANDERS → Capture screenshot
-4. Gemini analyse
-5. Database opslaan
+4. Visueel gelijk aan het vorige screenshot → Stop (geen Gemini, zie visual_diff.py)
+5. Gemini analyse
+6. Database opslaan
 
 Waarom deze volgorde:
 - Scout is snel/goedkoop → eerst doen
@@ -15,10 +16,14 @@ Waarom deze volgorde:
 - Gemini kost geld → alleen bij wijziging
 """
 
+import asyncio
 import os
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 
 # Setup Django
@@ -30,25 +35,888 @@ import django
 django.setup()
 
 from shared.models import Target, Scan
-from collector.scanner.scout import scout_scan_sync
-from collector.scanner.capture import capture_screenshot_sync
+from asgiref.sync import sync_to_async
+from collector.scanner.scout import scout_scan, scout_scan_many_sync
+from collector.scanner.capture import capture_screenshot
+from collector.scanner.derivatives import make_derivatives
+from collector.scanner.visual_diff import compare_screenshots
+from collector.scanner.lease import acquire_scan_lease, release_scan_lease
+from collector.scanner.breaker import allow_scan, domain_of, filter_allowed, record_failure, record_success
 from collector.analyzer.gemini import analyze_screenshot
+from collector.scanner.fingerprint import similarity
+from collector.scanner.sections import diff_sections
 from dashboard.views import set_scan_progress
 
 
-def perform_full_scan(target_id: int, force_capture: bool = False) -> dict:
+def _is_changed(target: Target, new_hash: str) -> bool:
+    """Is de content veranderd t.o.v. de vorige scan?"""
+    # Waarom target.last_hash: Vergelijk met vorige scan
+    return target.last_hash != new_hash if target.last_hash else True
+
+
+def _scout_validators(target: Target) -> dict:
+    """
+    Conditional GET validators voor de volgende scout.
+    
+    Waarom alleen met last_hash: Bij een 304 nemen we last_hash over,
+    dus de validators moeten bij die hash horen.
+    """
+    if not target.last_hash:
+        return None
+    if not (target.http_etag or target.http_last_modified or target.body_digest):
+        return None
+    return {
+        'etag': target.http_etag,
+        'last_modified': target.http_last_modified,
+        'body_digest': target.body_digest,
+        'hash': target.last_hash,
+    }
+
+
+def _store_validators(target: Target, scout_result: dict = None):
+    """
+    Bewaar ETag / Last-Modified / body digest (zonder save).
+    
+    Alleen aanroepen als last_hash == de hash van deze scout,
+    anders zou een 304 een gemiste wijziging verbergen.
+    """
+    scout_result = scout_result or {}
+    target.http_etag = scout_result.get('etag')
+    target.http_last_modified = scout_result.get('last_modified')
+    target.body_digest = scout_result.get('body_digest')
+
+
+def _section_changes(target: Target, scout_result: dict) -> tuple:
+    """
+    Section hashes van deze scout + welke secties veranderd zijn.
+    
+    Waarom vergelijken met de laatste scan MET secties: Oudere scans
+    (of force mode scans) hebben geen section hashes.
+    
+    Returns:
+        (section_hashes, changed_sections) - beide None zonder secties
+    """
+    if not scout_result or not scout_result.get('sections'):
+        return None, None
+    
+    section_hashes = {
+        'root': scout_result['merkle_root'],
+        'sections': scout_result['sections'],
+    }
+    previous_scan = target.scans.filter(
+        section_hashes__isnull=False
+    ).exclude(status='pending').order_by('-scanned_at').first()
+    
+    if not previous_scan:
+        return section_hashes, None
+    return section_hashes, diff_sections(previous_scan.section_hashes, section_hashes)
+
+
+def _is_price_section(key: str) -> bool:
+    """Ligt deze sectie in een prijsblok? (key bevat een 'price' segment)"""
+    return any(part.split('~')[0] == 'price' for part in key.split('/'))
+
+
+def _needs_capture(target: Target, scout_result: dict) -> tuple:
+    """
+    Moet deze scout door naar capture + Gemini?
+    
+    1. Zelfde MD5 → nee
+    2. Geen fingerprint om mee te vergelijken → ja (zoals voorheen)
+    3. SimHash similarity t.o.v. de laatst GEANALYSEERDE pagina < threshold → ja
+    4. Een prijsblok is veranderd → ja (ook als de rest gelijk is)
+    
+    Waarom t.o.v. de laatst geanalyseerde pagina: Kleine wijzigingen
+    stapelen zo op tot ze samen de threshold halen.
+    
+    Returns:
+        (changed, similarity) - similarity is None zonder fingerprint
+    """
+    if not _is_changed(target, scout_result['hash']):
+        return False, None
+    if not target.last_simhash or not scout_result.get('simhash'):
+        return True, None
+    
+    score = similarity(target.last_simhash, scout_result['simhash'])
+    threshold = target.similarity_threshold
+    if threshold is None:
+        threshold = settings.SCOUT_SIMILARITY_THRESHOLD
+    if score < threshold:
+        return True, score
+    
+    _, changed_sections = _section_changes(target, scout_result)
+    if any(_is_price_section(section['key']) for section in changed_sections or []):
+        return True, score
+    return False, score
+
+
+def _known_variant(target: Target, new_hash: str) -> dict:
+    """
+    Is deze hash al eerder geanalyseerd? (A/B test variant)
+    
+    Waarom de Scan checken: Een verwijderde scan (of een scan zonder
+    analyse) kan niet hergebruikt worden, dan gewoon opnieuw capturen.
+    
+    Returns:
+        Het known_variants item, of None
+    """
+    for variant in target.known_variants or []:
+        if variant['hash'] != new_hash:
+            continue
+        if Scan.objects.filter(id=variant['scan_id'], target=target, status='success', analysis_json__isnull=False).exists():
+            return variant
+        return None
+    return None
+
+
+def _remember_variant(target: Target, scan: Scan):
+    """
+    Zet de hash van een geanalyseerde scan vooraan in known_variants (zonder save).
+    
+    Waarom begrensd + recency: Alleen de laatste paar varianten doen mee
+    aan een A/B test, oude hashes komen niet meer terug.
+    """
+    variants = [v for v in target.known_variants or [] if v['hash'] != scan.content_hash]
+    variants.insert(0, {
+        'hash': scan.content_hash,
+        'simhash': scan.simhash,
+        'scan_id': scan.id,
+        'seen_at': timezone.now().isoformat(),
+    })
+    target.known_variants = variants[:settings.SCOUT_KNOWN_VARIANTS]
+
+
+def _record_variant(target: Target, scout_result: dict, variant: dict):
+    """
+    Bekende variant gezien: geen capture/Gemini, de analyse van variant['scan_id'] geldt.
+    
+    Waarom last_hash overnemen: De pagina toont nu deze variant, de
+    validators van deze scout horen ook bij deze hash.
+    """
+    variant['seen_at'] = timezone.now().isoformat()
+    target.known_variants = [variant] + [v for v in target.known_variants if v['hash'] != variant['hash']]
+    target.last_hash = variant['hash']
+    target.last_simhash = variant.get('simhash')
+    _record_no_change(target, scout_result, f"Bekende variant (Scan #{variant['scan_id']})")
+
+
+def _record_no_change(target: Target, scout_result: dict, detail: str = None):
+    """
+    Geen wijziging: UI updaten en last_scan_at bijwerken (last_hash blijft).
+    
+    Waarom validators alleen bij dezelfde hash: Bij een kleine wijziging
+    houdt last_hash bewust de oudere hash. Validators van deze body zouden
+    een 304 dan als "gelijk aan last_hash" laten tellen, terwijl de
+    wijzigingen zich over meerdere scouts kunnen opstapelen. Dan dus
+    geen validators: de volgende scout doet een volledige GET.
+    """
+    set_scan_progress(target.id, 'no_change', detail)
+    same_hash = bool(scout_result) and scout_result.get('hash') == target.last_hash
+    _store_validators(target, scout_result if same_hash else None)
+    target.last_scan_at = timezone.now()
+    target.save()
+
+
+def scout_targets(target_ids: list, concurrency: int = None) -> dict:
+    """
+    Batch scout voor veel targets tegelijk (één crawl, gedeelde HTTP client).
+    
+    Targets zonder wijziging worden hier direct afgehandeld (last_scan_at).
+    Alleen gewijzigde targets hoeven door naar capture + Gemini.
+    
+    Args:
+        target_ids: IDs van targets om te scouten
+        concurrency: Max gelijktijdige requests (default: SCOUT_CONCURRENCY)
+        
+    Returns:
+        {
+            'changed': {target_id: scout_result},  # Door naar perform_full_scan
+            'unchanged': [target_id, ...],
+            'failed': {target_id: error},
+            'skipped': [target_id, ...],  # Circuit breaker van het domein staat open
+            'not_modified': int,   # 304 responses (body niet gedownload)
+            'body_unchanged': int, # Zelfde body (niet geparsed)
+            'minor': int,          # Andere hash, maar similarity boven de threshold
+            'variants': int        # Bekende variant (A/B test), analyse hergebruikt
+        }
+    """
+    summary = {
+        'changed': {},
+        'unchanged': [],
+        'failed': {},
+        'skipped': [],
+        'not_modified': 0,
+        'body_unchanged': 0,
+        'minor': 0,
+        'variants': 0,
+    }
+    
+    targets = list(Target.objects.filter(id__in=target_ids))
+    if not targets:
+        return summary
+    
+    # Circuit breaker: domeinen die plat liggen niet scouten (wel last_scan_at)
+    allowed, blocked = filter_allowed([t.url for t in targets])
+    for target in [t for t in targets if t.url in blocked]:
+        print(f"   ⛔ {target.name}: circuit open voor {domain_of(target.url)}, overgeslagen")
+        summary['skipped'].append(target.id)
+        set_scan_progress(target.id, 'failed', f'Domein {domain_of(target.url)} tijdelijk overgeslagen (circuit breaker)')
+        target.last_scan_at = timezone.now()
+        target.save()
+    targets = [t for t in targets if t.url in allowed]
+    if not targets:
+        return summary
+    
+    for target in targets:
+        set_scan_progress(target.id, 'scout')
+    
+    print(f"🔍 Batch scout: {len(targets)} targets...")
+    validators = {}
+    for target in targets:
+        target_validators = _scout_validators(target)
+        if target_validators:
+            validators[target.url] = target_validators
+    
+    rules = {t.url: t.noise_rules for t in targets if t.noise_rules}
+    
+    results = scout_scan_many_sync(
+        [t.url for t in targets],
+        concurrency=concurrency,
+        validators=validators,
+        rules=rules
+    )
+    
+    for target in targets:
+        scout_result = results[target.url]
+        summary['not_modified'] += scout_result['not_modified']
+        summary['body_unchanged'] += scout_result['body_unchanged']
+        
+        if not scout_result['success']:
+            # Waarom last_scan_at: Anders staat de target elke tick opnieuw DUE
+            # Waarom deferred niet naar de breaker: Het domein is niet plat, wij waren te druk
+            print(f"   ❌ {target.name}: {scout_result['error']}")
+            if scout_result.get('deferred'):
+                summary['skipped'].append(target.id)
+            else:
+                summary['failed'][target.id] = scout_result['error']
+                record_failure(target.url, scout_result['error'])
+            set_scan_progress(target.id, 'failed', scout_result['error'])
+            target.last_scan_at = timezone.now()
+            target.save()
+            continue
+        
+        variant = _is_changed(target, scout_result['hash']) and _known_variant(target, scout_result['hash'])
+        if variant:
+            # A/B test: deze variant is al geanalyseerd
+            print(f"   ↔ {target.name}: known variant (Scan #{variant['scan_id']})")
+            summary['unchanged'].append(target.id)
+            summary['variants'] += 1
+            _record_variant(target, scout_result, variant)
+            continue
+        
+        changed, score = _needs_capture(target, scout_result)
+        if changed:
+            print(f"   🔄 {target.name}: CHANGE DETECTED" + (f" (similarity {score:.0%})" if score is not None else ''))
+            summary['changed'][target.id] = scout_result
+        elif score is not None:
+            # Andere hash, maar (bijna) dezelfde pagina: geen capture
+            print(f"   ≈ {target.name}: minor change (similarity {score:.0%})")
+            summary['unchanged'].append(target.id)
+            summary['minor'] += 1
+            _record_no_change(target, scout_result, f'Kleine wijziging ({score:.0%} gelijk)')
+        else:
+            print(f"   ✓ {target.name}: no changes")
+            summary['unchanged'].append(target.id)
+            _record_no_change(target, scout_result)
+    
+    record_success([t.url for t in targets if results[t.url]['success']])
+    print(f"   {len(summary['changed'])} changed, {len(summary['unchanged'])} unchanged, {len(summary['failed'])} failed, {len(summary['skipped'])} skipped")
+    print(f"   💾 304 Not Modified: {summary['not_modified']}, body unchanged: {summary['body_unchanged']}, minor: {summary['minor']}, known variants: {summary['variants']}\n")
+    return summary
+
+
+def _evaluate_scout(target: Target, scout_result: dict, result: dict) -> dict:
+    """
+    Scout result beoordelen (sync, raakt de database).
+    
+    Handelt 'geen wijziging', 'kleine wijziging' en 'bekende variant' direct af.
+    
+    Returns:
+        Extra Scan velden als er gecaptured moet worden, anders None (result is dan klaar)
+    """
+    new_hash = scout_result['hash']
+    print(f"   ✅ Hash: {new_hash}")
+    if scout_result.get('not_modified'):
+        print(f"   💾 304 Not Modified (not downloaded)")
+    elif scout_result.get('body_unchanged'):
+        print(f"   💾 Body unchanged (not parsed)")
+    else:
+        print(f"   📸 Images: {scout_result['image_count']}")
+    
+    # A/B test variant die al geanalyseerd is? Dan die analyse hergebruiken
+    variant = _is_changed(target, new_hash) and _known_variant(target, new_hash)
+    if variant:
+        print(f"\n   ↔ Known variant, reusing analysis of Scan #{variant['scan_id']}\n")
+        _record_variant(target, scout_result, variant)
+        
+        result['success'] = True
+        result['scan_id'] = variant['scan_id']
+        result['message'] = f"Known variant (Scan #{variant['scan_id']})"
+        return None
+    
+    # Check if changed
+    changed, score = _needs_capture(target, scout_result)
+    result['changed'] = changed
+    result['similarity'] = score
+    
+    if not changed:
+        # No change detected
+        detail = None
+        if score is None:
+            print(f"\n   ✓ No changes detected")
+            print(f"   Hash matches previous scan\n")
+        else:
+            print(f"\n   ≈ Minor change (similarity {score:.0%}), skipping capture\n")
+            detail = f'Kleine wijziging ({score:.0%} gelijk)'
+        
+        # Notify UI + update last_scan_at maar niet last_hash
+        _record_no_change(target, scout_result, detail)
+        
+        result['success'] = True
+        result['message'] = 'No changes detected'
+        return None
+    
+    # Change detected!
+    print(f"\n🔄 CHANGE DETECTED!")
+    print(f"   Old hash: {target.last_hash or 'None (eerste scan)'}")
+    print(f"   New hash: {new_hash}\n")
+    
+    # Waar is het veranderd? (section hashes, geen screenshot nodig)
+    section_hashes, changed_sections = _section_changes(target, scout_result)
+    result['changed_sections'] = changed_sections
+    if changed_sections:
+        print(f"   🧩 {len(changed_sections)} section(s) changed:")
+        for section in changed_sections[:10]:
+            print(f"      {section['change']:<8} {section['key']}")
+        print()
+    
+    return {
+        'simhash': scout_result.get('simhash'),
+        'section_hashes': section_hashes,
+        'changed_sections': changed_sections,
+        # Waarom bewaren: replay_noise_rules test nieuwe rules op deze tekst
+        'page_text': scout_result.get('text'),
+        'page_images': scout_result.get('images'),
+    }
+
+
+def _new_result() -> dict:
+    return {
+        'success': False,
+        'scan_id': None,
+        'changed': False,
+        'message': '',
+        'similarity': None,
+        'changed_sections': None,
+        'error': None
+    }
+
+
+def scout_validators(scout_result: dict = None) -> dict:
+    """
+    Alleen de validators uit een scout result (ETag / Last-Modified / body digest).
+    
+    Waarom: Persist heeft alleen deze nodig, de rest (tekst, secties) zit al
+    in scan_fields. Scheelt een grote payload tussen de Celery stages.
+    """
+    scout_result = scout_result or {}
+    return {key: scout_result.get(key) for key in ('etag', 'last_modified', 'body_digest')}
+
+
+def _screenshot_file(screenshot_path: str) -> Path:
+    """Absoluut pad van Scan.screenshot_path (relatief t.o.v. storage/)"""
+    return Path(settings.BASE_DIR) / 'storage' / screenshot_path
+
+
+def _previous_analysis(target: Target) -> dict:
+    """
+    Analyse van de laatst geanalyseerde scan (sync, database).
+    
+    Waarom: Gemini heeft context nodig voor "Was X -> Is Y"
+    
+    Returns:
+        analysis_json, of None bij de eerste analyse
+    """
+    previous_scan = target.scans.filter(
+        status='success',
+        analysis_json__isnull=False
+    ).order_by('-scanned_at').first()
+    
+    if not previous_scan:
+        print(f"   📊 Baseline scan (first analysis)...")
+        return None
+    
+    print(f"   📊 Comparing with previous scan (#{previous_scan.id})...")
+    return previous_scan.analysis_json
+
+
+def _start_scan(target: Target, scan_fields: dict) -> Scan:
+    """
+    Pending Scan aanmaken: het checkpoint van deze scan (sync, database).
+    
+    Elke stage schrijft z'n resultaat op deze rij (screenshot_path,
+    analysis_json), een retry gaat verder vanaf de laatste stap.
+    
+    Waarom een bestaande pending scan hergebruiken: Een dubbel afgeleverde
+    task (zelfde hash) mag geen tweede scan starten.
+    """
+    scan = target.scans.filter(status='pending', content_hash=scan_fields['content_hash']).first()
+    if scan:
+        print(f"   ↻ Resuming pending Scan #{scan.id}")
+        return scan
+    return Scan.objects.create(target=target, status='pending', screenshot_path='', **scan_fields)
+
+
+def _record_stage_seconds(scan: Scan, stage: str, started: float):
+    """Duur van een stage op de scan zetten (zonder save), voor de ETA van interactieve scans"""
+    scan.stage_seconds = {**(scan.stage_seconds or {}), stage: round(time.monotonic() - started, 1)}
+
+
+def _analysis_result(scan: Scan, gemini_result: dict, result: dict, started: float) -> dict:
+    """
+    Gemini result op de scan zetten (sync, database).
+    
+    Args:
+        started: time.monotonic() vóór de Gemini call (stage_seconds)
+    
+    Returns:
+        De analyse, of None als Gemini faalde (result is dan klaar)
+    """
+    if not gemini_result['success']:
+        result['error'] = f"Gemini failed: {gemini_result['error']}"
+        
+        # Scan met screenshot maar zonder analyse
+        scan.status = 'success'  # Screenshot OK, alleen analyse failed
+        scan.error_message = result['error']
+        scan.save(update_fields=['status', 'error_message'])
+        result['scan_id'] = scan.id
+        return None
+    
+    analysis = gemini_result['analysis']
+    print(f"   ✅ Type: {analysis.get('type', 'unknown')}")
+    print(f"   ✅ Title: {analysis.get('title', 'N/A')}\n")
+    
+    # Checkpoint: een retry van persist hoeft Gemini niet opnieuw te vragen
+    scan.analysis_json = analysis
+    _record_stage_seconds(scan, 'analysis', started)
+    scan.save(update_fields=['analysis_json', 'stage_seconds'])
+    return analysis
+
+
+def _persist(scan: Scan, validators: dict, force_capture: bool, result: dict) -> Scan:
+    """
+    STEP 4: Scan afronden + target bijwerken (sync, database).
+    
+    Waarom nu: Alles is succesvol, nu kunnen we opslaan
+    Waarom select_for_update: Een dubbele persist mag de target maar één keer bijwerken
+    """
+    set_scan_progress(scan.target_id, 'saving')
+    print("💾 Step 4: Saving to database...")
+    
+    with transaction.atomic():
+        scan = Scan.objects.select_for_update().select_related('target').get(id=scan.id)
+        if scan.status == 'pending':
+            scan.status = 'success'
+            scan.save(update_fields=['status'])
+            
+            # Update target
+            # Waarom beide: last_hash voor volgende compare, last_scan_at voor scheduling
+            # Validators + simhash horen nu bij new_hash (force mode: geen scout → leeg)
+            target = scan.target
+            target.last_hash = scan.content_hash
+            target.last_simhash = scan.simhash
+            if not force_capture:
+                # Waarom niet in force mode: De hash is dan random, die komt nooit terug
+                _remember_variant(target, scan)
+            _store_validators(target, validators)
+            target.last_scan_at = timezone.now()
+            target.save()
+            
+            print(f"   ✅ Scan #{scan.id} created")
+            print(f"   ✅ Target updated\n")
+        else:
+            print(f"   ↻ Scan #{scan.id} already saved")
+    
+    # Mark scan as complete
+    set_scan_progress(scan.target_id, 'complete')
+    
+    result['success'] = True
+    result['scan_id'] = scan.id
+    result['message'] = f"Change detected and analyzed (Scan #{scan.id})"
+    return scan
+
+
+def _visual_baseline(scan: Scan) -> Scan:
+    """
+    Vorige geanalyseerde scan met een screenshot op disk, of None (sync, database)
+    
+    Waarom analysis_json verplicht: Een scan waarvan Gemini faalde is ook
+    'success', maar gelijk daaraan betekent niet dat de wijziging geanalyseerd is.
+    """
+    baseline = scan.target.scans.filter(status='success', analysis_json__isnull=False).exclude(id=scan.id).exclude(
+        screenshot_path=''
+    ).order_by('-scanned_at').first()
+    if baseline is None or not _screenshot_file(baseline.screenshot_path).exists():
+        return None
+    return baseline
+
+
+def _persist_unchanged(scan: Scan, validators: dict, result: dict):
+    """
+    Visueel gelijk: scan afronden zonder Gemini (sync, database).
+    
+    Waarom last_hash wel bijwerken: De pagina heeft nu deze hash, anders
+    capturen we hem elke interval opnieuw om hetzelfde te zien.
+    Waarom status 'unchanged': Geen nieuwe analyse, dus niet in de
+    timeline en niet als vorige analyse voor Gemini.
+    """
+    with transaction.atomic():
+        scan = Scan.objects.select_for_update().select_related('target').get(id=scan.id)
+        if scan.status == 'pending':
+            scan.status = 'unchanged'
+            scan.save(update_fields=['status'])
+            
+            # Waarom last_simhash niet: Die hoort bij wat Gemini het laatst zag,
+            # anders tellen kleine wijzigingen niet meer op (zie _needs_capture)
+            target = scan.target
+            target.last_hash = scan.content_hash
+            _store_validators(target, validators)
+            target.last_scan_at = timezone.now()
+            target.save()
+    
+    change = (scan.visual_diff or {}).get('change') or 0
+    set_scan_progress(scan.target_id, 'no_change', f'Visueel gelijk ({change:.1%} gewijzigd)')
+    result['success'] = True
+    result['changed'] = False
+    result['scan_id'] = scan.id
+    result['message'] = f"Visually unchanged (Scan #{scan.id})"
+
+
+def fail_scan(scan_id: int, error: str):
+    """Pending scan opgeven (laatste retry mislukt), anders blijft hij eeuwig 'Bezig'"""
+    Scan.objects.filter(id=scan_id, status='pending').update(status='failed', error_message=error)
+
+
+async def start_stage_async(target: Target, result: dict, force_capture: bool = False, scout_result: dict = None) -> tuple:
+    """
+    STEP 1: Scout beslissing + pending Scan (checkpoint).
+    
+    Returns:
+        (scan, validators) - validators voor de target (zie scout_validators).
+        scan is None als de scan hier klaar is (geen wijziging,
+        bekende variant, scout failure)
+    """
+    print(f"\n{'='*60}")
+    print(f"🎯 Scanning: {target.name}")
+    print(f"   URL: {target.url}")
+    if force_capture:
+        print(f"   ⚡ FAST MODE: Skipping scout check")
+    print(f"{'='*60}\n")
+    
+    # Circuit breaker (een batch scout heeft dit al gecheckt)
+    if scout_result is None and not await sync_to_async(allow_scan)(target.url):
+        result['error'] = f"Circuit open: {domain_of(target.url)} wordt tijdelijk overgeslagen"
+        print(f"⛔ {result['error']}\n")
+        return None, None
+    
+    if not force_capture:
+        # STEP 1: Scout check (hash)
+        # Waarom eerst: Snel en goedkoop
+        if scout_result is None:
+            set_scan_progress(target.id, 'scout')
+            print("🔍 Step 1: Scout mode (hash check)...")
+            scout_result = await scout_scan(
+                target.url,
+                validators=_scout_validators(target),
+                rules=target.noise_rules
+            )
+            if scout_result['success']:
+                await sync_to_async(record_success)(target.url)
+            elif not scout_result.get('deferred'):
+                await sync_to_async(record_failure)(target.url, scout_result['error'])
+        else:
+            print("🔍 Step 1: Scout mode (result from batch scout)...")
+        
+        if not scout_result['success']:
+            result['error'] = f"Scout failed: {scout_result['error']}"
+            return None, None
+        
+        scan_fields = await sync_to_async(_evaluate_scout)(target, scout_result, result)
+        if scan_fields is None:
+            return None, None
+        scan_fields['content_hash'] = scout_result['hash']
+    else:
+        # Force capture mode - skip scout, mark as changed
+        # Generate a unique hash based on timestamp (will be accurate after Gemini analyzes)
+        import hashlib
+        result['changed'] = True
+        scan_fields = {
+            'content_hash': hashlib.md5(f"{target.id}_{datetime.now().isoformat()}".encode()).hexdigest(),
+            'forced': True,
+        }
+        print("⚡ Skipping scout check - going directly to capture...")
+    
+    scan = await sync_to_async(_start_scan)(target, scan_fields)
+    result['scan_id'] = scan.id
+    return scan, scout_validators(scout_result)
+
+
+async def capture_stage_async(scan: Scan, result: dict) -> bool:
+    """
+    STEP 2: Screenshot van de pending scan.
+    
+    Waarom checkpoint: Staat het screenshot er al (retry, dubbele task),
+    dan geen nieuwe Chromium page.
+    
+    Returns:
+        True als het screenshot er is, False als capture faalde (scan is dan 'failed')
+    """
+    if scan.screenshot_path and _screenshot_file(scan.screenshot_path).exists():
+        print(f"📸 Step 2: Screenshot already captured ({scan.screenshot_path})\n")
+        return True
+    
+    # Waarom nu: Alleen bij wijziging (screenshots zijn groot/duur)
+    set_scan_progress(scan.target_id, 'capture')
+    print("📸 Step 2: Capture mode (screenshot)...")
+    
+    # Create screenshot filename met absoluut pad
+    # Waarom scan id: Unieke naam per scan, een retry overschrijft hetzelfde bestand
+    # Waarom absoluut: Crawlee kan vanuit andere dir draaien
+    screenshot_filename = f"{scan.target_id}_{scan.id}.png"
+    screenshot_path = _screenshot_file(f"screenshots/{screenshot_filename}")
+    
+    # Ensure screenshots directory exists
+    screenshot_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    print(f"   💾 Screenshot path: {screenshot_path}")
+    started = time.monotonic()
+    capture_result = await capture_screenshot(
+        scan.target.url, str(screenshot_path), allow=scan.target.capture_allowlist
+    )
+    scan.capture_stats = capture_result.get('stats')
+    
+    if not capture_result['success']:
+        result['error'] = f"Capture failed: {capture_result['error']}"
+        if not capture_result.get('deferred'):
+            await sync_to_async(record_failure)(scan.target.url, capture_result['error'])
+        
+        # Mark scan as failed
+        scan.status = 'failed'
+        scan.error_message = result['error']
+        await scan.asave(update_fields=['status', 'error_message', 'capture_stats'])
+        return False
+    
+    # Waarom de naam uit het result: Het geëncodeerde bestand heeft een andere extensie
+    screenshot_filename = Path(capture_result['screenshot_path']).name
+    print(f"   ✅ Screenshot saved: {screenshot_filename}\n")
+    await sync_to_async(record_success)(scan.target.url)
+    scan.screenshot_path = f"screenshots/{screenshot_filename}"
+    if capture_result.get('screenshot_parts'):
+        scan.capture_stats['screenshot_parts'] = [
+            f"screenshots/{Path(part).name}" for part in capture_result['screenshot_parts']
+        ]
+    _record_stage_seconds(scan, 'capture', started)
+    scan.screenshot_digest = await asyncio.to_thread(_derivatives, capture_result['screenshot_path'])
+    await scan.asave(update_fields=['screenshot_path', 'stage_seconds', 'capture_stats', 'screenshot_digest'])
+    return True
+
+
+async def visual_stage_async(scan: Scan, result: dict, validators: dict = None) -> bool:
+    """
+    STEP 2b: Screenshot vergelijken met het vorige geanalyseerde screenshot.
+    
+    Waarom vóór Gemini: Een andere hash met een visueel gelijke pagina
+    (onzichtbare tekst, alt teksten, andere markup) kost anders een analyse.
+    Een fout in de vergelijking stopt de scan niet, dan gewoon analyseren.
+    
+    Returns:
+        True als Gemini moet analyseren, False als de scan hier klaar is
+    """
+    if not settings.VISUAL_DIFF_ENABLED:
+        return True
+    
+    print("🔬 Step 2b: Visual diff...")
+    baseline = await sync_to_async(_visual_baseline)(scan)
+    started = time.monotonic()
+    try:
+        # Waarom to_thread: Decoderen en vergelijken is CPU werk
+        diff = await asyncio.to_thread(
+            compare_screenshots,
+            _screenshot_file(scan.screenshot_path),
+            baseline and _screenshot_file(baseline.screenshot_path),
+            baseline.visual_hash if baseline else ''
+        )
+    except Exception as e:
+        print(f"   ⚠️ Visual diff skipped: {str(e)[:80]}\n")
+        return True
+    
+    scan.visual_hash = diff.pop('visual_hash')
+    scan.visual_diff = {**diff, 'baseline_scan_id': baseline and baseline.id}
+    _record_stage_seconds(scan, 'visual_diff', started)
+    await scan.asave(update_fields=['visual_hash', 'visual_diff', 'stage_seconds'])
+    
+    if diff['change'] is None:
+        print(f"   📊 No previous screenshot to compare\n")
+        return True
+    if diff['change'] > settings.VISUAL_DIFF_THRESHOLD:
+        print(f"   🔀 {diff['tiles_changed']} tile(s) changed ({diff['change']:.1%}), {len(diff['regions'])} region(s)\n")
+        return True
+    
+    print(f"   ≈ Visually unchanged ({diff['change']:.1%}), skipping Gemini\n")
+    await sync_to_async(_persist_unchanged)(scan, validators, result)
+    return False
+
+
+def _derivatives(screenshot_path: str) -> str:
+    """
+    Thumbnails/previews voor het dashboard (derivatives.py).
+    
+    Waarom hier en niet in de view: Een page view moet nooit 20 screenshots
+    hoeven te verkleinen. Een fout kost alleen de srcset, niet de scan.
+    
+    Returns:
+        Scan.screenshot_digest ('' bij een fout)
+    """
+    try:
+        return make_derivatives(screenshot_path)
+    except Exception as e:
+        print(f"   ⚠️ Derivatives skipped: {str(e)[:80]}")
+        return ''
+
+
+def start_stage(target_id: int, force_capture: bool = False, scout_result: dict = None) -> tuple:
+    """
+    Synchronous wrapper voor start_stage_async (Celery capture_task).
+    
+    Returns:
+        (result, scan_id, validators) - scan_id is None als de scan klaar is
+    """
+    async def run():
+        result = _new_result()
+        try:
+            target = await Target.objects.aget(id=target_id)
+        except Target.DoesNotExist:
+            result['error'] = f'Target {target_id} not found'
+            return result, None, None
+        scan, validators = await start_stage_async(target, result, force_capture=force_capture, scout_result=scout_result)
+        return result, scan and scan.id, validators
+    
+    return asyncio.run(run())
+
+
+def capture_stage(scan_id: int) -> tuple:
+    """
+    Synchronous wrapper voor capture_stage_async (Celery capture_task).
+    
+    Returns:
+        (result, captured)
+    """
+    async def run():
+        result = _new_result()
+        result['scan_id'] = scan_id
+        scan = await Scan.objects.select_related('target').aget(id=scan_id)
+        return result, await capture_stage_async(scan, result)
+    
+    return asyncio.run(run())
+
+
+def visual_stage(scan_id: int, result: dict, validators: dict = None) -> bool:
+    """
+    Synchronous wrapper voor visual_stage_async (Celery capture_task).
+    
+    Returns:
+        True als analyze_task moet volgen, False als de scan klaar is (result bijgewerkt)
+    """
+    async def run():
+        scan = await Scan.objects.select_related('target').aget(id=scan_id)
+        return await visual_stage_async(scan, result, validators)
+    
+    return asyncio.run(run())
+
+
+def analyze_stage(scan_id: int) -> tuple:
     """
-    Voer een complete scan uit van een target.
+    STEP 3: Gemini analyse van het screenshot (sync, Celery analyze_task).
+    
+    Waarom checkpoint: Heeft de scan al een analyse (dubbele task,
+    retry van een latere stap), dan Gemini niet opnieuw aanroepen.
+    
+    Returns:
+        (result, analysis) - analysis is None als Gemini faalde
+    """
+    result = _new_result()
+    result['changed'] = True
+    result['scan_id'] = scan_id
+    scan = Scan.objects.select_related('target').get(id=scan_id)
+    
+    if scan.analysis_json is not None:
+        print(f"🤖 Step 3: Analysis already done (Scan #{scan.id})\n")
+        return result, scan.analysis_json
+    
+    set_scan_progress(scan.target_id, 'gemini')
+    print("🤖 Step 3: Gemini AI analyse...")
+    
+    previous_analysis = _previous_analysis(scan.target)
+    started = time.monotonic()
+    gemini_result = analyze_screenshot(
+        str(_screenshot_file(scan.screenshot_path)),
+        scan.target.name,
+        previous_analysis=previous_analysis
+    )
+    return result, _analysis_result(scan, gemini_result, result, started)
+
+
+def persist_stage(scan_id: int, validators: dict = None, force_capture: bool = False) -> dict:
+    """STEP 4: Scan + target opslaan (sync, Celery persist_task)."""
+    result = _new_result()
+    result['changed'] = True
+    scan = Scan.objects.get(id=scan_id)
+    result['changed_sections'] = scan.changed_sections
+    _persist(scan, validators, force_capture, result)
+    return result
+
+
+async def perform_full_scan_async(target_id: int, force_capture: bool = False, scout_result: dict = None,
+                                 lease: str = None) -> dict:
+    """
+    Voer een complete scan uit van een target (async, één event loop).
     
     Flow:
     1. Scout check (hash) - skipped if force_capture=True
     2. Als geen wijziging → Stop
+       (ook bij een kleine wijziging of een al geanalyseerde A/B variant)
     3. Als wijziging → Capture + Gemini
     4. Save to database
     
+    Waarom async:
+    - Scout en capture zijn al async, geen asyncio.run per stap meer
+    - Gemini (blocking HTTP) draait in een thread, de loop blijft vrij
+    - Database calls via sync_to_async
+    - Zo kan één worker process meerdere targets tegelijk door de pipeline
+      duwen (zie perform_full_scans_async)
+    
+    Dezelfde stappen draaien in Celery als losse tasks per queue
+    (start/capture_stage → analyze_stage → persist_stage, zie collector/tasks.py).
+    Elke stap checkpoint op een pending Scan, zodat een retry niet opnieuw begint.
+    
+    Maximaal één scan tegelijk per target (scan lease, zie collector/scanner/lease.py).
+    De lease wordt altijd teruggegeven, ook bij een exception.
+    
     Args:
         target_id: Database ID van target
         force_capture: If True, skip scout check and go directly to capture (faster for manual scans)
+        scout_result: Result van een batch scout (scout_targets), scheelt een tweede request
+        lease: Token van een al gepakte scan lease (bijv. door de view), anders pakt hij er zelf één
         
     Returns:
         {
@@ -56,188 +924,68 @@ def perform_full_scan(target_id: int, force_capture: bool = False) -> dict:
             'scan_id': int (optional),
             'changed': bool,
             'message': str,
+            'similarity': float (optional),       # SimHash similarity t.o.v. laatste analyse
+            'changed_sections': list (optional),  # [{'key', 'change', 'preview'}]
+            'coalesced': bool (optional),         # Er liep al een scan, niks gestart
             'error': str (optional)
         }
     """
-    result = {
-        'success': False,
-        'scan_id': None,
-        'changed': False,
-        'message': '',
-        'error': None
-    }
+    token = lease or await sync_to_async(acquire_scan_lease)(target_id)
+    if token is None:
+        print(f"⏳ Target {target_id}: scan loopt al, niks gestart")
+        result = _new_result()
+        result['success'] = True
+        result['coalesced'] = True
+        result['message'] = 'Scan already running'
+        return result
+    
+    try:
+        return await _full_scan_async(target_id, force_capture=force_capture, scout_result=scout_result)
+    finally:
+        await sync_to_async(release_scan_lease)(target_id, token)
+
+
+async def _full_scan_async(target_id: int, force_capture: bool, scout_result: dict) -> dict:
+    """Pipeline van perform_full_scan_async (lease is al gepakt)"""
+    result = _new_result()
+    scan = None
     
     try:
         # Get target from database
         # Waarom try/except: Target kan verwijderd zijn
-        target = Target.objects.get(id=target_id)
-        
-        print(f"\n{'='*60}")
-        print(f"🎯 Scanning: {target.name}")
-        print(f"   URL: {target.url}")
-        if force_capture:
-            print(f"   ⚡ FAST MODE: Skipping scout check")
-        print(f"{'='*60}\n")
-        
-        new_hash = None
-        
-        if not force_capture:
-            # STEP 1: Scout check (hash)
-            # Waarom eerst: Snel en goedkoop
-            set_scan_progress(target_id, 'scout')
-            print("🔍 Step 1: Scout mode (hash check)...")
-            scout_result = scout_scan_sync(target.url)
-            
-            if not scout_result['success']:
-                result['error'] = f"Scout failed: {scout_result['error']}"
-                return result
-            
-            new_hash = scout_result['hash']
-            print(f"   ✅ Hash: {new_hash}")
-            print(f"   📸 Images: {scout_result['image_count']}")
-            
-            # Check if changed
-            # Waarom target.last_hash: Vergelijk met vorige scan
-            changed = target.last_hash != new_hash if target.last_hash else True
-            result['changed'] = changed
-            
-            if not changed:
-                # No change detected
-                print(f"\n   ✓ No changes detected")
-                print(f"   Hash matches previous scan\n")
-                
-                # Notify UI
-                set_scan_progress(target_id, 'no_change')
-                
-                result['success'] = True
-                result['message'] = 'No changes detected'
-                
-                # Update last_scan_at maar niet last_hash
-                target.last_scan_at = timezone.now()
-                target.save()
-                
-                return result
-            
-            # Change detected!
-            print(f"\n🔄 CHANGE DETECTED!")
-            print(f"   Old hash: {target.last_hash or 'None (eerste scan)'}")
-            print(f"   New hash: {new_hash}\n")
-        else:
-            # Force capture mode - skip scout, mark as changed
-            # Generate a unique hash based on timestamp (will be accurate after Gemini analyzes)
-            import hashlib
-            new_hash = hashlib.md5(f"{target.id}_{datetime.now().isoformat()}".encode()).hexdigest()
-            result['changed'] = True
-            print("⚡ Skipping scout check - going directly to capture...")
-        
-        # STEP 2: Capture screenshot
-        # Waarom nu: Alleen bij wijziging (screenshots zijn groot/duur)
-        set_scan_progress(target_id, 'capture')
-        print("📸 Step 2: Capture mode (screenshot)...")
-        
-        # Create screenshot filename met absoluut pad
-        # Waarom timestamp: Unieke naam per scan
-        # Waarom absoluut: Crawlee kan vanuit andere dir draaien
-        from django.conf import settings
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        screenshot_filename = f"{target.id}_{timestamp}.png"
-        screenshot_path = Path(settings.BASE_DIR) / 'storage' / 'screenshots' / screenshot_filename
+        target = await Target.objects.aget(id=target_id)
         
-        # Ensure screenshots directory exists
-        screenshot_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        print(f"   💾 Screenshot path: {screenshot_path}")
-        capture_result = capture_screenshot_sync(target.url, str(screenshot_path))
+        scan, validators = await start_stage_async(target, result, force_capture=force_capture, scout_result=scout_result)
+        if scan is None:
+            return result
         
-        if not capture_result['success']:
-            result['error'] = f"Capture failed: {capture_result['error']}"
-            
-            # Create failed scan record
-            scan = Scan.objects.create(
-                target=target,
-                screenshot_path='',
-                content_hash=new_hash,
-                status='failed',
-                error_message=result['error']
-            )
-            
+        if not await capture_stage_async(scan, result):
             return result
         
-        print(f"   ✅ Screenshot saved: {screenshot_filename}\n")
+        if not await visual_stage_async(scan, result, validators):
+            return result
         
         # STEP 3: Gemini analyse
         # Waarom laatste: Duurste operatie, alleen als screenshot OK is
         set_scan_progress(target_id, 'gemini')
         print("🤖 Step 3: Gemini AI analyse...")
         
-        # Haal vorige scan op voor vergelijking
-        # Waarom: Gemini heeft context nodig voor "Was X -> Is Y"
-        previous_scan = target.scans.filter(
-            status='success',
-            analysis_json__isnull=False
-        ).order_by('-scanned_at').first()
-        
-        previous_analysis = previous_scan.analysis_json if previous_scan else None
+        previous_analysis = await sync_to_async(_previous_analysis)(target)
         
-        if previous_analysis:
-            print(f"   📊 Comparing with previous scan (#{previous_scan.id})...")
-        else:
-            print(f"   📊 Baseline scan (first analysis)...")
-        
-        gemini_result = analyze_screenshot(
-            str(screenshot_path), 
+        # Waarom to_thread: De Gemini client is blocking
+        started = time.monotonic()
+        gemini_result = await asyncio.to_thread(
+            analyze_screenshot,
+            str(_screenshot_file(scan.screenshot_path)),
             target.name,
             previous_analysis=previous_analysis
         )
-        
-        if not gemini_result['success']:
-            result['error'] = f"Gemini failed: {gemini_result['error']}"
-            
-            # Create scan with screenshot but without analysis
-            scan = Scan.objects.create(
-                target=target,
-                screenshot_path=f"screenshots/{screenshot_filename}",
-                content_hash=new_hash,
-                status='success',  # Screenshot OK, alleen analyse failed
-                analysis_json=None,
-                error_message=result['error']
-            )
-            result['scan_id'] = scan.id
-            
+        analysis = await sync_to_async(_analysis_result)(scan, gemini_result, result, started)
+        if analysis is None:
             return result
         
-        analysis = gemini_result['analysis']
-        print(f"   ✅ Type: {analysis.get('type', 'unknown')}")
-        print(f"   ✅ Title: {analysis.get('title', 'N/A')}\n")
-        
         # STEP 4: Save to database
-        # Waarom nu: Alles is succesvol, nu kunnen we opslaan
-        set_scan_progress(target_id, 'saving')
-        print("💾 Step 4: Saving to database...")
-        
-        scan = Scan.objects.create(
-            target=target,
-            screenshot_path=f"screenshots/{screenshot_filename}",
-            content_hash=new_hash,
-            status='success',
-            analysis_json=analysis
-        )
-        
-        # Update target
-        # Waarom beide: last_hash voor volgende compare, last_scan_at voor scheduling
-        target.last_hash = new_hash
-        target.last_scan_at = timezone.now()
-        target.save()
-        
-        print(f"   ✅ Scan #{scan.id} created")
-        print(f"   ✅ Target updated\n")
-        
-        # Mark scan as complete
-        set_scan_progress(target_id, 'complete')
-        
-        result['success'] = True
-        result['scan_id'] = scan.id
-        result['message'] = f"Change detected and analyzed (Scan #{scan.id})"
+        await sync_to_async(_persist)(scan, validators, force_capture, result)
         
     except Target.DoesNotExist:
         result['error'] = f'Target {target_id} not found'
@@ -245,10 +993,55 @@ def perform_full_scan(target_id: int, force_capture: bool = False) -> dict:
         result['error'] = f'Unexpected error: {str(e)}'
         import traceback
         traceback.print_exc()
+        
+        # Geen retry hier: pending scan niet laten hangen
+        if scan is not None:
+            await sync_to_async(fail_scan)(scan.id, result['error'])
     
     return result
 
 
+async def perform_full_scans_async(scans: dict, concurrency: int = None, force_capture: bool = False) -> dict:
+    """
+    Meerdere targets tegelijk door de pipeline (één event loop).
+    
+    Waarom begrensd: Capture wacht al op de browser pool, maar zonder
+    limiet zouden alle Gemini calls en screenshots tegelijk starten.
+    
+    Args:
+        scans: {target_id: scout_result} (bijv. scout_targets()['changed']),
+            scout_result mag None zijn
+        concurrency: Max targets tegelijk in de pipeline (default: SCAN_PIPELINE_CONCURRENCY)
+        
+    Returns:
+        {target_id: result} met per target het result van perform_full_scan_async
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.SCAN_PIPELINE_CONCURRENCY)
+    
+    async def run(target_id, scout_result):
+        async with semaphore:
+            return await perform_full_scan_async(target_id, force_capture=force_capture, scout_result=scout_result)
+    
+    target_ids = list(scans)
+    results = await asyncio.gather(*(run(target_id, scans[target_id]) for target_id in target_ids))
+    return dict(zip(target_ids, results))
+
+
+def perform_full_scan(target_id: int, force_capture: bool = False, scout_result: dict = None, lease: str = None) -> dict:
+    """
+    Synchronous wrapper voor perform_full_scan_async.
+    
+    Waarom nodig: Celery tasks, views en commands zijn sync.
+    Eén asyncio.run voor de hele pipeline (scout + capture + Gemini + DB).
+    """
+    return asyncio.run(perform_full_scan_async(target_id, force_capture=force_capture, scout_result=scout_result, lease=lease))
+
+
+def perform_full_scans(scans: dict, concurrency: int = None, force_capture: bool = False) -> dict:
+    """Synchronous wrapper voor perform_full_scans_async."""
+    return asyncio.run(perform_full_scans_async(scans, concurrency=concurrency, force_capture=force_capture))
+
+
 # CLI interface
 if __name__ == '__main__':
     if len(sys.argv) < 2:
@@ -0,0 +1,72 @@
+"""
+Scan lease - Maximaal één scan tegelijk per target
+
+Dashboard (trigger_scan, create_target), de scheduler en Celery retries
+kunnen anders tegelijk dezelfde target scannen: dubbele screenshots,
+dubbele Gemini calls en racende last_hash writes.
+
+Hoe: Een compare-and-set op de target rij (Target.scan_lease_token /
+scan_lease_until). De UPDATE lukt alleen als er geen geldige lease is,
+dat is atomair in elke database (geen Redis nodig).
+
+Waarom een verloopdatum (SCAN_LEASE_TTL = CELERY_TASK_TIME_LIMIT):
+Een gecrashte worker geeft de lease nooit terug, na de TTL mag een
+nieuwe scan weer. Elke pipeline stage verlengt de lease (renew).
+
+Een tweede aanvraag tijdens een lopende scan start niks nieuws: de caller
+krijgt de progress van de lopende scan (coalescing).
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from shared.models import Target
+
+
+def _free(now):
+    return Q(scan_lease_until__isnull=True) | Q(scan_lease_until__lte=now)
+
+
+def acquire_scan_lease(target_id: int) -> str:
+    """
+    Probeer de lease van een target te pakken.
+
+    Returns:
+        Token (doorgeven aan de volgende stages), of None als er al een scan loopt
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    acquired = Target.objects.filter(_free(now), id=target_id).update(
+        scan_lease_token=token,
+        scan_lease_until=now + timedelta(seconds=settings.SCAN_LEASE_TTL)
+    )
+    return token if acquired else None
+
+
+def renew_scan_lease(target_id: int, token: str) -> bool:
+    """Lease verlengen (begin van elke stage). False = lease kwijt (verlopen en overgenomen)"""
+    if not token:
+        return False
+    now = timezone.now()
+    return bool(Target.objects.filter(id=target_id, scan_lease_token=token).update(
+        scan_lease_until=now + timedelta(seconds=settings.SCAN_LEASE_TTL)
+    ))
+
+
+def release_scan_lease(target_id: int, token: str):
+    """Lease teruggeven (alleen als hij nog van ons is)"""
+    if not token:
+        return
+    Target.objects.filter(id=target_id, scan_lease_token=token).update(
+        scan_lease_token=None,
+        scan_lease_until=None
+    )
+
+
+def scan_in_progress(target_id: int) -> bool:
+    """Loopt er nu een scan voor deze target?"""
+    return Target.objects.filter(id=target_id, scan_lease_until__gt=timezone.now()).exists()
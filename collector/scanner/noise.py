@@ -0,0 +1,140 @@
+"""
+Noise Rules - Per-target filters vóór het hashen
+
+Veel targets veranderen elke request zonder commerciële wijziging:
+timestamps, CSRF tokens, "12 mensen bekijken dit", cache-busting
+image URLs (?v=123), carrousels in willekeurige volgorde. Elke keer
+een andere hash = capture + Gemini voor niks.
+
+Target.noise_rules (JSON):
+    {
+        "drop_selectors": [".countdown", "#viewers", "[data-timestamp]"],
+        "text_patterns": ["\\d+ mensen bekijken dit", {"pattern": "\\d{2}:\\d{2}", "replace": "HH:MM"}],
+        "image_strip_query": true,   # /a.png?v=123 -> /a.png
+        "image_sort": true           # volgorde van images telt niet mee
+    }
+
+Waar toegepast:
+- drop_selectors: tijdens het extracten (element + alles erin telt niet mee)
+- text_patterns / image_*: alleen op de hash, 'text' en 'images' blijven
+  ongefilterd zodat replay_noise_rules nieuwe rules kan uitproberen
+"""
+
+import re
+
+
+RULE_KEYS = {'drop_selectors', 'text_patterns', 'image_strip_query', 'image_sort'}
+
+# Simpele selectors: tag, #id, .class, [attr], [attr=value] (ook gecombineerd)
+# Waarom geen combinators: Matchen gebeurt streaming per element, zonder tree
+SELECTOR_PART = re.compile(
+    r'(?P<tag>^[a-zA-Z][a-zA-Z0-9-]*)'
+    r'|#(?P<id>[\w-]+)'
+    r'|\.(?P<cls>[\w-]+)'
+    r'|\[(?P<attr>[\w:-]+)(?:=(?P<quote>["\']?)(?P<value>[^"\'\]]*)(?P=quote))?\]'
+)
+
+
+class Selector:
+    """Eén simpele CSS selector, gematcht op (tag, attrib) uit de parser events."""
+
+    def __init__(self, selector: str):
+        self.selector = selector.strip()
+        self.tag = None
+        self.id = None
+        self.classes = set()
+        self.attrs = []
+
+        position = 0
+        while position < len(self.selector):
+            match = SELECTOR_PART.match(self.selector, position)
+            if not match or match.end() == position:
+                raise ValueError(f"Unsupported selector '{selector}' (use tag, #id, .class, [attr], [attr=value])")
+            if match['tag']:
+                self.tag = match['tag'].lower()
+            elif match['id']:
+                self.id = match['id']
+            elif match['cls']:
+                self.classes.add(match['cls'])
+            else:
+                self.attrs.append((match['attr'].lower(), match['value']))
+            position = match.end()
+
+        if not self.selector:
+            raise ValueError('Empty selector')
+
+    def matches(self, tag, attrib) -> bool:
+        if self.tag and tag != self.tag:
+            return False
+        if self.id and attrib.get('id') != self.id:
+            return False
+        if self.classes and not self.classes.issubset((attrib.get('class') or '').split()):
+            return False
+        for name, value in self.attrs:
+            if name not in attrib or (value is not None and attrib[name] != value):
+                return False
+        return True
+
+
+class NoiseRules:
+    """
+    Gecompileerde noise rules van één target.
+
+    Gebruik build_noise_rules(target.noise_rules): None als er niks te filteren is.
+    """
+
+    def __init__(self, rules: dict):
+        unknown = set(rules) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Unknown noise rule(s): {', '.join(sorted(unknown))}")
+
+        self.selectors = [Selector(s) for s in rules.get('drop_selectors') or []]
+
+        self.text_patterns = []
+        for pattern in rules.get('text_patterns') or []:
+            replace = ''
+            if isinstance(pattern, dict):
+                pattern, replace = pattern.get('pattern', ''), pattern.get('replace', '')
+            try:
+                self.text_patterns.append((re.compile(pattern), replace))
+            except re.error as e:
+                raise ValueError(f"Invalid text pattern '{pattern}': {e}")
+
+        self.image_strip_query = bool(rules.get('image_strip_query'))
+        self.image_sort = bool(rules.get('image_sort'))
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.selectors or self.text_patterns or self.image_strip_query or self.image_sort)
+
+    def drops(self, tag, attrib) -> bool:
+        """Moet dit element (inclusief alles erin) genegeerd worden?"""
+        return any(selector.matches(tag, attrib) for selector in self.selectors)
+
+    def normalize_text(self, text: str) -> str:
+        for pattern, replace in self.text_patterns:
+            text = pattern.sub(replace, text)
+        # Waarom opnieuw normaliseren: Een weggehaalde token laat dubbele spaties achter
+        return ' '.join(text.split())
+
+    def normalize_images(self, images: list) -> list:
+        if self.image_strip_query:
+            images = [re.split(r'[?#]', src, maxsplit=1)[0] for src in images]
+        if self.image_sort:
+            images = sorted(images)
+        return images
+
+
+def build_noise_rules(rules: dict):
+    """
+    NoiseRules uit Target.noise_rules, of None als er geen rules zijn.
+
+    Raises:
+        ValueError: Onbekende rule, ongeldige selector of regex
+    """
+    if not rules:
+        return None
+    if not isinstance(rules, dict):
+        raise ValueError('Noise rules must be a JSON object')
+    compiled = NoiseRules(rules)
+    return None if compiled.is_empty else compiled
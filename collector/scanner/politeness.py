@@ -0,0 +1,240 @@
+"""
+Politeness limiter - Token bucket per domein, gedeeld door alle workers
+
+Meerdere targets op hetzelfde domein (ziggo.nl/internet, ziggo.nl/tv, ...)
+werden door scout én capture workers tegelijk opgevraagd. Dat levert rate
+limits en blocks op, en een block is de duurste fout die we hebben
+(zie ook de circuit breaker in breaker.py).
+
+Hoe:
+- Elke request (scout_scan_many, capture_screenshot) vraagt eerst een token
+  voor z'n domein (acquire). Is de bucket leeg, dan wacht hij tot er een
+  token bij komt.
+- De bucket staat in Redis (één Lua script: atomair, klok van Redis), zodat
+  alle workers op alle machines dezelfde limiet delen.
+- Redis weg (lokaal, storing): in-memory bucket per process. Minder strikt,
+  maar scannen gaat door.
+- Langer wachten dan POLITENESS_MAX_WAIT: het token wordt niet gereserveerd
+  en acquire raist PolitenessDeferred. Scout en capture slaan de URL deze
+  ronde over (geen failure voor de circuit breaker), de volgende interval
+  probeert hem opnieuw.
+
+Waarom reserveren (tokens mogen negatief): Eén round-trip per request, en
+wachtende requests komen in volgorde aan de beurt.
+Waarom niet reserveren boven de max: Anders loopt de schuld op en gaan alle
+requests na POLITENESS_MAX_WAIT tegelijk, precies de piek die we willen
+voorkomen.
+
+Limieten: POLITENESS_RATE (tokens/sec) en POLITENESS_BURST per domein,
+uitzonderingen in POLITENESS_LIMITS ({'ziggo.nl': {'rate': 0.5, 'burst': 1}}).
+Wachttijden per domein: wait_stats() / python manage.py politeness_stats
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from collector.scanner.breaker import domain_of
+
+logger = logging.getLogger(__name__)
+
+BUCKET_KEY = 'meerkat:politeness:bucket:'
+STATS_KEY = 'meerkat:politeness:stats:'
+
+# KEYS: bucket, stats - ARGV: rate, burst, max_wait
+# Returns: wachttijd in seconden (string, Lua floats worden anders afgekapt),
+# boven max_wait is het token niet gereserveerd
+# Waarom EXPIRE op de schuld: Pas weg als de bucket weer vol zou zijn,
+# anders begint een domein met schuld na een stille minuut weer met burst
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate) - 1
+local wait = 0
+if tokens < 0 then wait = -tokens / rate end
+if wait > max_wait then tokens = tokens + 1 end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 60)
+if wait > max_wait then
+    redis.call('HINCRBY', KEYS[2], 'deferred', 1)
+    return tostring(wait)
+end
+redis.call('HINCRBY', KEYS[2], 'acquired', 1)
+if wait > 0 then
+    redis.call('HINCRBY', KEYS[2], 'waited', 1)
+    redis.call('HINCRBYFLOAT', KEYS[2], 'total_wait', tostring(wait))
+    local max_wait = tonumber(redis.call('HGET', KEYS[2], 'max_wait')) or 0
+    if wait > max_wait then redis.call('HSET', KEYS[2], 'max_wait', tostring(wait)) end
+end
+return tostring(wait)
+"""
+
+_client = None
+_script = None
+_redis_down_until = 0.0
+_lock = threading.Lock()
+_buckets = {}   # domain -> [tokens, ts] (in-memory fallback)
+_stats = {}     # domain -> {'acquired', 'waited', 'total_wait', 'max_wait', 'deferred'}
+
+
+class PolitenessDeferred(Exception):
+    """Wachten op een token duurt langer dan POLITENESS_MAX_WAIT (token niet gereserveerd)"""
+
+    def __init__(self, domain: str, wait: float):
+        self.domain = domain
+        self.wait = wait
+        super().__init__(f'Politeness: {domain} pas over {wait:.0f}s aan de beurt, overgeslagen')
+
+
+def limits_for(domain: str) -> tuple:
+    """
+    (rate, burst) voor een domein.
+
+    Een limiet voor ziggo.nl geldt ook voor www2.ziggo.nl.
+    """
+    parts = domain.split('.')
+    for i in range(len(parts) - 1):
+        limit = settings.POLITENESS_LIMITS.get('.'.join(parts[i:]))
+        if limit:
+            return (
+                float(limit.get('rate', settings.POLITENESS_RATE)),
+                float(limit.get('burst', settings.POLITENESS_BURST)),
+            )
+    return float(settings.POLITENESS_RATE), float(settings.POLITENESS_BURST)
+
+
+def _get_redis():
+    """Redis client + geregistreerd script (lazy)"""
+    global _client, _script
+    if _client is None:
+        import redis
+        _client = redis.Redis.from_url(settings.POLITENESS_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+        _script = _client.register_script(TOKEN_BUCKET_SCRIPT)
+    return _script
+
+
+def _reserve_redis(domain: str, rate: float, burst: float, max_wait: float) -> float:
+    return float(_get_redis()(keys=[BUCKET_KEY + domain, STATS_KEY + domain], args=[rate, burst, max_wait]))
+
+
+def _reserve_memory(domain: str, rate: float, burst: float, max_wait: float) -> float:
+    """Zelfde bucket als het Lua script, maar alleen voor dit process"""
+    now = time.monotonic()
+    with _lock:
+        tokens, ts = _buckets.get(domain, (burst, now))
+        tokens = min(burst, tokens + max(0.0, now - ts) * rate) - 1
+        wait = -tokens / rate if tokens < 0 else 0.0
+        if wait > max_wait:
+            tokens += 1
+        _buckets[domain] = (tokens, now)
+
+        stats = _stats.setdefault(
+            domain, {'acquired': 0, 'waited': 0, 'total_wait': 0.0, 'max_wait': 0.0, 'deferred': 0}
+        )
+        if wait > max_wait:
+            stats['deferred'] += 1
+            return wait
+        stats['acquired'] += 1
+        if wait > 0:
+            stats['waited'] += 1
+            stats['total_wait'] += wait
+            stats['max_wait'] = max(stats['max_wait'], wait)
+    return wait
+
+
+def reserve(url: str) -> float:
+    """
+    Token reserveren voor het domein van deze URL.
+
+    Waarom fallback met pauze: Zonder Redis zou elke request eerst een
+    connect timeout betalen, nu proberen we het pas na 30 sec opnieuw.
+
+    Returns:
+        Seconden die de caller moet wachten vóór de request. Meer dan
+        POLITENESS_MAX_WAIT: niks gereserveerd, de request moet niet gaan.
+    """
+    global _redis_down_until
+    domain = domain_of(url)
+    rate, burst = limits_for(domain)
+    max_wait = float(settings.POLITENESS_MAX_WAIT)
+
+    if time.monotonic() >= _redis_down_until:
+        try:
+            return _reserve_redis(domain, rate, burst, max_wait)
+        except Exception as e:
+            if not _redis_down_until:
+                logger.warning(f"Politeness limiter: Redis niet bereikbaar, in-memory fallback ({e})")
+            _redis_down_until = time.monotonic() + 30
+    return _reserve_memory(domain, rate, burst, max_wait)
+
+
+async def acquire(url: str) -> float:
+    """
+    Wacht tot er een token is voor het domein van deze URL.
+
+    Waarom begrensd (POLITENESS_MAX_WAIT): Een lange rij voor één domein mag
+    een scout batch of capture niet laten time-outen. Dan gaat de request
+    niet, de rij wordt er korter van.
+
+    Returns:
+        Gewachte seconden
+
+    Raises:
+        PolitenessDeferred: Wachttijd boven POLITENESS_MAX_WAIT
+    """
+    if not settings.POLITENESS_ENABLED:
+        return 0.0
+    wait = await asyncio.to_thread(reserve, url)
+    if wait > settings.POLITENESS_MAX_WAIT:
+        raise PolitenessDeferred(domain_of(url), wait)
+    if wait > 0:
+        await asyncio.sleep(wait)
+    return wait
+
+
+def wait_stats() -> dict:
+    """
+    Wachttijden per domein sinds de laatste reset.
+
+    Uit Redis (alle workers), of uit dit process als Redis weg is.
+
+    Returns:
+        {domain: {'acquired', 'waited', 'total_wait', 'max_wait', 'deferred'}}
+    """
+    try:
+        client = _get_redis().registered_client
+        stats = {}
+        for key in client.scan_iter(f'{STATS_KEY}*'):
+            values = client.hgetall(key)
+            stats[key.decode()[len(STATS_KEY):]] = {
+                'acquired': int(values.get(b'acquired', 0)),
+                'waited': int(values.get(b'waited', 0)),
+                'total_wait': float(values.get(b'total_wait', 0)),
+                'max_wait': float(values.get(b'max_wait', 0)),
+                'deferred': int(values.get(b'deferred', 0)),
+            }
+        return stats
+    except Exception:
+        with _lock:
+            return {domain: dict(stats) for domain, stats in _stats.items()}
+
+
+def reset_stats():
+    """Wachttijden op nul (Redis én dit process)"""
+    with _lock:
+        _stats.clear()
+    try:
+        client = _get_redis().registered_client
+        for key in client.scan_iter(f'{STATS_KEY}*'):
+            client.delete(key)
+    except Exception:
+        pass
@@ -0,0 +1,190 @@
+"""
+Readiness - Wachten tot de pagina klaar is voor de screenshot
+
+Voorheen vaste sleeps: 0,15-0,5 sec per scroll stap, 1,5 sec "voor de
+images" en 1 sec na een navigatie. Samen seconden per capture, en op
+trage pagina's nog steeds te kort.
+
+Nu wachten we op echte signalen:
+- Netwerk: max CAPTURE_READY_MAX_INFLIGHT openstaande requests, en
+  CAPTURE_READY_NETWORK_QUIET_MS lang geen nieuwe (page request events)
+- DOM: CAPTURE_READY_DOM_QUIET_MS lang geen mutaties (MutationObserver,
+  al vóór de navigatie geïnstalleerd)
+- Images: alle <img> geladen en gedecodeerd (img.decode())
+- Lazy loading: loading="lazy" wordt eager. Per scroll stap wachten we
+  twee frames (dan hebben de IntersectionObservers gevuurd) en tot de
+  requests die dat opleverde klaar zijn.
+
+Scrollen + settelen samen duurt nooit langer dan CAPTURE_READY_MAX_MS.
+Hoe lang het duurde en waar we op wachtten komt in Scan.capture_stats.
+"""
+
+import asyncio
+import time
+
+from django.conf import settings
+
+# Draait in elk nieuw document, vóór de scripts van de pagina
+# Waarom alleen src/srcset als attributen: Carrousels en animaties wijzigen
+# continu class/style, dan zou de DOM nooit stil zijn
+OBSERVER_SCRIPT = """
+(() => {
+    window.__meerkatLastMutation = performance.now();
+    new MutationObserver(() => { window.__meerkatLastMutation = performance.now(); }).observe(document, {
+        childList: true, subtree: true, characterData: true, attributes: true, attributeFilter: ['src', 'srcset'],
+    });
+})();
+"""
+
+# Lazy images/iframes meteen laden, returns de pagina hoogte
+EAGER_SCRIPT = """
+() => {
+    document.querySelectorAll('img[loading="lazy"], iframe[loading="lazy"]').forEach((el) => { el.loading = 'eager'; });
+    return document.body ? document.body.scrollHeight : 0;
+}
+"""
+
+# Scroll en wacht twee frames (IntersectionObserver callbacks draaien in de
+# rendering stap), returns de (mogelijk gegroeide) pagina hoogte
+# Waarom de timeout: Zonder rendering (achtergrond tab) komt er geen frame
+SCROLL_SCRIPT = """
+(y) => new Promise((resolve) => {
+    const done = () => resolve(document.body ? document.body.scrollHeight : 0);
+    window.scrollTo(0, y);
+    requestAnimationFrame(() => requestAnimationFrame(done));
+    setTimeout(done, 100);
+})
+"""
+
+STATE_SCRIPT = """
+() => ({
+    domIdle: performance.now() - (window.__meerkatLastMutation || 0),
+    imagesPending: Array.from(document.images).filter((img) => (img.currentSrc || img.src) && !img.complete).length,
+})
+"""
+
+# Alle images decoderen (begrensd), returns of het binnen de tijd lukte
+DECODE_SCRIPT = """
+(timeoutMs) => Promise.race([
+    Promise.all(Array.from(document.images)
+        .filter((img) => img.currentSrc || img.src)
+        .map((img) => img.decode().catch(() => null))).then(() => true),
+    new Promise((resolve) => setTimeout(() => resolve(false), timeoutMs)),
+])
+"""
+
+VIEWPORT_HEIGHT = 1080
+POLL_SECONDS = 0.05
+
+
+class PageReadiness:
+    """
+    Volgt één page: openstaande requests (Python kant) en DOM mutaties (in de pagina).
+
+    Gebruik: install() vóór page.goto, settle() vlak voor de screenshot.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.in_flight = set()
+        self.last_activity = time.monotonic()
+        page.on('request', self._started)
+        page.on('requestfinished', self._finished)
+        page.on('requestfailed', self._finished)
+
+    async def install(self):
+        await self.page.add_init_script(OBSERVER_SCRIPT)
+
+    def _started(self, request):
+        self.in_flight.add(request)
+        self.last_activity = time.monotonic()
+
+    def _finished(self, request):
+        self.in_flight.discard(request)
+        self.last_activity = time.monotonic()
+
+    def network_idle_for(self) -> float:
+        """Seconden zonder netwerk activiteit (0 zolang er te veel requests openstaan)"""
+        if len(self.in_flight) > settings.CAPTURE_READY_MAX_INFLIGHT:
+            return 0.0
+        return time.monotonic() - self.last_activity
+
+    async def _wait_requests(self, deadline: float) -> bool:
+        """Wacht tot er niet meer dan CAPTURE_READY_MAX_INFLIGHT requests openstaan (of de deadline)"""
+        while len(self.in_flight) > settings.CAPTURE_READY_MAX_INFLIGHT:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(POLL_SECONDS)
+        return True
+
+    async def _state(self) -> dict:
+        """DOM/images status uit de pagina (None als de pagina net navigeert)"""
+        try:
+            return await self.page.evaluate(STATE_SCRIPT)
+        except Exception:
+            return None
+
+    async def _scroll(self, deadline: float, max_steps: int) -> int:
+        """Scroll door de pagina voor lazy loading, returns het aantal stappen"""
+        height = await self.page.evaluate(EAGER_SCRIPT)
+        step_seconds = settings.CAPTURE_READY_SCROLL_STEP_MS / 1000
+        position = steps = 0
+        while position + VIEWPORT_HEIGHT < height and steps < max_steps and time.monotonic() < deadline:
+            position += VIEWPORT_HEIGHT
+            steps += 1
+            height = await self.page.evaluate(SCROLL_SCRIPT, position)
+            # Alleen wachten als de stap requests opleverde, max één stap lang
+            await self._wait_requests(min(deadline, time.monotonic() + step_seconds))
+        await self.page.evaluate(SCROLL_SCRIPT, 0)
+        return steps
+
+    async def settle(self, max_steps: int = 20) -> dict:
+        """
+        Scroll voor lazy loading en wacht tot netwerk, DOM en images stil zijn.
+
+        Gooit niet: een fout (navigatie) of de bovengrens betekent gewoon
+        screenshot nemen met wat er is.
+
+        Returns:
+            {'ready_seconds': float, 'ready_timeout': bool, 'ready_pending': [...], 'scroll_steps': int}
+            ready_pending: waar we bij de bovengrens nog op wachtten ('network', 'dom', 'images')
+        """
+        started = time.monotonic()
+        deadline = started + settings.CAPTURE_READY_MAX_MS / 1000
+        network_quiet = settings.CAPTURE_READY_NETWORK_QUIET_MS / 1000
+        dom_quiet = settings.CAPTURE_READY_DOM_QUIET_MS
+
+        steps = 0
+        try:
+            steps = await self._scroll(deadline, max_steps)
+        except Exception as e:
+            print(f"   ⚠️ Scroll skipped (navigation detected): {str(e)[:50]}")
+
+        pending = ['network', 'dom', 'images']
+        while time.monotonic() < deadline:
+            pending = []
+            if self.network_idle_for() < network_quiet:
+                pending.append('network')
+            state = await self._state()
+            if state is None or state['domIdle'] < dom_quiet:
+                pending.append('dom')
+            if state is None or state['imagesPending']:
+                pending.append('images')
+            if not pending:
+                break
+            await asyncio.sleep(POLL_SECONDS)
+
+        if not pending:
+            remaining_ms = max(int((deadline - time.monotonic()) * 1000), 0)
+            try:
+                if not await self.page.evaluate(DECODE_SCRIPT, remaining_ms):
+                    pending.append('images')
+            except Exception:
+                pending.append('images')
+
+        return {
+            'ready_seconds': round(time.monotonic() - started, 2),
+            'ready_timeout': bool(pending),
+            'ready_pending': pending,
+            'scroll_steps': steps,
+        }
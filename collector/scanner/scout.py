@@ -1,139 +1,331 @@
 """
 Scout Mode - Hash-based Change Detection
 
-Gebruikt Crawlee's BeautifulSoupCrawler om te checken of een pagina is veranderd.
+Gebruikt Crawlee's HttpCrawler + een extractor backend (extractors.py)
+om te checken of een pagina is veranderd.
 Geen browser = sneller, goedkoper.
+
+scout_scan_many() scant veel targets in één crawl (gedeelde HTTP client,
+één event loop). scout_scan() is de single-URL variant daarvan.
+
+Conditional GET:
+- We sturen If-None-Match / If-Modified-Since mee (ETag / Last-Modified van vorige keer)
+- 304 Not Modified → geen body, geen parsing, geen hashing
+- Zelfde body digest als vorige keer → geen parsing, geen hashing
+
+Noise rules (per URL, zie noise.py) worden vóór het hashen toegepast.
+
+Politeness: Elke request wacht op een token voor z'n domein (politeness.py),
+gedeeld met capture en alle andere workers. Is de rij te lang, dan wordt de
+URL deze ronde overgeslagen (result 'deferred').
 """
 
 import hashlib
 import asyncio
-from bs4 import BeautifulSoup
-from crawlee.crawlers import BeautifulSoupCrawler
+import uuid
+from crawlee import ConcurrencySettings, Request
+from crawlee.crawlers import HttpCrawler
+from crawlee.storage_clients import MemoryStorageClient
+from django.conf import settings
+from collector.scanner.breaker import domain_of
+from collector.scanner.extractors import get_extractor
+from collector.scanner.noise import build_noise_rules
+from collector.scanner.politeness import PolitenessDeferred, acquire
 
 
-def extract_content(soup: BeautifulSoup) -> dict:
+def extract_content(html, backend: str = None, rules=None) -> dict:
     """
-    Extract visible text en image URLs van BeautifulSoup object.
+    Extract visible text en image URLs van een pagina.
     
     Args:
-        soup: BeautifulSoup parsed HTML
+        html: Ruwe HTML (bytes/str) of een BeautifulSoup object
+        backend: 'lxml' (streaming, snel) of 'soup' (BeautifulSoup)
+            Default: settings.SCOUT_EXTRACTOR
+        rules: NoiseRules van de target (build_noise_rules), of None
         
     Returns:
         {
-            'text': str,      # Alle zichtbare tekst
-            'images': list,   # Alle image URLs
-            'hash': str       # MD5 hash
+            'text': str,         # Alle zichtbare tekst
+            'images': list,      # Alle image URLs
+            'hash': str,         # MD5 hash
+            'simhash': str,      # SimHash fingerprint (fingerprint.py)
+            'sections': list,    # Hash per DOM sectie (sections.py)
+            'merkle_root': str   # Root over de section hashes
         }
     """
-    # Verwijder scripts en styles (niet zichtbaar voor gebruiker)
-    for script in soup(['script', 'style', 'meta', 'noscript', 'head']):
-        script.decompose()
-    
-    # Extract visible text
-    text = soup.get_text(separator=' ', strip=True)
-    # Normalize whitespace (meerdere spaties -> 1 spatie)
-    text = ' '.join(text.split())
-    
-    # Extract image URLs
-    images = []
-    for img in soup.find_all('img', src=True):
-        images.append(img['src'])
-    
-    # Maak hash van tekst + images gecombineerd
-    # Waarom: Als tekst OF images veranderen, verandert hash
-    content = f"{text}|{'|'.join(images)}"
-    content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
-    
+    # Waarom pluggable: Beide backends geven identieke output,
+    # de lxml backend is alleen veel sneller op grote pagina's
+    return get_extractor(backend).extract(html, rules)
+
+
+def _empty_result() -> dict:
+    """Standaard scout result (nog niet gelukt)."""
     return {
-        'text': text,
-        'images': images,
-        'image_count': len(images),
-        'hash': content_hash
+        'success': False,
+        'hash': None,
+        'text_preview': None,
+        'image_count': 0,
+        'error': None,
+        'deferred': False,         # Domein te druk (politeness.py): niet opgevraagd, geen failure
+        # Conditional GET
+        'etag': None,
+        'last_modified': None,
+        'body_digest': None,
+        'not_modified': False,     # Server gaf 304
+        'body_unchanged': False,   # Zelfde body als vorige keer
+        # Alleen als de body geparsed is
+        'simhash': None,           # Fingerprint voor similarity (fingerprint.py)
+        'text': None,              # Volledige tekst (ongefilterd, voor replay_noise_rules)
+        'images': None,
+        'sections': None,
+        'merkle_root': None,
     }
 
 
-async def scout_scan(target_url: str) -> dict:
+def _interleave_domains(urls: list) -> list:
     """
-    Scout scan: Check of pagina is veranderd via hash.
+    URLs om en om per domein (a1, b1, a2, b2, ...).
     
-    Gebruikt Crawlee's BeautifulSoupCrawler voor:
-    - Automatische user-agent rotation
-    - Error handling
-    - Rate limiting
+    Waarom: Requests voor hetzelfde domein wachten op de politeness limiter.
+    Achter elkaar zouden ze alle concurrency slots bezetten terwijl andere
+    domeinen gewoon door hadden gekund.
+    """
+    per_domain = {}
+    for url in urls:
+        per_domain.setdefault(domain_of(url), []).append(url)
+    queues = list(per_domain.values())
+    interleaved = []
+    for i in range(max((len(queue) for queue in queues), default=0)):
+        interleaved.extend(queue[i] for queue in queues if i < len(queue))
+    return interleaved
+
+
+def _conditional_headers(validators: dict) -> dict:
+    """If-None-Match / If-Modified-Since headers op basis van vorige response."""
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+
+async def scout_scan_many(urls: list, concurrency: int = None, validators: dict = None, rules: dict = None) -> dict:
+    """
+    Batch scout: Check tientallen/honderden pagina's in één crawl.
+    
+    Waarom batch:
+    - Eén event loop en één crawler voor alle targets
+    - De HTTP client (en dus de keep-alive connection pool) wordt gedeeld
+    - Crawlee regelt de concurrency (max `concurrency` requests tegelijk)
     
     Args:
-        target_url: URL om te scannen
+        urls: Lijst van URLs om te scannen (dubbele URLs worden één keer gescand)
+        concurrency: Max aantal gelijktijdige requests (default: SCOUT_CONCURRENCY)
+        validators: {url: {'etag', 'last_modified', 'body_digest', 'hash'}} van de
+            vorige scout. 'hash' is de content hash die bij die response hoort.
+        rules: {url: Target.noise_rules} - filters vóór het hashen
         
     Returns:
-        {
-            'success': bool,
-            'hash': str,           # MD5 hash van content
-            'text_preview': str,   # Eerste 200 chars
-            'image_count': int,    # Aantal images gevonden
-            'error': str           # Error message (als failed)
-        }
+        {url: result} met per URL hetzelfde result als scout_scan()
     """
-    result = {
-        'success': False,
-        'hash': None,
-        'text_preview': None,
-        'image_count': 0,
-        'error': None
-    }
+    if concurrency is None:
+        concurrency = settings.SCOUT_CONCURRENCY
+    validators = validators or {}
+    
+    unique_urls = list(dict.fromkeys(urls))
+    results = {url: _empty_result() for url in unique_urls}
+    if not unique_urls:
+        return results
     
-    # Storage voor content (wordt gevuld door request_handler)
-    content_data = {}
+    # Rules één keer compileren, ongeldige rules = failed scout (zichtbaar in de UI)
+    compiled_rules = {}
+    for url, url_rules in (rules or {}).items():
+        if url not in results:
+            continue
+        try:
+            compiled_rules[url] = build_noise_rules(url_rules)
+        except ValueError as e:
+            results[url]['error'] = f'Invalid noise rules: {e}'
+    unique_urls = [url for url in unique_urls if not results[url]['error']]
+    if not unique_urls:
+        return results
     
     async def request_handler(context) -> None:
         """
         Handler die Crawlee aanroept voor elke request.
         
-        Waarom async: Crawlee gebruikt asyncio voor performance
+        Waarom user_data: Na redirects is context.request.url niet meer
+        de URL die we erin stopten, dus we onthouden de originele URL.
         """
-        # context.soup is de BeautifulSoup object van de pagina
-        content = extract_content(context.soup)
-        content_data.update(content)
+        url = context.request.user_data['scout_url']
+        result = results[url]
+        known = validators.get(url) or {}
+        response = context.http_response
+        
+        # Validators bewaren voor de volgende run
+        # Waarom fallback naar known: Een 304 hoeft ze niet opnieuw te sturen
+        result['etag'] = response.headers.get('etag') or known.get('etag')
+        result['last_modified'] = response.headers.get('last-modified') or known.get('last_modified')
+        
+        if response.status_code == 304 and known.get('hash'):
+            # Niet gewijzigd: geen body, dus ook niks te parsen of hashen
+            result.update({
+                'success': True,
+                'hash': known['hash'],
+                'body_digest': known.get('body_digest'),
+                'not_modified': True,
+            })
+            return
+        
+        body = await response.read()
+        body_digest = hashlib.md5(body).hexdigest()
+        result['body_digest'] = body_digest
+        
+        if known.get('hash') and body_digest == known.get('body_digest'):
+            # Server ondersteunt geen 304, maar de body is byte-voor-byte gelijk
+            result.update({
+                'success': True,
+                'hash': known['hash'],
+                'body_unchanged': True,
+            })
+            return
+        
+        content = extract_content(body, rules=compiled_rules.get(url))
+        result.update({
+            'success': True,
+            'hash': content['hash'],
+            'simhash': content['simhash'],
+            'text_preview': content['text'][:200] + '...',
+            'image_count': content['image_count'],
+            'text': content['text'],
+            'images': content['images'],
+            'sections': content['sections'],
+            'merkle_root': content['merkle_root']
+        })
+    
+    async def politeness_hook(context) -> None:
+        """Vóór elke request (ook retries): wachten op een token voor het domein"""
+        try:
+            await acquire(context.request.url)
+        except PolitenessDeferred:
+            # Waarom geen retry: Die zou meteen weer achteraan de rij staan
+            context.request.no_retry = True
+            raise
+    
+    async def failed_request_handler(context, error) -> None:
+        """Na alle retries mislukt (netwerk, HTTP errors, parsing, etc)."""
+        url = context.request.user_data['scout_url']
+        results[url]['error'] = str(error)
+        results[url]['deferred'] = isinstance(error, PolitenessDeferred)
     
     try:
-        # Setup BeautifulSoupCrawler
+        # Setup HttpCrawler
+        # Waarom HttpCrawler (geen BeautifulSoupCrawler): Die parst elke response
+        # al vóór onze handler, ook een 304 of een ongewijzigde body.
         # Waarom deze settings:
-        # - max_requests_per_crawl=1: We willen alleen deze ene pagina
-        # - request_handler: Onze functie die de content extract
-        crawler = BeautifulSoupCrawler(
+        # - storage_client=Memory: Scout requests hoeven niet op disk
+        # - concurrency_settings: Begrenst gelijktijdige requests over alle targets
+        crawler = HttpCrawler(
             request_handler=request_handler,
-            max_requests_per_crawl=1,
+            storage_client=MemoryStorageClient(),
+            concurrency_settings=ConcurrencySettings(
+                max_concurrency=concurrency,
+                desired_concurrency=min(concurrency, len(unique_urls)),
+            ),
         )
+        crawler.failed_request_handler(failed_request_handler)
+        crawler.pre_navigation_hook(politeness_hook)
         
-        # Run de crawl
-        # Waarom als list: Crawlee accepteert meerdere URLs tegelijk
-        await crawler.run([target_url])
+        # Waarom unique_key per run: Crawlee onthoudt afgehandelde requests
+        # binnen een process, zonder run_id zou een tweede batch in dezelfde
+        # worker niks meer ophalen.
+        run_id = uuid.uuid4().hex
+        requests = [
+            Request.from_url(
+                url,
+                unique_key=f'{run_id}:{url}',
+                headers=_conditional_headers(validators.get(url) or {}),
+                user_data={'scout_url': url}
+            )
+            for url in _interleave_domains(unique_urls)
+        ]
         
-        # Check of we data hebben gekregen
-        if content_data:
-            result.update({
-                'success': True,
-                'hash': content_data['hash'],
-                'text_preview': content_data['text'][:200] + '...',
-                'image_count': content_data['image_count']
-            })
-        else:
-            result['error'] = 'Geen content gevonden'
-            
+        await crawler.run(requests)
     except Exception as e:
-        # Vang alle errors op (netwerk, parsing, etc)
-        result['error'] = str(e)
+        # Vang crawler errors op (setup, event loop, etc)
+        for result in results.values():
+            if not result['success'] and not result['error']:
+                result['error'] = str(e)
+    
+    # Check of we data hebben gekregen
+    for result in results.values():
+        if not result['success'] and not result['error']:
+            result['error'] = 'Geen content gevonden'
     
-    return result
+    return results
 
 
-def scout_scan_sync(target_url: str) -> dict:
+async def scout_scan(target_url: str, validators: dict = None, rules: dict = None) -> dict:
+    """
+    Scout scan: Check of pagina is veranderd via hash.
+    
+    Gebruikt Crawlee's HttpCrawler voor:
+    - Automatische user-agent rotation
+    - Error handling
+    - Rate limiting
+    
+    Args:
+        target_url: URL om te scannen
+        validators: ETag / Last-Modified / body digest / hash van de vorige scout
+        rules: Target.noise_rules (filters vóór het hashen)
+        
+    Returns:
+        {
+            'success': bool,
+            'hash': str,           # MD5 hash van content
+            'text_preview': str,   # Eerste 200 chars
+            'image_count': int,    # Aantal images gevonden
+            'error': str,          # Error message (als failed)
+            'deferred': bool,      # Overgeslagen door de politeness limiter (geen failure)
+            'etag': str,           # Voor de volgende conditional GET
+            'last_modified': str,
+            'body_digest': str,    # MD5 van de ruwe body
+            'not_modified': bool,  # 304: niet gedownload/geparsed
+            'body_unchanged': bool,# Zelfde body: niet geparsed
+            'simhash': str,        # SimHash (alleen als geparsed)
+            'text': str,           # Volledige tekst (ongefilterd)
+            'images': list,        # Image URLs (ongefilterd)
+            'sections': list,      # [{'key', 'hash', 'preview'}] per DOM sectie
+            'merkle_root': str     # Root over de section hashes
+        }
+    """
+    results = await scout_scan_many(
+        [target_url],
+        concurrency=1,
+        validators={target_url: validators} if validators else None,
+        rules={target_url: rules} if rules else None
+    )
+    return results[target_url]
+
+
+def scout_scan_sync(target_url: str, validators: dict = None, rules: dict = None) -> dict:
     """
     Synchronous wrapper voor scout_scan.
     
     Waarom nodig: Django views/commands zijn sync, maar Crawlee is async.
     Deze functie maakt een event loop om async code te runnen.
     """
-    return asyncio.run(scout_scan(target_url))
+    return asyncio.run(scout_scan(target_url, validators=validators, rules=rules))
+
+
+def scout_scan_many_sync(urls: list, concurrency: int = None, validators: dict = None, rules: dict = None) -> dict:
+    """
+    Synchronous wrapper voor scout_scan_many.
+    
+    Waarom één asyncio.run: Alle URLs in dezelfde loop, niet één loop per target.
+    """
+    return asyncio.run(scout_scan_many(urls, concurrency=concurrency, validators=validators, rules=rules))
 
 
 # Test functie (alleen als je direct dit bestand runt)
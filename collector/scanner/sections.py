@@ -0,0 +1,222 @@
+"""
+Section Hashing - Merkle hashes per DOM sectie
+
+De page hash zegt alleen DAT er iets veranderd is. Met een hash per
+sectie weten we ook WAAR, zonder screenshot:
+
+- Landmarks: header, nav, main, footer, aside, section, article
+  (en elementen met een landmark role)
+- Headings: h1-h6 plus de content die erop volgt, tot de volgende heading
+- Prijsblokken: elementen met price/prijs/tarief/kosten in class/id/itemprop
+
+De section hashes rollen op tot één Merkle root. Gelijke root = niks
+verschoven, anders geeft diff_sections() de gewijzigde secties.
+
+Waarom in de ContentCollector (via SectionTracker): Beide extractor
+backends leveren dezelfde events, dus dezelfde secties en hashes.
+"""
+
+import hashlib
+import re
+
+
+ROOT_KEY = 'page'
+
+LANDMARK_TAGS = {'header', 'nav', 'main', 'footer', 'aside', 'section', 'article'}
+LANDMARK_ROLES = {'banner', 'navigation', 'main', 'contentinfo', 'complementary', 'region', 'search'}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+# Waarom ook Nederlands: De targets zijn Nederlandse telecom sites
+PRICE_PATTERN = re.compile(r'price|prijs|tarief|kosten', re.IGNORECASE)
+PRICE_ATTRS = ('class', 'id', 'itemprop')
+
+# Aantal woorden van een heading in de section key / in de preview
+HEADING_SLUG_WORDS = 6
+PREVIEW_WORDS = 12
+
+
+def _md5(value: str) -> str:
+    return hashlib.md5(value.encode('utf-8')).hexdigest()
+
+
+class Section:
+    """Eén sectie: key (pad in de pagina) + de tekst en images erin."""
+
+    __slots__ = ('key', 'tokens', 'images')
+
+    def __init__(self, key: str):
+        self.key = key
+        self.tokens = []
+        self.images = []
+
+    def digest(self, rules=None) -> str:
+        # Zelfde opbouw (en noise rules) als de page hash: tekst | images
+        text, images = ' '.join(self.tokens), self.images
+        if rules:
+            text, images = rules.normalize_text(text), rules.normalize_images(images)
+        return _md5(f"{text}|{'|'.join(images)}")
+
+
+class SectionTracker:
+    """
+    Deelt tekst en images toe aan de binnenste open sectie.
+
+    Scopes:
+    - landmark / price: open tot het element sluit
+    - heading: open tot de volgende heading (of tot de omliggende scope sluit)
+    """
+
+    def __init__(self):
+        root = Section(ROOT_KEY)
+        self.sections = [root]
+        # (kind, element depth, section)
+        self._scopes = [(None, 0, root)]
+        # Waarom apart bijhouden: end() wordt voor elk element aangeroepen,
+        # alleen bij deze depths hoeft er een scope dicht
+        self._scope_depths = set()
+        self._price_depth = None
+        self._depth = 0
+        self._heading_depth = None
+
+    @property
+    def current(self) -> Section:
+        return self._scopes[-1][2]
+
+    def add_tokens(self, tokens: list):
+        self.current.tokens.extend(tokens)
+
+    def add_image(self, src: str):
+        self.current.images.append(src)
+
+    def start(self, tag, attrib):
+        self._depth += 1
+        if self._heading_depth is not None:
+            # Alles binnen een heading hoort bij die heading
+            return
+
+        if tag in HEADING_TAGS:
+            # Een nieuwe heading sluit de vorige heading sectie in dezelfde scope
+            while self._scopes[-1][0] == 'heading':
+                self._scopes.pop()
+            self._open('heading', tag)
+            self._heading_depth = self._depth
+        elif tag in LANDMARK_TAGS or attrib.get('role') in LANDMARK_ROLES:
+            label = tag if tag in LANDMARK_TAGS else attrib['role']
+            if attrib.get('id'):
+                label = f"{label}#{attrib['id']}"
+            self._open('landmark', label)
+        elif self._is_price_block(attrib):
+            self._open('price', 'price')
+
+    def end(self, tag):
+        if self._heading_depth == self._depth:
+            # Heading klaar: nu weten we de tekst voor de key
+            section = self.current
+            slug = '-'.join(section.tokens[:HEADING_SLUG_WORDS]).lower()
+            if slug:
+                section.key = f"{section.key}:{slug}"
+            self._heading_depth = None
+        elif self._depth in self._scope_depths:
+            for index in range(len(self._scopes) - 1, 0, -1):
+                kind, depth, _ = self._scopes[index]
+                if depth == self._depth and kind != 'heading':
+                    # Sluit deze scope en alle headings erbinnen
+                    self._scope_depths.discard(depth)
+                    del self._scopes[index:]
+                    break
+            if self._price_depth == self._depth:
+                self._price_depth = None
+        self._depth -= 1
+
+    def _is_price_block(self, attrib) -> bool:
+        # Waarom niet genest: Eén prijskaart = één sectie
+        if self._price_depth is not None:
+            return False
+        for name in PRICE_ATTRS:
+            value = attrib.get(name)
+            if value and PRICE_PATTERN.search(value):
+                return True
+        return False
+
+    def _open(self, kind: str, label: str):
+        parent = self.current.key
+        key = label if parent == ROOT_KEY else f"{parent}/{label}"
+        section = Section(key)
+        self.sections.append(section)
+        self._scopes.append((kind, self._depth, section))
+        if kind != 'heading':
+            self._scope_depths.add(self._depth)
+        if kind == 'price':
+            self._price_depth = self._depth
+
+    def result(self, rules=None) -> list:
+        """
+        Niet-lege secties in document volgorde: [{'key', 'hash', 'preview'}].
+
+        Waarom unieke keys: Twee <section>s zonder id krijgen anders
+        dezelfde key, dan kunnen we ze niet los vergelijken.
+        """
+        seen = {}
+        sections = []
+        for section in self.sections:
+            if not section.tokens and not section.images:
+                continue
+            count = seen.get(section.key, 0) + 1
+            seen[section.key] = count
+            sections.append({
+                'key': section.key if count == 1 else f"{section.key}~{count}",
+                'hash': section.digest(rules),
+                'preview': ' '.join(section.tokens[:PREVIEW_WORDS]),
+            })
+        return sections
+
+
+def merkle_root(sections: list) -> str:
+    """
+    Merkle root over de section hashes (in document volgorde).
+
+    Waarom de key in de leaf: Een sectie die verhuist (zelfde content,
+    andere plek) verandert de root ook.
+    """
+    level = [_md5(f"{section['key']}:{section['hash']}") for section in sections]
+    if not level:
+        return _md5('')
+    while len(level) > 1:
+        # Oneven aantal: de laatste schuift door naar het volgende level
+        level = [
+            _md5(level[i] + level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+    return level[0]
+
+
+def diff_sections(old: dict, new: dict) -> list:
+    """
+    Welke secties zijn er veranderd tussen twee scans?
+
+    Args:
+        old / new: {'root': str, 'sections': [{'key', 'hash', 'preview'}]}
+            (Scan.section_hashes), old mag None zijn
+
+    Returns:
+        [{'key', 'change': 'added'|'changed'|'removed', 'preview'}]
+        Leeg als de Merkle roots gelijk zijn of er geen vorige secties zijn.
+    """
+    if not old or not new or old.get('root') == new.get('root'):
+        return []
+
+    old_hashes = {section['key']: section for section in old['sections']}
+    new_keys = set()
+    changes = []
+    for section in new['sections']:
+        new_keys.add(section['key'])
+        previous = old_hashes.get(section['key'])
+        if previous is None:
+            changes.append({'key': section['key'], 'change': 'added', 'preview': section['preview']})
+        elif previous['hash'] != section['hash']:
+            changes.append({'key': section['key'], 'change': 'changed', 'preview': section['preview']})
+
+    for section in old['sections']:
+        if section['key'] not in new_keys:
+            changes.append({'key': section['key'], 'change': 'removed', 'preview': section['preview']})
+    return changes
@@ -0,0 +1,159 @@
+"""
+Visual diff - Screenshots vergelijken vóór de Gemini analyse
+
+Scout ziet een andere hash ook als de pagina er precies hetzelfde uitziet:
+onzichtbare tekst, alt teksten, markup in een andere volgorde. Dan stuurden
+we toch het hele screenshot naar Gemini.
+
+Nu, tussen capture en analyse, t.o.v. het vorige geanalyseerde screenshot:
+1. Pixel hash: MD5 van de grijze pixels op de vergelijk breedte
+   (Scan.visual_hash). Zelfde hash = exact dezelfde pixels, het vorige
+   screenshot hoeft dan niet eens geladen te worden.
+2. Anders een pixel diff per tegel: pixels die meer dan VISUAL_DIFF_PIXEL_NOISE
+   verschillen (anti-aliasing valt daaronder), een tegel is gewijzigd als
+   meer dan VISUAL_DIFF_TILE_FRACTION van z'n pixels gewijzigd is.
+   Aangrenzende gewijzigde tegels worden één regio (bounding box in pixels
+   van het screenshot).
+
+Gewijzigd deel (tegels) niet boven VISUAL_DIFF_THRESHOLD: geen Gemini
+(zie full_scan.visual_stage_async). Default 0: alleen overslaan als er
+niks zichtbaar veranderd is, één gewijzigde prijs is al genoeg.
+
+Waarom geen perceptuele hash (dHash) als kortsluiting: Die is per tegel te
+grof voor één ander cijfer, een gewijzigde prijs zou dan 'identiek' zijn.
+Kleine verschillen (encoding ruis) vangt de pixel diff op.
+Waarom het vorige *geanalyseerde* screenshot: Vergelijken met het vorige
+'gelijke' screenshot laat kleine verschuivingen ongemerkt optellen.
+"""
+
+import hashlib
+import math
+
+from django.conf import settings
+from PIL import Image, ImageChops
+
+# Meer regio's zegt niks extra (dan is de hele pagina anders)
+MAX_REGIONS = 50
+
+
+def _prepare(path, width: int) -> tuple:
+    """
+    Grijs en geschaald naar de vergelijk breedte.
+
+    Returns:
+        (image, originele breedte, originele hoogte)
+    """
+    with Image.open(path) as image:
+        original = image.size
+        gray = image.convert('L')
+    height = max(round(original[1] * width / original[0]), 1)
+    return gray.resize((width, height), Image.Resampling.BOX), original[0], original[1]
+
+
+def _pad(image, width: int, height: int):
+    """Wit aanvullen tot width x height (hele tegels, zelfde maat als het andere screenshot)"""
+    if image.size == (width, height):
+        return image
+    canvas = Image.new('L', (width, height), 255)
+    canvas.paste(image, (0, 0))
+    return canvas
+
+
+def _pixel_hash(image) -> str:
+    """MD5 van de grijze pixels, met de maat erin (een langere pagina is nooit gelijk)"""
+    digest = hashlib.md5(f'{image.width}x{image.height}:'.encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def _regions(changed: set, tile: int, scale: float, size: tuple) -> list:
+    """Aangrenzende gewijzigde tegels samenvoegen tot bounding boxes [x, y, w, h] (grootste eerst)"""
+    boxes = []
+    seen = set()
+    for start in sorted(changed):
+        if start in seen:
+            continue
+        seen.add(start)
+        stack = [start]
+        top, left, bottom, right = start[0], start[1], start[0], start[1]
+        while stack:
+            row, col = stack.pop()
+            top, bottom = min(top, row), max(bottom, row)
+            left, right = min(left, col), max(right, col)
+            for neighbour in ((row + dr, col + dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)):
+                if neighbour in changed and neighbour not in seen:
+                    seen.add(neighbour)
+                    stack.append(neighbour)
+
+        x = round(left * tile * scale)
+        y = round(top * tile * scale)
+        w = min(round((right + 1) * tile * scale), size[0]) - x
+        h = min(round((bottom + 1) * tile * scale), size[1]) - y
+        if w > 0 and h > 0:
+            boxes.append([x, y, w, h])
+
+    boxes.sort(key=lambda box: box[2] * box[3], reverse=True)
+    return boxes[:MAX_REGIONS]
+
+
+def compare_screenshots(current, baseline=None, baseline_hash: str = '') -> dict:
+    """
+    Vergelijk een screenshot met het vorige (geanalyseerde) screenshot.
+
+    Args:
+        current: Pad van het nieuwe screenshot
+        baseline: Pad van het vorige screenshot (None: alleen de hash)
+        baseline_hash: visual_hash van het vorige screenshot (als bekend)
+
+    Returns:
+        {
+            'visual_hash': str,
+            'identical': bool,        # Zelfde pixel hash
+            'change': float,          # Deel van de tegels gewijzigd (0-1), None zonder baseline
+            'tiles': int,
+            'tiles_changed': int,
+            'regions': [[x, y, w, h], ...]   # Pixels van het nieuwe screenshot
+        }
+    """
+    width = settings.VISUAL_DIFF_WIDTH
+    tile = settings.VISUAL_DIFF_TILE
+    image, original_width, original_height = _prepare(current, width)
+    result = {
+        'visual_hash': _pixel_hash(image),
+        'identical': False,
+        'change': None,
+        'tiles': 0,
+        'tiles_changed': 0,
+        'regions': [],
+    }
+
+    if baseline_hash and baseline_hash == result['visual_hash']:
+        result.update(identical=True, change=0.0)
+        return result
+    if baseline is None:
+        return result
+
+    previous, _, _ = _prepare(baseline, width)
+    if not baseline_hash and _pixel_hash(previous) == result['visual_hash']:
+        result.update(identical=True, change=0.0)
+        return result
+
+    cols = math.ceil(width / tile)
+    rows = math.ceil(max(image.height, previous.height) / tile)
+    diff = ImageChops.difference(
+        _pad(image, cols * tile, rows * tile),
+        _pad(previous, cols * tile, rows * tile)
+    ).point(lambda v: 255 if v > settings.VISUAL_DIFF_PIXEL_NOISE else 0)
+
+    # Gemiddelde per tegel = deel van de pixels dat gewijzigd is (x 255)
+    limit = settings.VISUAL_DIFF_TILE_FRACTION * 255
+    means = diff.reduce(tile).tobytes()
+    changed = {(index // cols, index % cols) for index, mean in enumerate(means) if mean > limit}
+
+    result.update(
+        change=round(len(changed) / (cols * rows), 4),
+        tiles=cols * rows,
+        tiles_changed=len(changed),
+        regions=_regions(changed, tile, original_width / width, (original_width, original_height)),
+    )
+    return result
@@ -0,0 +1,107 @@
+"""
+Adaptief interval - Scannen zo vaak als de pagina verandert
+
+De meeste pagina's veranderen wekenlang niet, een paar meerdere keren per
+dag. Met een vast interval scouten we de eerste groep voor niks en zien we
+wijzigingen op de tweede groep te laat.
+
+Schatting (per target met adaptive_interval):
+- Wijzigingen = geslaagde Scans in het venster (een Scan ontstaat alleen bij
+  een echte wijziging, kleine wijzigingen en bekende varianten tellen niet).
+  Handmatige scans (Scan.forced) tellen niet: "Scan nu" is geen wijziging
+- Venster = ADAPTIVE_INTERVAL_WINDOW_DAYS, of korter als de target jonger is
+- Gemiddelde tijd tussen wijzigingen = venster / wijzigingen
+- Ideaal interval = ADAPTIVE_INTERVAL_FRACTION * die tijd
+  (0 wijzigingen telt als een halve: een stille pagina zakt geleidelijk af)
+
+Waarom dempen (max factor 2 per stap): Eén drukke dag mag een rustige
+pagina niet meteen naar 5 minuten trekken, en andersom.
+Waarom een ladder: Leesbare intervallen, en claim_due_targets kan per
+interval één UPDATE blijven doen.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from shared.models import Target
+
+logger = logging.getLogger(__name__)
+
+# Minuten: 5m .. 1d
+INTERVAL_LADDER = (5, 10, 15, 30, 60, 120, 240, 480, 720, 1440)
+
+
+def snap(minutes: float) -> int:
+    """Dichtstbijzijnde trede van de ladder, binnen de ingestelde grenzen"""
+    low, high = settings.ADAPTIVE_INTERVAL_MIN, settings.ADAPTIVE_INTERVAL_MAX
+    steps = [step for step in INTERVAL_LADDER if low <= step <= high]
+    if not steps:
+        # Geen trede tussen de grenzen (bijv. 20-25): dan binnen de grenzen klemmen
+        return round(min(max(minutes, low), high))
+    return min(steps, key=lambda step: abs(step - minutes))
+
+
+def change_rate(target: Target, now=None) -> tuple:
+    """
+    Wijzigingen in het venster.
+
+    Returns:
+        (changes, window_minutes)
+    """
+    now = now or timezone.now()
+    since = max(now - timedelta(days=settings.ADAPTIVE_INTERVAL_WINDOW_DAYS), target.created_at)
+    changes = target.scans.filter(status='success', forced=False, scanned_at__gte=since).count()
+    return changes, max((now - since).total_seconds() / 60, 1)
+
+
+def adaptive_interval(target: Target, now=None) -> dict:
+    """
+    Nieuw interval voor een target (zonder op te slaan).
+
+    Returns:
+        {'target_id', 'old', 'new', 'changes', 'window_minutes', 'ideal'}
+    """
+    changes, window_minutes = change_rate(target, now)
+    ideal = settings.ADAPTIVE_INTERVAL_FRACTION * window_minutes / max(changes, 0.5)
+
+    current = target.scan_interval
+    damped = min(max(ideal, current / 2), current * 2)
+    return {
+        'target_id': target.id,
+        'old': current,
+        'new': snap(damped),
+        'changes': changes,
+        'window_minutes': round(window_minutes),
+        'ideal': round(ideal),
+    }
+
+
+def update_adaptive_intervals(target_ids: list = None, dry_run: bool = False, now=None) -> list:
+    """
+    Herbereken effective_interval van alle actieve adaptieve targets.
+
+    Elke beslissing wordt gelogd (ook als het interval gelijk blijft).
+    Opslaan via save() → next_scan_at schuift meteen mee.
+
+    Returns:
+        Lijst beslissingen (zie adaptive_interval)
+    """
+    targets = Target.objects.filter(status='active', adaptive_interval=True)
+    if target_ids is not None:
+        targets = targets.filter(id__in=target_ids)
+
+    decisions = []
+    for target in targets:
+        decision = adaptive_interval(target, now)
+        decisions.append(decision)
+        logger.info(
+            f"Adaptive interval {target.name} (#{target.id}): {decision['old']} → {decision['new']} min "
+            f"({decision['changes']} wijzigingen in {decision['window_minutes']} min, ideaal {decision['ideal']} min)"
+        )
+        if not dry_run and decision['new'] != target.effective_interval:
+            target.effective_interval = decision['new']
+            target.save(update_fields=['effective_interval'])
+    return decisions
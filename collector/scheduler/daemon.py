@@ -0,0 +1,176 @@
+"""
+Scheduler Daemon - Timer heap i.p.v. elke minuut pollen
+
+Houdt een min-heap van (next_scan_at, target_id) bij en slaapt tot de
+vroegste deadline. Een target wordt dus op z'n eigen moment gescout,
+niet pas bij de volgende beat tick (en niet alle targets op dezelfde tick).
+
+State:
+- Bij start: alles uit de DB (Target.next_scan_at)
+- Daarna: change feed (collector/scheduler/feed.py) voor create/update/delete
+- Elke SCHEDULER_RESYNC_SECONDS: opnieuw uit de DB (gemiste berichten)
+
+Waarom lazy deletion: Een update zet een nieuw heap item, het oude blijft
+liggen en wordt bij het poppen overgeslagen (deadlines[target_id] wijkt af).
+Zo is elke update O(log n) i.p.v. de heap doorzoeken.
+
+Dispatch gaat via claim_due_targets, dus naast beat (check_and_scan_targets)
+of een tweede daemon wordt een target nooit dubbel gescout.
+"""
+
+import heapq
+import json
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from collector.scheduler.jobs import claim_due_targets
+from shared.models import Target
+
+
+class TimerHeap:
+    """Min-heap van (deadline, target_id) met lazy deletion"""
+
+    def __init__(self):
+        self._heap = []
+        self.deadlines = {}
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def set(self, target_id: int, deadline: float = None):
+        """Deadline (unix timestamp) zetten, None = verwijderen"""
+        if deadline is None:
+            self.deadlines.pop(target_id, None)
+            return
+        if self.deadlines.get(target_id) == deadline:
+            return
+        self.deadlines[target_id] = deadline
+        heapq.heappush(self._heap, (deadline, target_id))
+
+    def clear(self):
+        self._heap = []
+        self.deadlines = {}
+
+    def next_deadline(self) -> float:
+        """Vroegste geldige deadline, of None als de heap leeg is"""
+        while self._heap:
+            deadline, target_id = self._heap[0]
+            if self.deadlines.get(target_id) == deadline:
+                return deadline
+            heapq.heappop(self._heap)  # verouderd item
+        return None
+
+    def pop_due(self, now: float) -> list:
+        """Alle targets met deadline <= now (uit de heap)"""
+        due = []
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                return due
+            _, target_id = heapq.heappop(self._heap)
+            del self.deadlines[target_id]
+            due.append(target_id)
+
+
+class Scheduler:
+    """
+    De daemon loop (zie run_scheduler command).
+
+    Args:
+        dispatch: Callable(target_ids) die de geclaimde targets enqueue't
+        feed: Redis PubSub (al gesubscribed), of None (dan alleen resync)
+    """
+
+    def __init__(self, dispatch, feed=None, resync_seconds: int = None, max_sleep: float = None):
+        self.dispatch = dispatch
+        self.feed = feed
+        self.resync_seconds = resync_seconds or settings.SCHEDULER_RESYNC_SECONDS
+        self.max_sleep = max_sleep or settings.SCHEDULER_MAX_SLEEP
+        self.timers = TimerHeap()
+        self.synced_at = None
+
+    def load(self):
+        """Heap opnieuw opbouwen uit de DB (start + periodieke resync)"""
+        self.timers.clear()
+        rows = Target.objects.filter(status='active', next_scan_at__isnull=False).values_list('id', 'next_scan_at')
+        for target_id, next_scan_at in rows:
+            self.timers.set(target_id, next_scan_at.timestamp())
+        self.synced_at = time.monotonic()
+        print(f"🗓️  Scheduler: {len(self.timers)} active targets loaded")
+
+    def refresh(self, target_ids: list, now: float):
+        """
+        Deadlines opnieuw uit de DB (na een claim, die zet next_scan_at zonder signal).
+
+        Nog steeds DUE = niet in het budget gepast: over SCHEDULER_BUDGET_RETRY
+        opnieuw, anders draait de loop rond zonder te slapen.
+        """
+        rows = dict(
+            Target.objects.filter(id__in=target_ids, status='active')
+            .values_list('id', 'next_scan_at')
+        )
+        for target_id in target_ids:
+            next_scan_at = rows.get(target_id)
+            deadline = next_scan_at.timestamp() if next_scan_at else None
+            if deadline is not None and deadline <= now:
+                deadline = now + settings.SCHEDULER_BUDGET_RETRY
+            self.timers.set(target_id, deadline)
+
+    def apply_message(self, data):
+        """Change feed bericht verwerken: {'id', 'next_scan_at'}"""
+        message = json.loads(data)
+        next_scan_at = message.get('next_scan_at')
+        deadline = datetime.fromisoformat(next_scan_at).timestamp() if next_scan_at else None
+        self.timers.set(message['id'], deadline)
+
+    def tick(self, now: float = None) -> list:
+        """
+        Alle DUE targets claimen + dispatchen.
+
+        Returns:
+            Gedispatchte target IDs
+        """
+        now = now or time.time()
+        due = self.timers.pop_due(now)
+        if not due:
+            return []
+
+        claimed = claim_due_targets(timezone.now(), target_ids=due)
+        if claimed:
+            self.dispatch(claimed)
+            print(f"🚀 Dispatched {len(claimed)} target(s): {claimed}")
+
+        # Geclaimd (of door een ander geclaimd): volgende deadline uit de DB
+        self.refresh(due, now)
+        return claimed
+
+    def wait(self, timeout: float):
+        """Slaap tot timeout, of tot er een change feed bericht binnenkomt"""
+        if self.feed is None:
+            time.sleep(timeout)
+            return
+
+        message = self.feed.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        while message:
+            if message['type'] == 'message':
+                self.apply_message(message['data'])
+            message = self.feed.get_message(ignore_subscribe_messages=True, timeout=0)
+
+    def run_once(self):
+        """Eén iteratie: resync indien nodig, dispatchen, slapen tot de volgende deadline"""
+        if self.synced_at is None or time.monotonic() - self.synced_at >= self.resync_seconds:
+            self.load()
+
+        self.tick()
+
+        # Waarom max_sleep: Resync en Ctrl+C moeten niet uren op een verre deadline wachten
+        deadline = self.timers.next_deadline()
+        timeout = self.max_sleep if deadline is None else min(self.max_sleep, deadline - time.time())
+        self.wait(max(timeout, 0))
+
+    def run_forever(self):
+        while True:
+            self.run_once()
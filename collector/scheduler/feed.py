@@ -0,0 +1,78 @@
+"""
+Change Feed - Target wijzigingen naar de run_scheduler daemon
+
+Elke save/delete van een Target publiceert (na de commit) een bericht op
+een Redis pub/sub channel. De daemon werkt daarmee z'n timer heap bij
+zonder de database te pollen.
+
+Bericht (JSON):
+    {"id": 3, "next_scan_at": "2026-10-18T10:15:00+00:00"}
+    {"id": 3, "next_scan_at": null}     # verwijderd of gepauzeerd
+
+Waarom pub/sub (fire-and-forget) goed genoeg is: De daemon leest bij
+start én periodiek (SCHEDULER_RESYNC_SECONDS) alles opnieuw uit de DB.
+Een gemist bericht kost hooguit één resync interval vertraging.
+"""
+
+import json
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from shared.models import Target
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_failing = False
+
+
+def get_redis():
+    """Gedeelde Redis client (lazy, pas bij het eerste bericht)"""
+    global _client
+    if _client is None:
+        import redis
+        _client = redis.Redis.from_url(settings.SCHEDULER_REDIS_URL)
+    return _client
+
+
+def target_message(target_id: int, next_scan_at=None) -> str:
+    return json.dumps({
+        'id': target_id,
+        'next_scan_at': next_scan_at.isoformat() if next_scan_at else None,
+    })
+
+
+def publish(message: str):
+    """
+    Publiceer een bericht, fouten alleen loggen.
+
+    Waarom niet falen: Een target opslaan mag niet stuk gaan omdat Redis
+    even weg is, de daemon haalt het in bij de volgende resync.
+    Waarom maar één warning: Zonder Redis (lokaal) zou elke save loggen.
+    """
+    global _failing
+    try:
+        get_redis().publish(settings.SCHEDULER_CHANNEL, message)
+        _failing = False
+    except Exception as e:
+        if not _failing:
+            logger.warning(f"Scheduler change feed publish failed: {e}")
+        _failing = True
+
+
+@receiver(post_save, sender=Target)
+def publish_target_saved(sender, instance, **kwargs):
+    next_scan_at = instance.next_scan_at if instance.status == 'active' else None
+    message = target_message(instance.id, next_scan_at)
+    # Waarom on_commit: De daemon moet de nieuwe waarde ook in de DB zien
+    transaction.on_commit(lambda: publish(message))
+
+
+@receiver(post_delete, sender=Target)
+def publish_target_deleted(sender, instance, **kwargs):
+    message = target_message(instance.id)
+    transaction.on_commit(lambda: publish(message))
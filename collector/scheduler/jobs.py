@@ -0,0 +1,111 @@
+"""
+Scheduler Jobs - Welke targets zijn DUE?
+
+Eén range query op de geïndexeerde kolom Target.next_scan_at
+(index: status + next_scan_at) i.p.v. alle targets in Python doorrekenen.
+
+Waarom claimen (next_scan_at vooruit zetten):
+- Een tweede scheduler tick pakt dezelfde targets niet nog eens op
+- Blijft een scan hangen, dan is de target na één interval weer DUE
+- Een afgeronde scan zet next_scan_at daarna goed (Target.save)
+
+Budget (SCAN_MAX_IN_FLIGHT): Nooit meer dan X targets tegelijk onderweg.
+Wat niet past blijft DUE en gaat mee met een volgende tick (oudste eerst),
+zo loopt de broker queue niet vol als er toch een piek is.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from shared.models import Target
+
+
+def due_targets(now=None):
+    """
+    Queryset van actieve targets waarvan next_scan_at verstreken is.
+
+    Zonder lopende scan (scan lease): een handmatige scan die nog loopt
+    hoeft de scheduler niet nog eens te starten.
+    """
+    now = now or timezone.now()
+    return Target.objects.filter(status='active', next_scan_at__lte=now).exclude(scan_lease_until__gt=now)
+
+
+def in_flight_count(now=None) -> int:
+    """
+    Aantal gedispatchte targets waarvan de scan nog niet klaar is.
+
+    Waarom een timeout: Een scan die nooit afrondt (worker gecrasht)
+    mag het budget niet voor altijd bezet houden.
+    """
+    now = now or timezone.now()
+    since = now - timedelta(seconds=settings.SCAN_IN_FLIGHT_TIMEOUT)
+    return Target.objects.filter(dispatched_at__gte=since).count()
+
+
+def dispatch_budget(now=None) -> int:
+    """Hoeveel targets mogen er nu nog bij? (None = geen limiet)"""
+    if not settings.SCAN_MAX_IN_FLIGHT:
+        return None
+    return max(settings.SCAN_MAX_IN_FLIGHT - in_flight_count(now), 0)
+
+
+def claim_due_targets(now=None, limit: int = None, target_ids: list = None) -> list:
+    """
+    Selecteer en claim alle DUE targets.
+
+    Waarom SKIP LOCKED: Parallelle ticks (of meerdere schedulers) slaan
+    rijen over die een andere transactie al aan het claimen is, i.p.v.
+    erop te wachten. Op SQLite is select_for_update een no-op.
+
+    Args:
+        now: Peilmoment (default: nu)
+        limit: Max aantal targets per tick (default: allemaal, binnen het budget)
+        target_ids: Alleen deze targets (run_scheduler weet al welke DUE zijn)
+
+    Returns:
+        Lijst target IDs, oudste next_scan_at eerst
+    """
+    now = now or timezone.now()
+
+    budget = dispatch_budget(now)
+    if budget is not None:
+        limit = min(limit or budget, budget)
+        if not limit:
+            return []
+
+    queryset = due_targets(now)
+    if target_ids is not None:
+        queryset = queryset.filter(id__in=target_ids)
+
+    with transaction.atomic():
+        rows = (
+            queryset
+            .select_for_update(skip_locked=True)
+            .order_by('next_scan_at')
+            .values_list('id', 'interval', 'adaptive_interval', 'effective_interval')
+        )
+        if limit:
+            rows = rows[:limit]
+        rows = list(rows)
+
+        # Eén UPDATE per interval (paar vaste waardes) i.p.v. één per target
+        by_interval = {}
+        for target_id, interval, adaptive, effective in rows:
+            interval = effective if adaptive and effective else interval
+            by_interval.setdefault(interval, []).append(target_id)
+        for interval, target_ids in by_interval.items():
+            Target.objects.filter(id__in=target_ids).update(
+                next_scan_at=now + timedelta(minutes=interval),
+                dispatched_at=now
+            )
+
+    return [row[0] for row in rows]
+
+
+def chunked(target_ids: list, size: int) -> list:
+    """Verdeel target IDs in batches van max `size`"""
+    return [target_ids[i:i + size] for i in range(0, len(target_ids), size)]
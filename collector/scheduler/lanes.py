@@ -0,0 +1,77 @@
+"""
+Interactieve lane - Handmatige scans vóór geplande scans
+
+Een klik op 'scan' in het dashboard gaat niet naar de stage queues
+(scout/capture/analysis), maar naar INTERACTIVE_QUEUE met een eigen worker.
+Zo wacht een gebruiker nooit achter honderden geplande scans.
+
+Waarom een eigen queue en geen Celery priority: Met de Redis broker is
+priority een benadering per prefetch batch, een gereserveerde worker is
+voorspelbaar.
+
+Wachtrij positie: Target.scan_requested_at (gezet bij enqueue, gewist als
+scan_target_task start). De ETA komt uit de gemeten stage tijden van de
+laatste scans (Scan.stage_seconds).
+"""
+
+import statistics
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from shared.models import Scan, Target
+
+
+def mark_queued(target_id: int):
+    """Interactieve scan staat in de queue"""
+    Target.objects.filter(id=target_id).update(scan_requested_at=timezone.now())
+
+
+def clear_queued(target_id: int):
+    """Interactieve scan is gestart (of toch niet in de queue gezet)"""
+    Target.objects.filter(id=target_id, scan_requested_at__isnull=False).update(scan_requested_at=None)
+
+
+def _waiting(now):
+    """
+    Targets in de interactieve queue.
+
+    Waarom begrensd op SCAN_LEASE_TTL: Een task die nooit start (worker weg)
+    telt daarna niet meer mee, de lease is dan ook verlopen.
+    """
+    return Target.objects.filter(scan_requested_at__gt=now - timedelta(seconds=settings.SCAN_LEASE_TTL))
+
+
+def typical_scan_seconds() -> float:
+    """Mediaan duur van een scan (capture + analyse) over de laatste scans"""
+    recent = Scan.objects.filter(stage_seconds__isnull=False).order_by('-scanned_at').values_list(
+        'stage_seconds', flat=True
+    )[:settings.INTERACTIVE_ETA_SAMPLE]
+    totals = [sum(stages.values()) for stages in recent if stages]
+    if not totals:
+        return float(settings.INTERACTIVE_SCAN_SECONDS)
+    return statistics.median(totals)
+
+
+def queue_estimate(target_id: int, now=None) -> dict:
+    """
+    Positie en verwachte start van een wachtende interactieve scan.
+
+    Returns:
+        {'queue_position', 'estimated_start', 'estimated_wait'} of {} als er
+        niks wacht. queue_position 1 = volgende, estimated_wait in seconden.
+    """
+    now = now or timezone.now()
+    requested_at = _waiting(now).filter(id=target_id).values_list('scan_requested_at', flat=True).first()
+    if requested_at is None:
+        return {}
+
+    ahead = _waiting(now).filter(scan_requested_at__lt=requested_at).count()
+    # Elke worker slot werkt de wachtrij af in rondes van één scan
+    wait = (ahead // max(settings.INTERACTIVE_CONCURRENCY, 1)) * typical_scan_seconds()
+    return {
+        'queue_position': ahead + 1,
+        'estimated_start': (now + timedelta(seconds=wait)).isoformat(),
+        'estimated_wait': round(wait),
+    }
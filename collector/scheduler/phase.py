@@ -0,0 +1,35 @@
+"""
+Phase offsets - Targets gespreid over hun interval
+
+Zonder spreiding worden alle targets die samen aangemaakt zijn (interval=15)
+ook samen DUE: elke 15 minuten een piek op workers, browser pool en Gemini,
+daartussen niks.
+
+Elke target krijgt een vaste fase binnen z'n interval, afgeleid van z'n id.
+De scans vallen op een grid: fase + k * interval (unix tijd).
+
+Waarom de gulden snede: id * 0.618... mod 1 verdeelt opeenvolgende ids
+maximaal gelijkmatig (elke nieuwe id valt in het grootste gat), ook als
+er maar een paar targets zijn.
+"""
+
+import math
+
+GOLDEN_RATIO = (math.sqrt(5) - 1) / 2
+
+
+def phase_offset(target_id: int, interval_seconds: float) -> float:
+    """Vaste fase (0 .. interval_seconds) van een target"""
+    return (target_id * GOLDEN_RATIO) % 1 * interval_seconds
+
+
+def next_slot(after: float, target_id: int, interval_seconds: float) -> float:
+    """
+    Eerste grid slot van deze target ná `after` (unix timestamp).
+
+    Een scan die op z'n slot draait krijgt precies één interval later de
+    volgende, een scan die uitliep valt terug op het grid.
+    """
+    phase = phase_offset(target_id, interval_seconds)
+    slots = math.floor((after - phase) / interval_seconds) + 1
+    return phase + slots * interval_seconds
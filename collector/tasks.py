@@ -8,15 +8,34 @@ Waarom tasks:
 
 Task flow:
 1. Beat scheduler (elke minuut): "Welke targets zijn DUE?"
-2. Voor elke DUE target: Start scan_target task
-3. scan_target task: Voert full_scan uit
+2. Alle DUE targets: Eén scout_batch task (één crawl voor alle targets)
+3. Alleen gewijzigde targets: capture_task → analyze_task → persist_task
+
+Elke stage heeft een eigen queue (CELERY_TASK_ROUTES):
+- scout: goedkoop, veel concurrency
+- capture: Chromium, weinig workers (geheugen)
+- analysis: Gemini, rate limited
+- celery (default): persist, alerts, beat tasks
+
+Scan lease (collector/scanner/lease.py): Het token gaat als kwarg 'lease'
+mee door de hele chain, elke stage verlengt hem, persist_task (of het
+einde van de chain) geeft hem terug. Een tweede scan van dezelfde target
+krijgt geen lease en start niks (coalesced).
+
+Interactieve scans (dashboard) draaien alle stages op INTERACTIVE_QUEUE
+(kwarg 'interactive', zie collector/scheduler/lanes.py).
 """
 
-from celery import shared_task
+from celery import group, shared_task
+from celery.signals import worker_process_shutdown, worker_shutdown
 from django.utils import timezone
-from datetime import timedelta
-from shared.models import Target
-from collector.scanner.full_scan import perform_full_scan
+from collector.scanner.full_scan import (
+    analyze_stage, capture_stage, fail_scan, persist_stage, scout_targets, start_stage, visual_stage
+)
+from collector.scanner.lease import acquire_scan_lease, release_scan_lease, renew_scan_lease
+from collector.scheduler.adaptive import update_adaptive_intervals
+from collector.scheduler.jobs import chunked, claim_due_targets
+from collector.scheduler.lanes import clear_queued
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
@@ -26,48 +45,283 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def shutdown_browser_pool_on_worker_stop(**kwargs):
+    """
+    Sluit de warme Chromium browsers als de worker stopt.
+    
+    Waarom beide signals: prefork children krijgen worker_process_shutdown,
+    solo/threads pools alleen worker_shutdown.
+    """
+    from collector.scanner.browser_pool import shutdown_browser_pool
+    shutdown_browser_pool()
+
+
+def _enqueue(task, interactive, *args, **kwargs):
+    """
+    Volgende stage in de chain.
+    
+    Interactief: op INTERACTIVE_QUEUE (gereserveerde worker), anders op
+    de queue van de stage zelf (CELERY_TASK_ROUTES).
+    """
+    if interactive:
+        return task.apply_async(args, {**kwargs, 'interactive': True}, queue=settings.INTERACTIVE_QUEUE)
+    return task.delay(*args, **kwargs)
+
+
+def _countdown(task):
+    """
+    Wachttijd voor de volgende retry: exponentieel (60s, 120s, 240s).
+    
+    Waarom niet vast: Een site die even hapert krijgt tijd om te herstellen,
+    blijvende fouten vangt de circuit breaker per domein af.
+    """
+    return settings.SCAN_RETRY_BASE_SECONDS * 2 ** task.request.retries
+
+
+def _end_chain(target_id, result, lease=None):
+    """
+    Pipeline stopt vóór persist (failure): last_scan_at toch bijwerken.
+    
+    Waarom: Anders is de target de volgende tick meteen weer DUE
+    en blijft een kapotte site capture slots bezetten.
+    De scan lease komt vrij, de volgende scan mag weer.
+    """
+    release_scan_lease(target_id, lease)
+    if result.get('error'):
+        target = Target.objects.filter(id=target_id).first()
+        if target:
+            target.last_scan_at = timezone.now()
+            target.save(update_fields=['last_scan_at'])
+    return {
+        'success': result['success'],
+        'target_id': target_id,
+        'result': result
+    }
+
+
 @shared_task(bind=True, max_retries=3)
-def scan_target_task(self, target_id):
+def scan_target_task(self, target_id, scout_result=None, force_capture=False, lease=None, interactive=False):
     """
-    Background task om een target te scannen
+    Background task om een target te scannen (queue: scout)
+    
+    Start de pipeline: scout → capture_task → analyze_task → persist_task.
+    Elke stage draait op z'n eigen queue (zie CELERY_TASK_ROUTES), zodat een
+    scout worker nooit 30 sec op Playwright of Gemini hoeft te wachten.
     
     Waarom bind=True: We krijgen 'self' voor retry logic
     Waarom max_retries=3: Max 3 pogingen bij failure
     
     Args:
         target_id: ID van target om te scannen
+        scout_result: Result van de batch scout (dan wordt niet opnieuw gescout)
+        force_capture: Scout overslaan, meteen capturen (handmatige scan)
+        lease: Scan lease token (al gepakt door de view), anders pakken we hem hier
+        interactive: Handmatige scan, alle stages op INTERACTIVE_QUEUE
         
     Returns:
-        dict met result info
+        dict met result info ('coalesced': er liep al een scan, niks gestart)
     """
+    if interactive:
+        # Niet meer in de wachtrij: telt niet mee voor de positie van anderen
+        clear_queued(target_id)
+    
+    if lease is None:
+        lease = acquire_scan_lease(target_id)
+        if lease is None:
+            return {
+                'success': True,
+                'target_id': target_id,
+                'coalesced': True
+            }
+    
     try:
-        result = perform_full_scan(target_id)
+        if scout_result is None and not force_capture:
+            summary = scout_targets([target_id])
+            scout_result = summary['changed'].get(target_id)
+            if scout_result is None:
+                # Geen wijziging (of scout failed), al opgeslagen door scout_targets
+                release_scan_lease(target_id, lease)
+                return {
+                    'success': target_id not in summary['failed'] and target_id not in summary['skipped'],
+                    'target_id': target_id,
+                    'changed': False
+                }
         
-        # Update last_scan_at
-        target = Target.objects.get(id=target_id)
-        target.last_scan_at = timezone.now()
-        target.save()
-        
-        if result.get('analysis') and result['analysis'].get('changes'):
-            # Check for critical changes
-            changes = result['analysis']['changes']
-            max_impact = max((c.get('impact_score', 0) for c in changes), default=0)
-            
-            if max_impact >= 7:
-                 # Het is kritiek!
-                 scan_id = Scan.objects.filter(target_id=target_id).latest('scanned_at').id
-                 send_alert_task.delay(scan_id)
-
+        _enqueue(capture_task, interactive, target_id, scout_result=scout_result, force_capture=force_capture, lease=lease)
         return {
             'success': True,
             'target_id': target_id,
-            'result': result
+            'changed': True
         }
         
     except Exception as exc:
-        # Retry bij failure
-        # countdown: Wacht 60 sec voor retry
-        raise self.retry(exc=exc, countdown=60)
+        # Retry bij failure (met dezelfde lease)
+        if self.request.retries >= self.max_retries:
+            release_scan_lease(target_id, lease)
+        raise self.retry(exc=exc, countdown=_countdown(self), kwargs={**(self.request.kwargs or {}), 'lease': lease})
+
+
+def _retry(task, exc, target_id, scan_id=None, lease=None, **kwargs):
+    """
+    Retry vanaf het laatste checkpoint.
+    
+    Waarom kwargs: De retry krijgt scan_id (en de lease) mee, dan gaat hij
+    verder op dezelfde pending Scan (geen nieuwe scout/screenshot).
+    Na de laatste poging: pending scan op 'failed', anders blijft hij 'Bezig',
+    en de lease komt vrij.
+    """
+    if task.request.retries >= task.max_retries:
+        if scan_id:
+            fail_scan(scan_id, f'{task.name} failed: {exc}')
+        release_scan_lease(target_id, lease)
+    return task.retry(
+        exc=exc,
+        countdown=_countdown(task),
+        kwargs={**(task.request.kwargs or {}), 'scan_id': scan_id, 'lease': lease, **kwargs}
+    )
+
+
+@shared_task(bind=True, max_retries=3)
+def capture_task(self, target_id, scout_result=None, force_capture=False, scan_id=None, validators=None, lease=None,
+                 interactive=False):
+    """
+    Pending Scan + screenshot van een gewijzigde target (queue: capture)
+    
+    Waarom eigen queue: Chromium is zwaar (geheugen), weinig workers
+    met een warme browser pool. Scout en Gemini schalen los daarvan.
+    
+    Het screenshot komt in storage/screenshots, analyze_task leest het
+    daar weer (storage moet gedeeld zijn tussen capture en analysis workers).
+    Ziet het screenshot er hetzelfde uit als het vorige geanalyseerde
+    (visual diff), dan eindigt de chain hier zonder Gemini.
+    
+    Zonder lease (scout_batch_task) pakt deze task hem zelf: loopt er al
+    een scan van deze target, dan stopt hij hier (coalesced).
+    """
+    if lease is None:
+        lease = acquire_scan_lease(target_id)
+        if lease is None:
+            return {
+                'success': True,
+                'target_id': target_id,
+                'coalesced': True
+            }
+    else:
+        renew_scan_lease(target_id, lease)
+    
+    try:
+        if scan_id is None:
+            result, scan_id, validators = start_stage(target_id, force_capture=force_capture, scout_result=scout_result)
+            if scan_id is None:
+                return _end_chain(target_id, result, lease)
+        
+        result, captured = capture_stage(scan_id)
+        needs_analysis = captured and visual_stage(scan_id, result, validators=validators)
+    except Exception as exc:
+        raise _retry(self, exc, target_id, scan_id, lease, validators=validators)
+    
+    if not needs_analysis:
+        return _end_chain(target_id, result, lease)
+    
+    _enqueue(analyze_task, interactive, target_id, scan_id, validators=validators, force_capture=force_capture, lease=lease)
+    return {
+        'success': True,
+        'target_id': target_id,
+        'scan_id': scan_id
+    }
+
+
+@shared_task(bind=True, max_retries=3, rate_limit=settings.GEMINI_RATE_LIMIT)
+def analyze_task(self, target_id, scan_id, validators=None, force_capture=False, lease=None, interactive=False):
+    """
+    Gemini analyse van het screenshot (queue: analysis)
+    
+    Waarom rate_limit: Gemini heeft een quota per minuut, de limiet geldt
+    per worker (GEMINI_RATE_LIMIT).
+    Een retry (bijv. Gemini timeout) analyseert alleen opnieuw, het
+    screenshot staat al op de pending Scan.
+    """
+    renew_scan_lease(target_id, lease)
+    try:
+        result, analysis = analyze_stage(scan_id)
+    except Exception as exc:
+        raise _retry(self, exc, target_id, scan_id, lease)
+    
+    if analysis is None:
+        return _end_chain(target_id, result, lease)
+    
+    _enqueue(persist_task, interactive, target_id, scan_id, validators=validators, force_capture=force_capture, lease=lease)
+    return {
+        'success': True,
+        'target_id': target_id,
+        'scan_id': scan_id,
+        'type': analysis.get('type')
+    }
+
+
+@shared_task(bind=True, max_retries=3)
+def persist_task(self, target_id, scan_id, validators=None, force_capture=False, lease=None, interactive=False):
+    """
+    Scan afronden + target bijwerken + alert bij kritieke wijziging (queue: celery)
+    
+    Idempotent: Een tweede persist van dezelfde scan werkt de target niet
+    opnieuw bij, en send_alert_task verstuurt per scan maar één alert.
+    Einde van de chain: de scan lease komt vrij.
+    """
+    renew_scan_lease(target_id, lease)
+    try:
+        result = persist_stage(scan_id, validators=validators, force_capture=force_capture)
+    except Exception as exc:
+        raise _retry(self, exc, target_id, scan_id, lease)
+    release_scan_lease(target_id, lease)
+    
+    analysis = Scan.objects.get(id=scan_id).analysis_json or {}
+    if analysis.get('changes'):
+        # Check for critical changes
+        max_impact = max((c.get('impact_score', 0) for c in analysis['changes']), default=0)
+        
+        if max_impact >= 7:
+            # Het is kritiek! (send_alert_task checkt zelf of hij al verstuurd is)
+            send_alert_task.delay(scan_id)
+    
+    return {
+        'success': True,
+        'target_id': target_id,
+        'result': result
+    }
+
+
+@shared_task
+def scout_batch_task(target_ids):
+    """
+    Scout een batch targets in één crawl
+    
+    Waarom batch:
+    - Eén event loop + gedeelde HTTP client voor alle targets
+    - Scout is goedkoop, maar honderden losse tasks/loops zijn dat niet
+    
+    Alleen targets die echt veranderd zijn (hash én similarity, zie
+    _needs_capture) gaan door naar capture_task (queue: capture). Het scout result gaat mee,
+    zodat die task niet opnieuw hoeft te scouten.
+    """
+    summary = scout_targets(target_ids)
+    
+    for target_id, scout_result in summary['changed'].items():
+        capture_task.delay(target_id, scout_result=scout_result)
+    
+    return {
+        'scouted': len(target_ids),
+        'changed': list(summary['changed'].keys()),
+        'unchanged': len(summary['unchanged']),
+        'failed': len(summary['failed']),
+        'skipped': len(summary['skipped']),
+        'not_modified': summary['not_modified'],
+        'body_unchanged': summary['body_unchanged'],
+        'minor': summary['minor'],
+        'variants': summary['variants'],
+    }
 
 
 @shared_task
@@ -77,38 +331,52 @@ def check_and_scan_targets():
     
     Waarom deze task:
     - Draait elke minuut (via beat schedule)
-    - Checkt of target moet gescanned worden
-    - Start scan_target_task voor DUE targets
+    - Claimt alle DUE targets met één geïndexeerde query (zie collector/scheduler/jobs.py)
+    - Start de scout batches in één keer als Celery group
     
     Logic:
-    - Target is DUE als: last_scan_at + interval < now
-    - Of als: nog nooit gescanned (last_scan_at = None)
+    - Target is DUE als: status = active EN next_scan_at <= now
+    - next_scan_at = last_scan_at + interval (bijgewerkt in Target.save)
     """
     now = timezone.now()
-    targets = Target.objects.filter(status='active')
+    due_ids = claim_due_targets(now)
+    batches = enqueue_scout_batches(due_ids)
+    
+    return {
+        'scanned': len(due_ids),
+        'batches': batches,
+        'timestamp': now.isoformat()
+    }
+
+
+def enqueue_scout_batches(target_ids) -> int:
+    """
+    Geclaimde targets naar de scout queue.
     
-    scanned_count = 0
+    Eén scout batch per SCOUT_BATCH_SIZE targets, in één keer naar de broker
+    (Celery group). Ook gebruikt door de run_scheduler daemon.
     
-    for target in targets:
-        # Check of target DUE is
-        if target.last_scan_at is None:
-            # Nog nooit gescanned -> Scan!
-            scan_target_task.delay(target.id)
-            scanned_count += 1
-            
-        else:
-            # Check of interval is verstreken
-            next_scan_time = target.last_scan_at + timedelta(minutes=target.interval)
-            
-            if now >= next_scan_time:
-                # Tijd voor volgende scan!
-                scan_target_task.delay(target.id)
-                scanned_count += 1
+    Returns:
+        Aantal batches
+    """
+    batches = chunked(target_ids, settings.SCOUT_BATCH_SIZE)
+    if batches:
+        group([scout_batch_task.s(batch) for batch in batches]).apply_async()
+    return len(batches)
+
+
+@shared_task
+def adapt_intervals_task():
+    """
+    Herbereken adaptieve intervallen (zie collector/scheduler/adaptive.py)
     
+    Waarom periodiek (bijv. elk uur via beat) en niet na elke scan:
+    Een rustige pagina heeft geen scans, die moet ook langzaam afzakken.
+    """
+    decisions = update_adaptive_intervals()
     return {
-        'checked': targets.count(),
-        'scanned': scanned_count,
-        'timestamp': now.isoformat()
+        'targets': len(decisions),
+        'changed': sum(decision['new'] != decision['old'] for decision in decisions),
     }
 
 
@@ -0,0 +1,101 @@
+from unittest import mock
+from django.test import SimpleTestCase
+from collector.scanner.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        context = FakeContext()
+        context.options = kwargs
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.launched = []
+        self.chromium = self
+        self.stopped = False
+
+    async def launch(self, **kwargs):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+    async def stop(self):
+        self.stopped = True
+
+
+class BrowserPoolTestCase(SimpleTestCase):
+    def setUp(self):
+        self.playwright = FakePlaywright()
+
+        class Starter:
+            async def start(inner):
+                return self.playwright
+
+        patcher = mock.patch('collector.scanner.browser_pool.async_playwright', return_value=Starter())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.pool = BrowserPool(size=2, max_pages=3, max_rss_mb=10_000)
+        self.addCleanup(self.pool.shutdown)
+
+    async def _use(self, context):
+        return context
+
+    def test_reuses_warm_browsers_with_fresh_contexts(self):
+        first = self.pool.run_sync(self._use)
+        second = self.pool.run_sync(self._use)
+
+        self.assertEqual(len(self.playwright.launched), 2)
+        self.assertIsNot(first, second)
+        self.assertTrue(first.closed and second.closed)
+
+    def test_context_starts_with_storage_state(self):
+        state = {'cookies': [{'name': 'consent', 'value': 'yes'}], 'origins': []}
+        context = self.pool.run_sync(self._use, storage_state=state)
+        self.assertEqual(context.options['storage_state'], state)
+        self.assertIsNone(self.pool.run_sync(self._use).options['storage_state'])
+
+    def test_recycles_browser_after_max_pages(self):
+        for _ in range(6):
+            self.pool.run_sync(self._use)
+
+        # 2 warm + 2 recycled (elke browser na 3 pages)
+        self.assertEqual(len(self.playwright.launched), 4)
+        self.assertFalse(self.playwright.launched[0].connected)
+
+    def test_replaces_crashed_browser(self):
+        self.pool.run_sync(self._use)
+        for browser in self.playwright.launched:
+            browser.connected = False
+
+        self.pool.run_sync(self._use)
+        self.assertEqual(len(self.playwright.launched), 3)
+
+    def test_shutdown_closes_everything(self):
+        self.pool.run_sync(self._use)
+        self.pool.shutdown()
+
+        self.assertTrue(self.playwright.stopped)
+        self.assertTrue(all(not b.connected for b in self.playwright.launched))
+        self.assertFalse(self.pool.running)
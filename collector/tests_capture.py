@@ -0,0 +1,504 @@
+import asyncio
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from django.core.management import call_command
+from django.urls import reverse
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from PIL import Image, ImageDraw, ImageFont
+from collector.scanner.blocking import RequestFilter
+from collector.scanner.capture import handle_cookie_banner
+from collector.scanner.derivatives import derivative_path, make_derivatives, srcset
+from collector.scanner.encoding import encode_screenshot
+from collector.scanner.consent import CONSENT_CANDIDATES, MARKER, candidates_for, load_consent, save_consent
+from collector.scanner.visual_diff import compare_screenshots
+from collector.scanner.readiness import DECODE_SCRIPT, EAGER_SCRIPT, SCROLL_SCRIPT, STATE_SCRIPT, PageReadiness
+from collector.tasks import capture_task
+from shared.models import Scan, Target
+
+
+class FakeHandle:
+    def __init__(self, value):
+        self.value = value
+
+    async def json_value(self):
+        return self.value
+
+
+class FakePage:
+    """Speelt de probe na: de knop van kandidaat `match` staat in de pagina"""
+
+    def __init__(self, match=None):
+        self.match = match
+        self.timeouts = []
+        self.clicked = []
+
+    async def wait_for_function(self, script, arg=None, timeout=None, polling=None):
+        self.timeouts.append(timeout)
+        if self.match not in arg:
+            raise TimeoutError('geen banner')
+        return FakeHandle(arg.index(self.match) + 1)
+
+    async def click(self, selector, timeout=None):
+        self.clicked.append(selector)
+
+
+@override_settings(CAPTURE_CONSENT_TIMEOUT_MS=3000, CAPTURE_CONSENT_RECHECK_MS=500, CAPTURE_CONSENT_MAX_AGE_DAYS=30)
+class ConsentTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patcher = override_settings(CAPTURE_CONSENT_DIR=directory.name)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+
+    def test_store_and_expire_consent(self):
+        state = {'cookies': [{'name': 'consent', 'value': 'yes'}], 'origins': []}
+        save_consent('ziggo.nl', ('#onetrust-accept-btn-handler', None), state)
+
+        consent = load_consent('ziggo.nl')
+        self.assertEqual(consent['storage_state'], state)
+        self.assertEqual(candidates_for(consent)[0], ['#onetrust-accept-btn-handler', None])
+        self.assertEqual(len(candidates_for(consent)), len(CONSENT_CANDIDATES))
+        self.assertIsNone(load_consent('kpn.com'))
+
+        with mock.patch('collector.scanner.consent.time.time', return_value=time.time() + 31 * 86400):
+            self.assertIsNone(load_consent('ziggo.nl'))
+
+    def test_single_probe_clicks_marked_button(self):
+        page = FakePage(match=['button', 'Akkoord'])
+        self.assertEqual(asyncio.run(handle_cookie_banner(page)), ['button', 'Akkoord'])
+        self.assertEqual(page.clicked, [f'[{MARKER}]'])
+        self.assertEqual(page.timeouts, [3000])
+
+        # Opgeslagen cookies: alleen een korte check
+        page = FakePage()
+        consent = {'candidate': ['button', 'Akkoord'], 'storage_state': {'cookies': [], 'origins': []}}
+        self.assertIsNone(asyncio.run(handle_cookie_banner(page, consent)))
+        self.assertEqual((page.timeouts, page.clicked), ([500], []))
+
+        # Oude "geen banner" entry (zonder cookies): weer de volledige timeout
+        page = FakePage()
+        self.assertIsNone(asyncio.run(handle_cookie_banner(page, {'candidate': None, 'storage_state': None})))
+        self.assertEqual(page.timeouts, [3000])
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = mock.Mock(url=url, resource_type=resource_type)
+        self.outcome = None
+
+    async def abort(self, error_code=None):
+        self.outcome = 'abort'
+
+    async def continue_(self):
+        self.outcome = 'continue'
+
+
+@override_settings(CAPTURE_BLOCKING_ENABLED=True, CAPTURE_BLOCK_RESOURCE_TYPES=['media', 'font'], CAPTURE_BLOCK_DOMAINS=[])
+class RequestFilterTestCase(SimpleTestCase):
+    def test_blocks_trackers_and_heavy_types_everywhere(self):
+        request_filter = RequestFilter('https://www.ziggo.nl/internet')
+
+        self.assertEqual(request_filter.block_reason('https://www.google-analytics.com/g/collect', 'xhr'),
+                         'domain:google-analytics.com')
+        self.assertEqual(request_filter.block_reason('https://fonts.gstatic.com/a.woff2', 'font'), 'type:font')
+        self.assertEqual(request_filter.block_reason('https://www.facebook.com/tr?id=1', 'image'),
+                         'domain:facebook.com/tr')
+        self.assertIsNone(request_filter.block_reason('https://www.facebook.com/ziggo', 'document'))
+        self.assertIsNone(request_filter.block_reason('https://cdn.cookielaw.org/otSDKStub.js', 'script'))
+
+        # Eigen domein: niet op de domein blocklist, wel eigen video en fonts
+        self.assertIsNone(request_filter.block_reason('https://cdn.ziggo.nl/app.js', 'script'))
+        self.assertEqual(request_filter.block_reason('https://cdn.ziggo.nl/hero.mp4', 'media'), 'type:media')
+        self.assertEqual(request_filter.block_reason('https://www.ziggo.nl/fonts/a.woff2', 'font'), 'type:font')
+
+    def test_allowlist_overrides_domains_and_types(self):
+        request_filter = RequestFilter('https://ziggo.nl', allow=['youtube.com', 'font'])
+
+        self.assertIsNone(request_filter.block_reason('https://www.youtube.com/embed/x', 'document'))
+        self.assertIsNone(request_filter.block_reason('https://fonts.gstatic.com/a.woff2', 'font'))
+        self.assertIsNone(request_filter.block_reason('https://ziggo.nl/fonts/a.woff2', 'font'))
+        self.assertEqual(request_filter.block_reason('https://ytimg.com/vi/x.jpg', 'image'), 'domain:ytimg.com')
+
+    @override_settings(CAPTURE_BLOCKING_ENABLED=False)
+    def test_disabled_only_counts(self):
+        request_filter = RequestFilter('https://ziggo.nl')
+        route = FakeRoute('https://hotjar.com/x.js', 'script')
+        asyncio.run(request_filter.handle(route))
+
+        self.assertEqual(route.outcome, 'continue')
+        self.assertEqual(request_filter.stats()['requests_blocked'], 0)
+        self.assertFalse(request_filter.stats()['blocking'])
+
+    def test_handle_aborts_and_counts(self):
+        request_filter = RequestFilter('https://ziggo.nl')
+        routes = [
+            FakeRoute('https://ziggo.nl/', 'document'),
+            FakeRoute('https://static.hotjar.com/c.js', 'script'),
+            FakeRoute('https://ziggo.nl/promo.mp4', 'media'),
+            FakeRoute('https://player.vimeo.com/video/1', 'document'),
+        ]
+        for route in routes:
+            asyncio.run(request_filter.handle(route))
+        request_filter.on_response(mock.Mock(headers={'content-length': '2048'}))
+        request_filter.on_response(mock.Mock(headers={}))
+
+        self.assertEqual([route.outcome for route in routes], ['continue', 'abort', 'abort', 'abort'])
+        self.assertEqual(request_filter.stats(), {
+            'blocking': True,
+            'requests': 4,
+            'requests_loaded': 1,
+            'requests_blocked': 3,
+            'blocked_by_reason': {'domain:hotjar.com': 1, 'type:media': 1, 'domain:vimeo.com': 1},
+            'bytes_loaded': 2048,
+        })
+
+
+class FakeReadyPage:
+    """Pagina van 3 viewports hoog, images laden pas na `loading` seconden"""
+
+    def __init__(self, loading=0.0, dom_idle=1000):
+        self.handlers = {}
+        self.loaded_at = time.monotonic() + loading
+        self.dom_idle = dom_idle
+        self.scrolled = []
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def add_init_script(self, script):
+        pass
+
+    async def evaluate(self, script, arg=None):
+        if script == EAGER_SCRIPT:
+            return 3240
+        if script == SCROLL_SCRIPT:
+            self.scrolled.append(arg)
+            return 3240
+        if script == STATE_SCRIPT:
+            return {'domIdle': self.dom_idle, 'imagesPending': int(time.monotonic() < self.loaded_at)}
+        if script == DECODE_SCRIPT:
+            return True
+
+
+@override_settings(CAPTURE_READY_MAX_MS=400, CAPTURE_READY_NETWORK_QUIET_MS=50, CAPTURE_READY_DOM_QUIET_MS=100,
+                   CAPTURE_READY_MAX_INFLIGHT=0, CAPTURE_READY_SCROLL_STEP_MS=100)
+class PageReadinessTestCase(SimpleTestCase):
+    def test_waits_for_images_instead_of_fixed_sleep(self):
+        page = FakeReadyPage(loading=0.1)
+        ready = asyncio.run(PageReadiness(page).settle())
+
+        self.assertFalse(ready['ready_timeout'])
+        self.assertGreaterEqual(ready['ready_seconds'], 0.1)
+        self.assertLess(ready['ready_seconds'], 0.4)
+        self.assertEqual(ready['scroll_steps'], 2)
+        self.assertEqual(page.scrolled, [1080, 2160, 0])
+
+    def test_open_requests_keep_page_busy_until_hard_limit(self):
+        page = FakeReadyPage()
+        readiness = PageReadiness(page)
+        page.handlers['request']('https://ziggo.nl/slow.json')
+        ready = asyncio.run(readiness.settle())
+
+        self.assertTrue(ready['ready_timeout'])
+        self.assertEqual(ready['ready_pending'], ['network'])
+        self.assertLess(ready['ready_seconds'], 0.6)
+
+    def test_scroll_step_waits_for_its_requests(self):
+        page = FakeReadyPage()
+        readiness = PageReadiness(page)
+        page.handlers['request']('https://ziggo.nl/lazy.jpg')
+
+        started = time.monotonic()
+        self.assertEqual(asyncio.run(readiness._scroll(started + 5, 20)), 2)
+        # Twee stappen, elk begrensd op CAPTURE_READY_SCROLL_STEP_MS
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertLess(time.monotonic() - started, 0.4)
+
+        page.handlers['requestfinished']('https://ziggo.nl/lazy.jpg')
+        started = time.monotonic()
+        asyncio.run(readiness._scroll(started + 5, 20))
+        self.assertLess(time.monotonic() - started, 0.1)
+
+    def test_finished_request_and_dom_mutations(self):
+        page = FakeReadyPage(dom_idle=10)
+        readiness = PageReadiness(page)
+        page.handlers['request']('https://ziggo.nl/a.png')
+        self.assertEqual(readiness.network_idle_for(), 0.0)
+        page.handlers['requestfailed']('https://ziggo.nl/a.png')
+        self.assertGreaterEqual(readiness.network_idle_for(), 0.0)
+        self.assertFalse(readiness.in_flight)
+
+        ready = asyncio.run(readiness.settle())
+        self.assertEqual(ready['ready_pending'], ['dom'])
+
+
+@override_settings(CAPTURE_SCREENSHOT_FORMAT='webp', CAPTURE_SCREENSHOT_QUALITY=80,
+                   CAPTURE_SCREENSHOT_MAX_HEIGHT=1000, CAPTURE_SCREENSHOT_OVERFLOW='truncate')
+class ScreenshotEncodingTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def png(self, name='1_1.png', height=600):
+        path = self.directory / name
+        Image.new('RGBA', (400, height), (200, 30, 30, 255)).save(path)
+        return path
+
+    def test_encodes_next_to_png_and_removes_it(self):
+        source = self.png()
+        encoded = encode_screenshot(source)
+
+        self.assertEqual(encoded['path'], str(self.directory / '1_1.webp'))
+        self.assertFalse(source.exists())
+        self.assertLess(encoded['bytes'], encoded['source_bytes'])
+        with Image.open(encoded['path']) as image:
+            self.assertEqual((image.format, image.mode, image.size), ('WEBP', 'RGB', (400, 600)))
+
+    def test_height_cap_truncates_or_tiles(self):
+        truncated = encode_screenshot(self.png(height=2500), fmt='jpeg', remove_source=False)
+        self.assertTrue(truncated['truncated'])
+        with Image.open(truncated['path']) as image:
+            self.assertEqual(image.size, (400, 1000))
+
+        tiled = encode_screenshot(self.png(height=2500), overflow='tile')
+        self.assertFalse(tiled['truncated'])
+        self.assertEqual([Path(part).name for part in tiled['parts']], ['1_1.webp', '1_1.part2.webp', '1_1.part3.webp'])
+        with Image.open(tiled['parts'][-1]) as image:
+            self.assertEqual(image.size, (400, 500))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            encode_screenshot(self.png(), fmt='gif')
+
+    def test_transcode_command_rewrites_scan_paths(self):
+        target = Target.objects.create(name='Ziggo', url='https://ziggo.nl')
+        scan = Scan.objects.create(target=target, status='completed', screenshot_path='screenshots/1_1.png')
+        tall = Scan.objects.create(target=target, status='completed', screenshot_path='screenshots/1_2.png',
+                                   capture_stats={'requests': 10})
+        self.png('1_1.png')
+        self.png('1_2.png', height=2500)
+        self.png('orphan.png')
+
+        call_command('transcode_screenshots', dir=str(self.directory), workers=2, stdout=StringIO())
+
+        scan.refresh_from_db()
+        self.assertEqual(scan.screenshot_path, 'screenshots/1_1.webp')
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()), [
+            '1_1.webp', '1_2.part2.webp', '1_2.part3.webp', '1_2.webp', 'orphan.webp'
+        ])
+
+        # Archief nooit afkappen (ook niet met overflow 'truncate'): delen op de scan
+        tall.refresh_from_db()
+        self.assertEqual(tall.screenshot_path, 'screenshots/1_2.webp')
+        self.assertEqual(tall.capture_stats, {
+            'requests': 10, 'screenshot_parts': ['screenshots/1_2.part2.webp', 'screenshots/1_2.part3.webp']
+        })
+
+
+class DerivativesTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.media = Path(directory.name)
+        settings = override_settings(
+            MEDIA_ROOT=self.media, SCREENSHOT_DERIVATIVE_DIR=str(self.media / 'derivatives'),
+            SCREENSHOT_DERIVATIVE_WIDTHS=[480, 960], SCREENSHOT_DERIVATIVE_QUALITY=75
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        (self.media / 'screenshots').mkdir()
+        self.source = self.media / 'screenshots' / '1_1.webp'
+        Image.new('RGB', (1920, 800), (20, 120, 200)).save(self.source)
+        target = Target.objects.create(name='Ziggo', url='https://ziggo.nl')
+        self.scan = Scan.objects.create(target=target, status='success', screenshot_path='screenshots/1_1.webp')
+
+    def test_derivatives_named_by_content_hash(self):
+        digest = make_derivatives(self.source)
+
+        with Image.open(derivative_path(digest, 480)) as image:
+            self.assertEqual(image.size, (480, 200))
+        self.assertTrue(derivative_path(digest, 960).exists())
+
+        Image.new('RGB', (1920, 800), (200, 20, 20)).save(self.source)
+        self.assertNotEqual(make_derivatives(self.source), digest)
+
+    def test_srcset_only_with_digest(self):
+        self.assertEqual(srcset(self.scan), '')
+
+        self.scan.screenshot_digest = 'abc123'
+        self.assertEqual(srcset(self.scan), (
+            '/media/derivatives/abc123-480.webp 480w, /media/derivatives/abc123-960.webp 960w, '
+            '/media/screenshots/1_1.webp 1920w'
+        ))
+
+        # Ook een relatieve MEDIA_URL ('media/') geeft absolute URLs (geen 404 onder /dashboard/...)
+        with mock.patch('collector.scanner.derivatives.settings', MEDIA_URL='media/', SCREENSHOT_DERIVATIVE_WIDTHS=[480]):
+            candidates = srcset(self.scan).split(', ')
+        self.assertEqual(candidates, ['/media/derivatives/abc123-480.webp 480w', '/media/screenshots/1_1.webp 1920w'])
+
+    def test_view_regenerates_missing_derivative(self):
+        digest = make_derivatives(self.source, widths=[960])
+        Scan.objects.filter(id=self.scan.id).update(screenshot_digest=digest)
+        url = reverse('dashboard:screenshot_derivative', args=[digest, 480])
+        self.assertEqual(url, f'/media/derivatives/{digest}-480.webp')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+        response.close()
+        self.assertTrue(derivative_path(digest, 480).exists())
+
+        self.assertEqual(self.client.get(reverse('dashboard:screenshot_derivative', args=[digest, 123])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('dashboard:screenshot_derivative', args=['0' * 16, 480])).status_code, 404)
+
+    def test_backfill_command(self):
+        call_command('generate_derivatives', stdout=StringIO())
+
+        self.scan.refresh_from_db()
+        self.assertTrue(self.scan.screenshot_digest)
+        self.assertTrue(derivative_path(self.scan.screenshot_digest, 960).exists())
+        self.assertContains(self.client.get(reverse('dashboard:index')), f'{self.scan.screenshot_digest}-480.webp 480w')
+
+
+def page_image(path, price='45', height=3000):
+    """Nep screenshot: regels tekst met een prijs halverwege"""
+    image = Image.new('RGB', (1920, height), 'white')
+    draw = ImageDraw.Draw(image)
+    for y in range(40, height, 120):
+        draw.text((100, y), f'Internet vanaf {price if y == 1480 else 30} euro per maand', fill='black')
+    image.save(path, format='WEBP', quality=80)
+    return path
+
+
+VISUAL_SETTINGS = {
+    'VISUAL_DIFF_ENABLED': True, 'VISUAL_DIFF_THRESHOLD': 0.0, 'VISUAL_DIFF_WIDTH': 1920, 'VISUAL_DIFF_TILE': 32,
+    'VISUAL_DIFF_PIXEL_NOISE': 32, 'VISUAL_DIFF_TILE_FRACTION': 0.0,
+}
+
+
+@override_settings(**VISUAL_SETTINGS)
+class VisualDiffTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_same_pixel_hash_short_circuits(self):
+        first = page_image(self.directory / 'a.webp')
+        second = page_image(self.directory / 'b.webp')
+        baseline_hash = compare_screenshots(first)['visual_hash']
+
+        diff = compare_screenshots(second, baseline=self.directory / 'missing.webp', baseline_hash=baseline_hash)
+        self.assertTrue(diff['identical'])
+        self.assertEqual((diff['change'], diff['regions']), (0.0, []))
+
+    def test_changed_price_gives_region(self):
+        before = page_image(self.directory / 'a.webp')
+        after = page_image(self.directory / 'b.webp', price='49')
+        diff = compare_screenshots(after, baseline=before)
+
+        self.assertFalse(diff['identical'])
+        self.assertGreater(diff['change'], 0)
+        self.assertEqual(len(diff['regions']), 1)
+        x, y, w, h = diff['regions'][0]
+        self.assertTrue(y <= 1480 < y + h and x < 400 and w <= 640)
+
+    def test_one_digit_change_is_never_identical(self):
+        # Waarom PNG en deze maat: Hierop gaf een dHash per tegel 'identical'
+        def price_page(path, price):
+            image = Image.new('RGB', (1920, 800), 'white')
+            ImageDraw.Draw(image).text((230, 400), f'€ {price}', fill='black', font=ImageFont.load_default(size=16))
+            image.save(path, format='PNG')
+            return path
+
+        before = price_page(self.directory / 'a.png', '45,00')
+        baseline_hash = compare_screenshots(before)['visual_hash']
+        for price in ('46,00', '48,00'):
+            after = price_page(self.directory / f'{price}.png', price)
+            diff = compare_screenshots(after, baseline=before, baseline_hash=baseline_hash)
+
+            self.assertFalse(diff['identical'])
+            self.assertGreater(diff['tiles_changed'], 0)
+
+    def test_longer_page_is_a_change(self):
+        before = page_image(self.directory / 'a.webp')
+        after = page_image(self.directory / 'b.webp', height=3600)
+        diff = compare_screenshots(after, baseline=before)
+
+        self.assertFalse(diff['identical'])
+        self.assertGreater(diff['tiles_changed'], 0)
+        self.assertGreaterEqual(diff['regions'][0][1] + diff['regions'][0][3], 3000)
+
+
+# Waarom TransactionTestCase: De stages doen hun DB calls via sync_to_async (zie tests_scout)
+@override_settings(**VISUAL_SETTINGS)
+class VisualStageTestCase(TransactionTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        derivatives = override_settings(SCREENSHOT_DERIVATIVE_DIR=directory.name)
+        derivatives.enable()
+        self.addCleanup(derivatives.disable)
+
+        self.target = Target.objects.create(name='Ziggo', url='https://ziggo.nl')
+        screenshots = Path(settings.BASE_DIR) / 'storage' / 'screenshots'
+        screenshots.mkdir(parents=True, exist_ok=True)
+        baseline = page_image(screenshots / f'visual_{self.target.id}_baseline.webp')
+        self.addCleanup(baseline.unlink, missing_ok=True)
+        self.baseline = Scan.objects.create(
+            target=self.target, status='success', content_hash='old', analysis_json={'type': 'baseline'},
+            screenshot_path=f'screenshots/{baseline.name}'
+        )
+
+    def capture(self, price):
+        async def fake_capture(url, output_path, allow=None):
+            page_image(output_path, price=price)
+            self.addCleanup(Path(output_path).unlink, missing_ok=True)
+            return {'success': True, 'screenshot_path': output_path, 'error': None}
+
+        with mock.patch('collector.scanner.full_scan.capture_screenshot', side_effect=fake_capture), \
+             mock.patch('collector.tasks.analyze_task.delay') as analyze_delay:
+            capture_task(self.target.id, force_capture=True)
+        return analyze_delay, self.target.scans.exclude(id=self.baseline.id).latest('scanned_at')
+
+    def test_visually_same_page_skips_gemini(self):
+        Target.objects.filter(id=self.target.id).update(last_simhash='0123456789abcdef')
+        analyze_delay, scan = self.capture(price='45')
+
+        analyze_delay.assert_not_called()
+        self.assertEqual(scan.status, 'unchanged')
+        self.assertEqual(scan.visual_diff['baseline_scan_id'], self.baseline.id)
+        self.assertEqual(scan.visual_diff['change'], 0.0)
+        self.target.refresh_from_db()
+        self.assertEqual(self.target.last_hash, scan.content_hash)
+        # SimHash blijft die van de laatst geanalyseerde pagina
+        self.assertEqual(self.target.last_simhash, '0123456789abcdef')
+
+    def test_baseline_without_analysis_is_skipped(self):
+        # Nieuwere scan met dezelfde pagina, maar Gemini faalde: geen baseline
+        Scan.objects.filter(id=self.baseline.id).update(screenshot_path='screenshots/weg.webp')
+        failed = Scan.objects.create(
+            target=self.target, status='success', content_hash='failed', error_message='Gemini failed',
+            screenshot_path=f'screenshots/visual_{self.target.id}_baseline.webp'
+        )
+        analyze_delay, scan = self.capture(price='45')
+
+        analyze_delay.assert_called_once()
+        self.assertEqual(scan.status, 'pending')
+        self.assertNotEqual(scan.id, failed.id)
+
+    def test_visual_change_goes_to_gemini_with_regions(self):
+        analyze_delay, scan = self.capture(price='49')
+
+        analyze_delay.assert_called_once()
+        self.assertEqual(scan.status, 'pending')
+        self.assertTrue(scan.visual_hash)
+        self.assertEqual(len(scan.visual_diff['regions']), 1)
@@ -0,0 +1,129 @@
+from django.test import SimpleTestCase
+from collector.management.commands.bench_extract import FIXTURES_DIR, legacy_extract_content
+from collector.scanner.extractors import EXTRACTORS, get_extractor
+from collector.scanner.scout import extract_content
+from collector.scanner.sections import diff_sections
+
+
+TRICKY_PAGES = [
+    # Comments splitsen woorden, entities niet
+    '<html><body><p>Inter<!-- x -->net &amp; TV&nbsp;vanaf&euro;45</p></body></html>',
+    # Template / ruby tekst telt niet mee, images wel
+    '<body><template><p>Verborgen</p><img src="/t.png"></template><ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby></body>',
+    # Geneste skip tags, img in noscript, img zonder src, lege src
+    '<head><title>T</title></head><body><noscript><img src="/n.png"><p>JS uit</p></noscript>'
+    '<img alt="geen src"><img src=""><script>var a = "<p>nee</p>";</script>Zichtbaar</body>',
+    # Kapotte HTML en hoofdletters
+    '<DIV><P>Open<B>vet<I>cursief</P>rest<IMG SRC="/a.PNG"></div><table><td>cel',
+    # Doctype en processing instruction
+    '<!DOCTYPE html><?xml-stylesheet href="a"?><body>Na PI</body>',
+    # Lange text node over de chunk grens heen
+    '<body><p>' + ('woord ' * 20000) + 'einde</p></body>',
+    # Diep genest
+    '<body>' + '<div>' * 3000 + 'diep' + '</div>' * 3000 + '</body>',
+]
+
+ENCODED_PAGES = [
+    # Geen charset, wel UTF-8
+    '<html><body><p>Prijs € 45,– per maand</p></body></html>'.encode('utf-8'),
+    # Geen charset, Windows-1252
+    '<html><body><p>Prijs € 45 café</p></body></html>'.encode('windows-1252'),
+    # Geen charset, Latin-1: chardet gokt eerst een encoding die lxml niet kent (cp1006)
+    '<p>caf\xe9 x</p>'.encode('latin-1'),
+    # Charset in meta
+    '<html><head><meta charset="iso-8859-1"></head><body>één</body></html>'.encode('iso-8859-1'),
+    # UTF-8 BOM
+    '﻿<body>BOM pagina</body>'.encode('utf-8'),
+]
+
+
+class ExtractorBackendsTestCase(SimpleTestCase):
+    def assertMatchesLegacy(self, html):
+        reference = legacy_extract_content(html)
+        for name in EXTRACTORS:
+            with self.subTest(backend=name):
+                output = get_extractor(name).extract(html)
+                self.assertEqual({key: output[key] for key in reference}, reference)
+
+    def test_tricky_markup(self):
+        for html in TRICKY_PAGES:
+            with self.subTest(html=html[:40]):
+                self.assertMatchesLegacy(html)
+                self.assertMatchesLegacy(html.encode('utf-8'))
+
+    def test_encodings(self):
+        for html in ENCODED_PAGES:
+            with self.subTest(html=html[:40]):
+                self.assertMatchesLegacy(html)
+
+    def test_fixture_pages(self):
+        for path in sorted(FIXTURES_DIR.glob('*.html')):
+            with self.subTest(page=path.name):
+                self.assertMatchesLegacy(path.read_bytes())
+
+    def test_extract_content_backends(self):
+        html = '<body><h1>Welkom</h1><img src="/b.jpg"></body>'
+        result = extract_content(html, backend='lxml')
+
+        self.assertEqual(result['text'], 'Welkom')
+        self.assertEqual(result['images'], ['/b.jpg'])
+        self.assertEqual(result, extract_content(html, backend='soup'))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_extractor('regex')
+
+
+SECTION_PAGE = '''<html><body>
+<header><nav>Home Internet TV</nav></header>
+<main>
+  <section id="pakketten">
+    <h2>Internet</h2><div class="price-card">Vanaf {price} per maand</div><img src="/internet.png">
+    <h2>TV</h2><p>Alle zenders</p>
+  </section>
+</main>
+<footer>Contact</footer>
+</body></html>'''
+
+
+class SectionHashTestCase(SimpleTestCase):
+    def sections(self, html):
+        content = extract_content(html)
+        return {'root': content['merkle_root'], 'sections': content['sections']}
+
+    def test_backends_agree_on_sections(self):
+        pages = [SECTION_PAGE.format(price='€45')] + [p.read_bytes() for p in FIXTURES_DIR.glob('*.html')]
+        for html in pages:
+            soup = get_extractor('soup').extract(html)
+            lxml = get_extractor('lxml').extract(html)
+            self.assertEqual(soup['sections'], lxml['sections'])
+            self.assertEqual(soup['merkle_root'], lxml['merkle_root'])
+
+    def test_section_keys(self):
+        keys = [s['key'] for s in self.sections(SECTION_PAGE.format(price='€45'))['sections']]
+        self.assertEqual(keys, [
+            'header/nav',
+            'main/section#pakketten/h2:internet',
+            'main/section#pakketten/h2:internet/price',
+            'main/section#pakketten/h2:tv',
+            'footer',
+        ])
+
+    def test_price_change_is_localized(self):
+        old = self.sections(SECTION_PAGE.format(price='€45'))
+        new = self.sections(SECTION_PAGE.format(price='€40'))
+
+        self.assertNotEqual(old['root'], new['root'])
+        self.assertEqual(diff_sections(old, new), [{
+            'key': 'main/section#pakketten/h2:internet/price',
+            'change': 'changed',
+            'preview': 'Vanaf €40 per maand',
+        }])
+        self.assertEqual(diff_sections(old, old), [])
+
+    def test_added_and_removed_sections(self):
+        old = self.sections(SECTION_PAGE.format(price='€45'))
+        new = self.sections(SECTION_PAGE.format(price='€45').replace('<footer>Contact</footer>', '<aside>Actie!</aside>'))
+
+        changes = {s['key']: s['change'] for s in diff_sections(old, new)}
+        self.assertEqual(changes, {'aside': 'added', 'footer': 'removed'})
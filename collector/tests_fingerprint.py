@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase
+from collector.scanner.fingerprint import simhash, similarity
+
+
+PAGE = ' '.join(
+    f'Internet pakket {i} met snelheid {i * 100} Mbit en gratis installatie voor nieuwe klanten'
+    for i in range(40)
+)
+
+
+class SimHashTestCase(SimpleTestCase):
+    def test_deterministic(self):
+        self.assertEqual(simhash(PAGE, ['/a.png']), simhash(PAGE, ['/a.png']))
+        self.assertEqual(len(simhash(PAGE, [])), 16)
+
+    def test_small_change_stays_similar(self):
+        base = simhash(PAGE, ['/a.png'])
+        footer = simhash(PAGE + ' © 2026', ['/a.png'])
+        self.assertGreaterEqual(similarity(base, footer), 0.9)
+
+    def test_different_page_is_dissimilar(self):
+        base = simhash(PAGE, ['/a.png'])
+        other = simhash('Mobiel abonnement met onbeperkt bellen en 20 GB data ' * 20, ['/b.png'])
+        self.assertLess(similarity(base, other), 0.8)
+
+    def test_images_count(self):
+        self.assertNotEqual(simhash('Internet', ['/a.png']), simhash('Internet', ['/b.png']))
+
+    def test_empty_and_short_pages(self):
+        self.assertEqual(simhash('', []), '0' * 16)
+        self.assertEqual(similarity(simhash('', []), simhash('', [])), 1.0)
+        self.assertNotEqual(simhash('twee woorden', []), '0' * 16)
@@ -0,0 +1,109 @@
+import json
+from io import StringIO
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from collector.scanner.extractors import EXTRACTORS, get_extractor
+from collector.scanner.noise import Selector, build_noise_rules
+from shared.models import Scan, Target
+
+
+PAGE = '''<html><body>
+<main><h1>Internet</h1><p>Vanaf €45</p>
+<div class="viewers live">{viewers} mensen bekijken dit</div>
+<p>Bijgewerkt om {time}</p>
+<span data-csrf="{token}">Bestel</span>
+{images}
+</main></body></html>'''
+
+RULES = {
+    'drop_selectors': ['div.viewers'],
+    'text_patterns': [{'pattern': r'\d{2}:\d{2}', 'replace': 'HH:MM'}],
+    'image_strip_query': True,
+    'image_sort': True,
+}
+
+
+def render(viewers=12, time='10:15', token='abc', images=('/a.png?v=1', '/b.png?v=1')):
+    tags = ''.join(f'<img src="{src}">' for src in images)
+    return PAGE.format(viewers=viewers, time=time, token=token, images=tags)
+
+
+class NoiseRulesTestCase(SimpleTestCase):
+    def extract(self, html, rules=RULES, backend='lxml'):
+        return get_extractor(backend).extract(html, build_noise_rules(rules))
+
+    def test_noise_does_not_change_hash(self):
+        first = self.extract(render())
+        second = self.extract(render(viewers=40, time='11:45', token='xyz', images=('/b.png?v=2', '/a.png?v=2')))
+
+        self.assertEqual(first['hash'], second['hash'])
+        self.assertEqual(first['merkle_root'], second['merkle_root'])
+
+    def test_real_change_still_detected(self):
+        self.assertNotEqual(
+            self.extract(render())['hash'],
+            self.extract(render().replace('€45', '€40'))['hash']
+        )
+
+    def test_without_rules_noise_changes_hash(self):
+        self.assertNotEqual(self.extract(render(), None)['hash'], self.extract(render(viewers=40), None)['hash'])
+
+    def test_text_and_images_stay_unfiltered(self):
+        result = self.extract(render())
+
+        self.assertNotIn('mensen bekijken dit', result['text'])
+        self.assertIn('10:15', result['text'])
+        self.assertEqual(result['images'], ['/a.png?v=1', '/b.png?v=1'])
+
+    def test_backends_agree(self):
+        html = render()
+        outputs = [self.extract(html, backend=name) for name in EXTRACTORS]
+        self.assertTrue(all(output == outputs[0] for output in outputs))
+
+    def test_selectors(self):
+        self.assertTrue(Selector('div.viewers.live').matches('div', {'class': 'live viewers'}))
+        self.assertTrue(Selector('[data-csrf]').matches('span', {'data-csrf': 'abc'}))
+        self.assertTrue(Selector('#teller').matches('p', {'id': 'teller'}))
+        self.assertTrue(Selector('[data-role="timer"]').matches('p', {'data-role': 'timer'}))
+        self.assertFalse(Selector('[data-role=timer]').matches('p', {'data-role': 'klok'}))
+        self.assertFalse(Selector('span.viewers').matches('div', {'class': 'viewers'}))
+
+    def test_invalid_rules(self):
+        for rules in ({'drop_selectors': ['main > p']}, {'text_patterns': ['(']}, {'typo': True}):
+            with self.subTest(rules=rules), self.assertRaises(ValueError):
+                build_noise_rules(rules)
+        self.assertIsNone(build_noise_rules({}))
+        self.assertIsNone(build_noise_rules({'drop_selectors': []}))
+
+
+class NoiseRulesModelTestCase(TestCase):
+    def test_clean_rejects_invalid_rules(self):
+        target = Target(name='Ziggo', url='https://ziggo.nl', noise_rules={'text_patterns': ['[']})
+        with self.assertRaises(ValidationError):
+            target.full_clean()
+
+    def test_replay_counts_suppressed_changes(self):
+        target = Target.objects.create(name='Ziggo', url='https://ziggo.nl')
+        history = [
+            ('Internet €45 12 mensen bekijken dit', 'baseline'),
+            ('Internet €45 30 mensen bekijken dit', 'stable'),
+            ('Internet €40 30 mensen bekijken dit', 'critical'),
+            ('Internet €40 7 mensen bekijken dit', 'stable'),
+        ]
+        for text, analysis_type in history:
+            Scan.objects.create(
+                target=target,
+                content_hash='x',
+                status='success',
+                page_text=text,
+                page_images=[],
+                analysis_json={'type': analysis_type}
+            )
+
+        out = StringIO()
+        rules = {'text_patterns': [r'\d+ mensen bekijken dit']}
+        call_command('replay_noise_rules', '--rules', json.dumps(rules), stdout=out)
+
+        self.assertIn('2/3 wijzigingen onderdrukt', out.getvalue())
+        self.assertIn("0 daarvan 'critical'", out.getvalue())
@@ -0,0 +1,189 @@
+import json
+from datetime import timedelta
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from collector.scheduler.adaptive import update_adaptive_intervals
+from collector.scheduler.daemon import Scheduler, TimerHeap
+from collector.scheduler.feed import target_message
+from collector.scheduler.jobs import claim_due_targets, in_flight_count
+from collector.scheduler.lanes import clear_queued, mark_queued, queue_estimate
+from collector.scheduler.phase import next_slot, phase_offset
+from collector.tasks import scan_target_task
+from shared.models import Scan, Target
+
+
+class TimerHeapTestCase(SimpleTestCase):
+    def test_pops_in_deadline_order(self):
+        timers = TimerHeap()
+        timers.set(1, 30.0)
+        timers.set(2, 10.0)
+        timers.set(3, 20.0)
+
+        self.assertEqual(timers.next_deadline(), 10.0)
+        self.assertEqual(timers.pop_due(25.0), [2, 3])
+        self.assertEqual(len(timers), 1)
+
+    def test_update_and_delete_skip_stale_entries(self):
+        timers = TimerHeap()
+        timers.set(1, 10.0)
+        timers.set(2, 15.0)
+        timers.set(1, 50.0)
+        timers.set(2, None)
+
+        self.assertEqual(timers.next_deadline(), 50.0)
+        self.assertEqual(timers.pop_due(40.0), [])
+        self.assertEqual(timers.pop_due(50.0), [1])
+
+
+class PhaseTestCase(SimpleTestCase):
+    def test_phases_spread_over_interval(self):
+        phases = sorted(phase_offset(target_id, 900) for target_id in range(1, 101))
+        gaps = [b - a for a, b in zip(phases, phases[1:])]
+        self.assertLess(max(gaps), 900 / 100 * 3)
+
+    def test_next_slot_is_on_grid(self):
+        slot = next_slot(10_000, 7, 900)
+        self.assertTrue(10_000 < slot <= 10_900)
+        self.assertEqual(next_slot(slot, 7, 900), slot + 900)
+        self.assertAlmostEqual((slot - phase_offset(7, 900)) % 900, 0)
+
+
+class SchedulerTestCase(TestCase):
+    def setUp(self):
+        self.dispatched = []
+        self.scheduler = Scheduler(self.dispatched.extend, resync_seconds=300, max_sleep=1)
+
+    def test_dispatches_due_targets_and_reschedules(self):
+        due = Target.objects.create(name='A', url='http://a.example', interval=5)
+        later = Target.objects.create(name='B', url='http://b.example', last_scan_at=timezone.now())
+        Target.objects.create(name='C', url='http://c.example', status='paused')
+        self.scheduler.load()
+
+        self.assertEqual(self.scheduler.tick(), [due.id])
+        self.assertEqual(self.dispatched, [due.id])
+
+        # Geclaimd: volgende deadline komt uit de DB (nu + interval)
+        due.refresh_from_db()
+        self.assertEqual(self.scheduler.timers.deadlines[due.id], due.next_scan_at.timestamp())
+        self.assertIn(later.id, self.scheduler.timers.deadlines)
+        self.assertEqual(len(self.scheduler.timers), 2)
+
+    def test_change_feed_updates_heap(self):
+        target = Target.objects.create(name='A', url='http://a.example', last_scan_at=timezone.now())
+        self.scheduler.load()
+
+        soon = timezone.now() - timedelta(seconds=1)
+        self.scheduler.apply_message(target_message(target.id, soon))
+        self.assertEqual(self.scheduler.timers.next_deadline(), soon.timestamp())
+
+        self.scheduler.apply_message(target_message(target.id))
+        self.assertEqual(len(self.scheduler.timers), 0)
+
+    def test_publishes_after_commit(self):
+        with mock.patch('collector.scheduler.feed.publish') as publish, \
+             self.captureOnCommitCallbacks(execute=True):
+            target = Target.objects.create(name='A', url='http://a.example')
+
+        message = json.loads(publish.call_args.args[0])
+        self.assertEqual(message['id'], target.id)
+        self.assertEqual(message['next_scan_at'], target.next_scan_at.isoformat())
+
+        with mock.patch('collector.scheduler.feed.publish') as publish, \
+             self.captureOnCommitCallbacks(execute=True):
+            target.status = 'paused'
+            target.save()
+        self.assertIsNone(json.loads(publish.call_args.args[0])['next_scan_at'])
+
+    @override_settings(SCAN_MAX_IN_FLIGHT=2)
+    def test_respects_in_flight_budget(self):
+        ids = {Target.objects.create(name=str(i), url=f'http://{i}.example').id for i in range(3)}
+
+        claimed = claim_due_targets()
+        self.assertEqual(len(claimed), 2)
+        self.assertEqual(claim_due_targets(), [])
+        self.assertEqual(in_flight_count(), 2)
+
+        # Scan klaar: dispatched_at gewist, budget weer vrij voor de derde
+        done = Target.objects.get(id=claimed[0])
+        done.last_scan_at = timezone.now()
+        done.save()
+        self.assertIsNone(done.dispatched_at)
+        self.assertEqual(claim_due_targets(), list(ids - set(claimed)))
+
+
+class AdaptiveIntervalTestCase(TestCase):
+    def make_target(self, name, changes, **fields):
+        target = Target.objects.create(name=name, url=f'http://{name}.example', interval=60, adaptive_interval=True, **fields)
+        Target.objects.filter(id=target.id).update(created_at=timezone.now() - timedelta(days=14))
+        for _ in range(changes):
+            Scan.objects.create(target=target, content_hash='x', status='success')
+        return target
+
+    def test_volatile_shortens_and_static_lengthens(self):
+        volatile = self.make_target('druk', changes=200)
+        static = self.make_target('rustig', changes=0)
+        fixed = self.make_target('vast', changes=200)
+        Target.objects.filter(id=fixed.id).update(adaptive_interval=False)
+
+        decisions = {d['target_id']: d for d in update_adaptive_intervals()}
+
+        # Gedempt: max factor 2 per stap
+        self.assertEqual(decisions[volatile.id]['new'], 30)
+        self.assertEqual(decisions[static.id]['new'], 120)
+        self.assertNotIn(fixed.id, decisions)
+
+        volatile.refresh_from_db()
+        self.assertEqual(volatile.scan_interval, 30)
+
+    @override_settings(ADAPTIVE_INTERVAL_MAX=60)
+    def test_respects_bounds_and_dry_run(self):
+        static = self.make_target('rustig', changes=0)
+
+        self.assertEqual(update_adaptive_intervals(dry_run=True)[0]['new'], 60)
+        static.refresh_from_db()
+        self.assertIsNone(static.effective_interval)
+
+    @override_settings(ADAPTIVE_INTERVAL_MIN=20, ADAPTIVE_INTERVAL_MAX=25)
+    def test_bounds_without_ladder_step_clamp(self):
+        self.make_target('rustig', changes=0)
+
+        self.assertEqual(update_adaptive_intervals(dry_run=True)[0]['new'], 25)
+
+    def test_forced_scans_are_not_changes(self):
+        target = self.make_target('handmatig', changes=0)
+        for _ in range(200):
+            Scan.objects.create(target=target, content_hash='x', status='success', forced=True)
+
+        self.assertEqual(update_adaptive_intervals(dry_run=True)[0]['new'], 120)
+
+
+@override_settings(INTERACTIVE_CONCURRENCY=1, INTERACTIVE_QUEUE='interactive')
+class InteractiveLaneTestCase(TestCase):
+    def test_queue_position_and_eta_from_stage_durations(self):
+        targets = [Target.objects.create(name=str(i), url=f'http://{i}.example') for i in range(3)]
+        for minutes_ago, target in zip((3, 2, 1), targets):
+            mark_queued(target.id)
+            Target.objects.filter(id=target.id).update(scan_requested_at=timezone.now() - timedelta(minutes=minutes_ago))
+        for seconds in (8, 10, 30):
+            Scan.objects.create(target=targets[0], content_hash='x', stage_seconds={'capture': 4, 'analysis': seconds - 4})
+
+        estimate = queue_estimate(targets[2].id)
+        self.assertEqual((estimate['queue_position'], estimate['estimated_wait']), (3, 20))
+
+        clear_queued(targets[0].id)
+        status = self.client.get(reverse('dashboard:scan_status', args=[targets[2].id])).json()
+        self.assertEqual(status['queue_position'], 2)
+        self.assertEqual(queue_estimate(targets[0].id), {})
+
+    def test_interactive_chain_stays_on_interactive_queue(self):
+        target = Target.objects.create(name='A', url='http://a.example')
+        mark_queued(target.id)
+
+        with mock.patch('collector.tasks.capture_task.apply_async') as capture_async:
+            scan_target_task(target.id, force_capture=True, interactive=True)
+
+        self.assertEqual(capture_async.call_args.kwargs['queue'], 'interactive')
+        self.assertTrue(capture_async.call_args.args[1]['interactive'])
+        self.assertEqual(queue_estimate(target.id), {})
@@ -0,0 +1,535 @@
+import asyncio
+import threading
+from datetime import timedelta
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from shared.models import DomainHealth, Scan, Target
+from collector.scanner.scout import _interleave_domains, scout_scan_many_sync
+from collector.scanner.full_scan import _remember_variant, perform_full_scans, scout_targets
+from collector.scanner.breaker import allow_scan, record_failure
+from collector.scanner import politeness
+from collector.scanner.capture import capture_screenshot_sync
+from collector.scanner.lease import acquire_scan_lease, release_scan_lease, renew_scan_lease
+from collector.scheduler.jobs import due_targets
+from collector.tasks import analyze_task, capture_task, check_and_scan_targets, persist_task, scout_batch_task
+
+
+PAGES = {
+    '/internet': b"<html><body><h1>Internet</h1><p>vanaf 45 euro</p><img src='/a.png'></body></html>",
+    '/tv': b"<html><body><h1>TV</h1><p>vanaf 20 euro</p></body></html>",
+    '/etag': b"<html><body><h1>Mobiel</h1><p>vanaf 10 euro</p></body></html>",
+    '/prijzen': b"<html><body><h1>Prijzen</h1><div class='price'>45 euro</div><p>Nu met gratis installatie</p></body></html>",
+}
+ETAG = '"v1"'
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.path == '/etag' and self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        if self.path == '/etag':
+            self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalSiteMixin:
+    # Lokale testserver: geen politeness wachttijden (zie PolitenessTestCase)
+    @classmethod
+    def setUpClass(cls):
+        cls.politeness = override_settings(POLITENESS_ENABLED=False)
+        cls.politeness.enable()
+        cls.addClassCleanup(cls.politeness.disable)
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+
+class ScoutScanManyTestCase(LocalSiteMixin, TestCase):
+    def test_scouts_all_urls_in_one_batch(self):
+        urls = [f'{self.base_url}/internet', f'{self.base_url}/tv', f'{self.base_url}/internet']
+        results = scout_scan_many_sync(urls, concurrency=4)
+
+        self.assertEqual(set(results), {urls[0], urls[1]})
+        self.assertTrue(all(r['success'] for r in results.values()))
+        self.assertEqual(results[urls[0]]['image_count'], 1)
+        self.assertNotEqual(results[urls[0]]['hash'], results[urls[1]]['hash'])
+
+    def test_repeated_batches_in_same_process(self):
+        url = f'{self.base_url}/tv'
+        first = scout_scan_many_sync([url])
+        second = scout_scan_many_sync([url])
+
+        self.assertTrue(second[url]['success'])
+        self.assertEqual(first[url]['hash'], second[url]['hash'])
+
+    def test_only_changed_targets_go_to_capture(self):
+        url = f'{self.base_url}/internet'
+        baseline = scout_scan_many_sync([url])[url]['hash']
+
+        unchanged = Target.objects.create(name='Same', url=url, last_hash=baseline)
+        changed = Target.objects.create(name='New', url=f'{self.base_url}/tv', last_hash='old')
+        broken = Target.objects.create(name='Gone', url=f'{self.base_url}/missing')
+
+        summary = scout_targets([unchanged.id, changed.id, broken.id])
+
+        self.assertEqual(list(summary['changed']), [changed.id])
+        self.assertEqual(summary['unchanged'], [unchanged.id])
+        self.assertIn(broken.id, summary['failed'])
+
+        unchanged.refresh_from_db()
+        self.assertIsNotNone(unchanged.last_scan_at)
+        self.assertEqual(unchanged.last_hash, baseline)
+
+
+class ConditionalGetTestCase(LocalSiteMixin, TestCase):
+    def test_not_modified_skips_download_and_parsing(self):
+        url = f'{self.base_url}/etag'
+        target = Target.objects.create(name='Mobiel', url=url)
+
+        # Eerste run: change (geen last_hash), validators nog niet bewaard
+        first = scout_targets([target.id])
+        scout_result = first['changed'][target.id]
+        self.assertEqual(scout_result['etag'], ETAG)
+
+        # Na een geslaagde analyse horen hash + validators bij elkaar
+        target.last_hash = scout_result['hash']
+        target.http_etag = scout_result['etag']
+        target.body_digest = scout_result['body_digest']
+        target.save()
+
+        second = scout_targets([target.id])
+        self.assertEqual(second['unchanged'], [target.id])
+        self.assertEqual(second['not_modified'], 1)
+
+    def test_same_body_skips_parsing(self):
+        url = f'{self.base_url}/tv'
+        scout_result = scout_scan_many_sync([url])[url]
+        target = Target.objects.create(
+            name='TV',
+            url=url,
+            last_hash=scout_result['hash'],
+            body_digest=scout_result['body_digest']
+        )
+
+        summary = scout_targets([target.id])
+        self.assertEqual(summary['unchanged'], [target.id])
+        self.assertEqual(summary['body_unchanged'], 1)
+
+    def test_validators_without_hash_are_not_sent(self):
+        url = f'{self.base_url}/etag'
+        target = Target.objects.create(name='Mobiel', url=url, http_etag=ETAG)
+
+        summary = scout_targets([target.id])
+        self.assertIn(target.id, summary['changed'])
+        self.assertEqual(summary['not_modified'], 0)
+
+
+class SimilarityThresholdTestCase(LocalSiteMixin, TestCase):
+    def scout(self, path):
+        url = f'{self.base_url}{path}'
+        return url, scout_scan_many_sync([url])[url]
+
+    def test_similar_page_skips_capture(self):
+        url, scout_result = self.scout('/tv')
+        target = Target.objects.create(
+            name='TV', url=url, last_hash='old', last_simhash=scout_result['simhash'],
+            http_etag=ETAG, body_digest='old'
+        )
+
+        summary = scout_targets([target.id])
+        self.assertEqual(summary['unchanged'], [target.id])
+        self.assertEqual(summary['minor'], 1)
+
+        # last_hash blijft bij de laatst geanalyseerde pagina, dus geen
+        # validators van deze body (een 304 zou anders 'old' bevestigen)
+        target.refresh_from_db()
+        self.assertEqual(target.last_hash, 'old')
+        self.assertEqual((target.http_etag, target.http_last_modified, target.body_digest), (None, None, None))
+
+    def test_dissimilar_page_goes_to_capture(self):
+        url, scout_result = self.scout('/tv')
+        inverted = f"{int(scout_result['simhash'], 16) ^ (2 ** 64 - 1):016x}"
+        target = Target.objects.create(name='TV', url=url, last_hash='old', last_simhash=inverted)
+
+        summary = scout_targets([target.id])
+        self.assertIn(target.id, summary['changed'])
+
+    def test_per_target_threshold(self):
+        url, scout_result = self.scout('/tv')
+        one_bit_off = f"{int(scout_result['simhash'], 16) ^ 1:016x}"
+        target = Target.objects.create(
+            name='TV', url=url, last_hash='old', last_simhash=one_bit_off, similarity_threshold=1.0
+        )
+
+        self.assertIn(target.id, scout_targets([target.id])['changed'])
+
+    def test_price_block_change_always_goes_to_capture(self):
+        url, scout_result = self.scout('/prijzen')
+        target = Target.objects.create(name='Prijzen', url=url, last_hash='old', last_simhash=scout_result['simhash'])
+
+        # Vorige analyse: zelfde pagina, ander prijsblok
+        sections = [dict(section) for section in scout_result['sections']]
+        for section in sections:
+            if section['key'].endswith('price'):
+                section['hash'] = 'old'
+        Scan.objects.create(
+            target=target,
+            content_hash='old',
+            status='success',
+            section_hashes={'root': 'old', 'sections': sections}
+        )
+
+        self.assertIn(target.id, scout_targets([target.id])['changed'])
+
+
+class KnownVariantTestCase(LocalSiteMixin, TestCase):
+    def setUp(self):
+        self.url = f'{self.base_url}/tv'
+        self.variant_hash = scout_scan_many_sync([self.url])[self.url]['hash']
+        self.target = Target.objects.create(name='TV', url=self.url, last_hash='variant-a')
+
+    def add_variant(self, analysis):
+        scan = Scan.objects.create(
+            target=self.target,
+            content_hash=self.variant_hash,
+            status='success',
+            analysis_json=analysis
+        )
+        self.target.known_variants = [{'hash': self.variant_hash, 'simhash': None, 'scan_id': scan.id, 'seen_at': ''}]
+        self.target.save()
+        return scan
+
+    def test_known_variant_reuses_analysis(self):
+        self.add_variant({'type': 'stable'})
+
+        summary = scout_targets([self.target.id])
+        self.assertEqual(summary['unchanged'], [self.target.id])
+        self.assertEqual(summary['variants'], 1)
+
+        self.target.refresh_from_db()
+        self.assertEqual(self.target.last_hash, self.variant_hash)
+        self.assertNotEqual(self.target.known_variants[0]['seen_at'], '')
+
+    def test_variant_without_analysis_is_captured(self):
+        self.add_variant(None)
+        self.assertIn(self.target.id, scout_targets([self.target.id])['changed'])
+
+    @override_settings(SCOUT_KNOWN_VARIANTS=2)
+    def test_variants_are_bounded_and_recency_ordered(self):
+        scans = [
+            Scan.objects.create(target=self.target, content_hash=h, status='success', analysis_json={})
+            for h in ('a', 'b', 'c', 'a')
+        ]
+        for scan in scans:
+            _remember_variant(self.target, scan)
+
+        self.assertEqual([v['hash'] for v in self.target.known_variants], ['a', 'c'])
+        self.assertEqual(self.target.known_variants[0]['scan_id'], scans[-1].id)
+
+
+# Waarom TransactionTestCase: De pipeline doet z'n DB calls via sync_to_async
+# in een andere thread, die ziet de transactie van TestCase niet
+class ScanPipelineTestCase(LocalSiteMixin, TransactionTestCase):
+    def test_pipeline_runs_targets_in_one_loop(self):
+        targets = [
+            Target.objects.create(name=path, url=f'{self.base_url}{path}')
+            for path in ('/internet', '/tv', '/prijzen')
+        ]
+        in_flight = []
+        peak = []
+
+        async def capture(url, output_path, allow=None):
+            in_flight.append(url)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.05)
+            in_flight.remove(url)
+            return {'success': True, 'screenshot_path': output_path, 'error': None}
+
+        with mock.patch('collector.scanner.full_scan.capture_screenshot', side_effect=capture) as capture_mock, \
+             mock.patch('collector.scanner.full_scan.analyze_screenshot',
+                        return_value={'success': True, 'analysis': {'type': 'stable', 'title': 'Baseline'}}):
+            results = perform_full_scans({target.id: None for target in targets}, concurrency=2)
+
+        self.assertEqual(capture_mock.call_count, 3)
+        self.assertEqual(max(peak), 2)
+        self.assertTrue(all(result['success'] for result in results.values()))
+        for target in targets:
+            target.refresh_from_db()
+            scan = target.scans.get()
+            self.assertEqual(target.last_hash, scan.content_hash)
+            self.assertEqual(scan.analysis_type, 'stable')
+            self.assertIsNotNone(scan.simhash)
+
+
+    def test_stages_hand_off_through_queues(self):
+        target = Target.objects.create(name='TV', url=f'{self.base_url}/tv')
+        analysis = {'type': 'critical', 'title': 'Prijs', 'changes': [{'impact_score': 8}]}
+
+        with mock.patch('collector.tasks.capture_task.delay') as capture_delay:
+            scout_batch_task([target.id])
+        scout_result = capture_delay.call_args.kwargs['scout_result']
+
+        with mock.patch('collector.scanner.full_scan.capture_screenshot', side_effect=self.fake_capture), \
+             mock.patch('collector.tasks.analyze_task.delay') as analyze_delay:
+            capture_task(target.id, scout_result=scout_result)
+        scan_id = analyze_delay.call_args.args[1]
+        scan = Scan.objects.get(id=scan_id)
+        self.assertEqual((scan.status, scan.content_hash), ('pending', scout_result['hash']))
+
+        with mock.patch('collector.scanner.full_scan.analyze_screenshot', return_value={'success': True, 'analysis': analysis}), \
+             mock.patch('collector.tasks.persist_task.delay') as persist_delay:
+            analyze_task(target.id, scan_id, **analyze_delay.call_args.kwargs)
+
+        with mock.patch('collector.tasks.send_alert_task.delay') as alert_delay:
+            persist_task(target.id, scan_id, **persist_delay.call_args.kwargs)
+            persist_task(target.id, scan_id, **persist_delay.call_args.kwargs)
+
+        scan = target.scans.get()
+        self.assertEqual((scan.status, scan.analysis_json), ('success', analysis))
+        alert_delay.assert_called_with(scan.id)
+        target.refresh_from_db()
+        self.assertEqual(target.last_hash, scout_result['hash'])
+        self.assertEqual(target.known_variants[0]['scan_id'], scan.id)
+        self.assertEqual(len(target.known_variants), 1)
+
+    def test_retry_resumes_from_checkpoint(self):
+        target = Target.objects.create(name='TV', url=f'{self.base_url}/tv')
+
+        with mock.patch('collector.scanner.full_scan.capture_screenshot', side_effect=self.fake_capture) as capture_mock, \
+             mock.patch('collector.tasks.analyze_task.delay') as analyze_delay:
+            capture_task(target.id, force_capture=True)
+            scan_id = analyze_delay.call_args.args[1]
+
+            with mock.patch('collector.scanner.full_scan.analyze_screenshot', side_effect=TimeoutError('Gemini timeout')):
+                with self.assertRaises(TimeoutError):
+                    analyze_task(target.id, scan_id)
+
+            # Dubbel afgeleverde capture: zelfde scan, geen nieuw screenshot
+            capture_task(target.id, force_capture=True, scan_id=scan_id, lease=analyze_delay.call_args.kwargs['lease'])
+
+            with mock.patch('collector.scanner.full_scan.analyze_screenshot',
+                            return_value={'success': True, 'analysis': {'type': 'stable'}}) as gemini, \
+                 mock.patch('collector.tasks.persist_task.delay'):
+                analyze_task(target.id, scan_id)
+                analyze_task(target.id, scan_id)
+
+        self.assertEqual(capture_mock.call_count, 1)
+        self.assertEqual(gemini.call_count, 1)
+        self.assertEqual(Scan.objects.get(id=scan_id).status, 'pending')
+
+    async def fake_capture(self, url, output_path, allow=None):
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(output_path).write_bytes(b'png')
+        self.addCleanup(Path(output_path).unlink, missing_ok=True)
+        return {'success': True, 'screenshot_path': output_path, 'error': None}
+
+class CheckAndScanTargetsTestCase(TestCase):
+    def test_enqueues_due_batches_as_group(self):
+        first = Target.objects.create(name='A', url='http://a.example')
+        second = Target.objects.create(name='B', url='http://b.example')
+        Target.objects.create(name='C', url='http://c.example', status='paused')
+        Target.objects.create(name='D', url='http://d.example', last_scan_at=timezone.now())
+
+        with override_settings(SCOUT_BATCH_SIZE=1), mock.patch('collector.tasks.group') as group:
+            result = check_and_scan_targets()
+
+        batches = [signature.args[0] for signature in group.call_args.args[0]]
+        self.assertCountEqual(batches, [[first.id], [second.id]])
+        group.return_value.apply_async.assert_called_once()
+        self.assertEqual((result['scanned'], result['batches']), (2, 2))
+
+        # Geclaimd: de volgende tick pakt ze niet nog eens
+        with mock.patch('collector.tasks.group') as group:
+            self.assertEqual(check_and_scan_targets()['scanned'], 0)
+        group.assert_not_called()
+
+    def test_next_scan_at_follows_scan_and_interval(self):
+        now = timezone.now()
+        target = Target.objects.create(name='A', url='http://a.example', interval=15)
+        self.assertLessEqual(target.next_scan_at, timezone.now())
+
+        target.last_scan_at = now
+        target.save(update_fields=['last_scan_at'])
+        target.refresh_from_db()
+        self.assertTrue(now < target.next_scan_at <= now + timedelta(minutes=15))
+
+        target.interval = 60
+        target.save()
+        next_scan_at = Target.objects.get(id=target.id).next_scan_at
+        self.assertTrue(now < next_scan_at <= now + timedelta(minutes=60))
+        self.assertFalse(due_targets().exists())
+
+
+class ScanLeaseTestCase(TestCase):
+    def test_one_lease_per_target_until_expired(self):
+        target = Target.objects.create(name='A', url='http://a.example')
+        token = acquire_scan_lease(target.id)
+        self.assertIsNotNone(token)
+        self.assertIsNone(acquire_scan_lease(target.id))
+
+        # Volledige save van een oud object overschrijft de lease niet
+        stale = Target.objects.get(id=target.id)
+        Target.objects.filter(id=target.id).update(scan_lease_token=token)
+        stale.save()
+        self.assertIsNone(acquire_scan_lease(target.id))
+        self.assertFalse(due_targets(timezone.now() + timedelta(minutes=1)).exists())
+
+        # Gecrashte worker: na de TTL is de lease weer vrij
+        Target.objects.filter(id=target.id).update(scan_lease_until=timezone.now() - timedelta(seconds=1))
+        self.assertFalse(renew_scan_lease(target.id, 'iemand-anders'))
+        new_token = acquire_scan_lease(target.id)
+        self.assertIsNotNone(new_token)
+
+        # Oude eigenaar geeft niks vrij dat niet meer van hem is
+        release_scan_lease(target.id, token)
+        self.assertIsNone(acquire_scan_lease(target.id))
+        release_scan_lease(target.id, new_token)
+        self.assertIsNotNone(acquire_scan_lease(target.id))
+
+    def test_duplicate_scans_are_coalesced(self):
+        target = Target.objects.create(name='A', url='http://a.example')
+        url = reverse('dashboard:trigger_scan', args=[target.id])
+
+        with mock.patch('collector.tasks.scan_target_task.apply_async') as scan_async:
+            first = self.client.post(url).json()
+            second = self.client.post(url).json()
+
+        scan_async.assert_called_once()
+        self.assertNotIn('coalesced', first)
+        self.assertTrue(second['coalesced'])
+        self.assertEqual(second['progress']['state'], 'queued')
+
+        # Scheduler levert dezelfde target nog eens af: geen tweede capture
+        with mock.patch('collector.tasks.start_stage') as start:
+            self.assertTrue(capture_task(target.id)['coalesced'])
+        start.assert_not_called()
+
+
+@override_settings(BREAKER_FAILURE_THRESHOLD=2, BREAKER_BASE_SECONDS=300)
+class CircuitBreakerTestCase(LocalSiteMixin, TestCase):
+    def test_failing_domain_is_skipped_until_probe_succeeds(self):
+        # Zelfde server, ander domein: localhost heeft een eigen breaker
+        other_base = self.base_url.replace('127.0.0.1', 'localhost')
+        broken = Target.objects.create(name='Gone', url=f'{other_base}/missing')
+        sibling = Target.objects.create(name='TV', url=f'{other_base}/tv', last_hash='old')
+        healthy = Target.objects.create(name='Internet', url=f'{self.base_url}/internet')
+
+        scout_targets([broken.id])
+        scout_targets([broken.id])
+        health = DomainHealth.objects.get(domain='localhost')
+        self.assertEqual((health.state, health.consecutive_failures), ('open', 2))
+
+        summary = scout_targets([broken.id, sibling.id, healthy.id])
+        self.assertCountEqual(summary['skipped'], [broken.id, sibling.id])
+        self.assertIn(healthy.id, summary['changed'])
+
+        # Na de backoff: één proefscan, die slaagt → breaker dicht
+        DomainHealth.objects.filter(domain='localhost').update(retry_at=timezone.now())
+        summary = scout_targets([sibling.id])
+        self.assertIn(sibling.id, summary['changed'])
+        self.assertEqual(DomainHealth.objects.get(domain='localhost').state, 'closed')
+
+    def test_failed_probe_reopens_with_longer_backoff(self):
+        url = 'https://www.down.example/page'
+        record_failure(url, 'timeout')
+        first = record_failure(url, 'timeout')
+        self.assertEqual(first.domain, 'down.example')
+        self.assertFalse(allow_scan(url))
+
+        DomainHealth.objects.filter(id=first.id).update(retry_at=timezone.now())
+        self.assertTrue(allow_scan(url))
+        self.assertFalse(allow_scan('https://down.example/other'))
+
+        second = record_failure(url, 'timeout')
+        self.assertEqual(second.state, 'open')
+        self.assertGreater(second.retry_at - second.last_failure_at, first.retry_at - first.last_failure_at)
+
+
+@override_settings(POLITENESS_RATE=2.0, POLITENESS_BURST=2, POLITENESS_LIMITS={'ziggo.nl': {'rate': 0.5, 'burst': 1}})
+class PolitenessTestCase(SimpleTestCase):
+    def setUp(self):
+        # Altijd de in-memory bucket (ook als er lokaal een Redis draait)
+        patcher = mock.patch('collector.scanner.politeness._reserve_redis', side_effect=ConnectionError('geen redis'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        politeness._buckets.clear()
+        politeness._stats.clear()
+        politeness._redis_down_until = 0.0
+
+    def test_bucket_per_domain_with_overrides(self):
+        self.assertEqual(politeness.limits_for('www2.ziggo.nl'), (0.5, 1.0))
+        self.assertEqual(politeness.limits_for('kpn.com'), (2.0, 2.0))
+
+        waits = [politeness.reserve('https://kpn.com/' + str(i)) for i in range(4)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.5, places=1)
+        self.assertAlmostEqual(waits[3], 1.0, places=1)
+
+        # Ander domein heeft z'n eigen bucket, www. telt als hetzelfde domein
+        self.assertEqual(politeness.reserve('https://www.ziggo.nl/internet'), 0.0)
+        self.assertAlmostEqual(politeness.reserve('https://ziggo.nl/tv'), 2.0, places=1)
+
+        stats = politeness.wait_stats()
+        self.assertEqual((stats['kpn.com']['acquired'], stats['kpn.com']['waited']), (4, 2))
+        self.assertAlmostEqual(stats['ziggo.nl']['max_wait'], 2.0, places=1)
+
+    @override_settings(POLITENESS_MAX_WAIT=3)
+    def test_acquire_sleeps_for_token_or_defers(self):
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+
+        with mock.patch('collector.scanner.politeness.asyncio.sleep', side_effect=fake_sleep):
+            for _ in range(2):
+                asyncio.run(politeness.acquire('https://ziggo.nl/tv'))
+            for _ in range(2):
+                with self.assertRaises(politeness.PolitenessDeferred):
+                    asyncio.run(politeness.acquire('https://ziggo.nl/tv'))
+        self.assertEqual(len(sleeps), 1)
+        self.assertAlmostEqual(sleeps[0], 2.0, places=1)
+
+        # Overgeslagen requests reserveren niks: de schuld loopt niet op
+        self.assertAlmostEqual(politeness.reserve('https://ziggo.nl/tv'), 4.0, places=1)
+        stats = politeness.wait_stats()['ziggo.nl']
+        self.assertEqual((stats['acquired'], stats['deferred']), (2, 3))
+
+    @override_settings(POLITENESS_MAX_WAIT=0)
+    def test_sync_capture_acquires_too(self):
+        politeness.reserve('https://ziggo.nl/tv')
+        with mock.patch('collector.scanner.capture.get_browser_pool') as pool:
+            result = capture_screenshot_sync('https://ziggo.nl/internet', '/tmp/niet.png')
+
+        pool.assert_not_called()
+        self.assertTrue(result['deferred'])
+        self.assertEqual(politeness.wait_stats()['ziggo.nl']['deferred'], 1)
+
+    def test_scout_requests_interleave_domains(self):
+        urls = ['http://a.nl/1', 'http://a.nl/2', 'http://a.nl/3', 'http://b.nl/1']
+        self.assertEqual(_interleave_domains(urls), ['http://a.nl/1', 'http://b.nl/1', 'http://a.nl/2', 'http://a.nl/3'])
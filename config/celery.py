@@ -42,9 +42,14 @@ def debug_task(self):
 # Periodic tasks schedule
 # Waarom: We willen NIET elke minuut alle targets scannen
 # In plaats daarvan: Elke minuut check welke targets DUE zijn
+# Nauwkeuriger (per seconde, zonder polling): python manage.py run_scheduler
 # app.conf.beat_schedule = {
 #     'check-targets-for-scanning': {
 #         'task': 'collector.tasks.check_and_scan_targets',
 #         'schedule': 60.0,  # Elke minuut
 #     },
+#     'adapt-intervals': {
+#         'task': 'collector.tasks.adapt_intervals_task',
+#         'schedule': 3600.0,  # Elk uur
+#     },
 # }
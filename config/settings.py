@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import json
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -217,5 +218,213 @@ CELERY_TASK_TRACK_STARTED = True  # Track wanneer task start
 CELERY_TASK_TIME_LIMIT = 30 * 60  # Max 30 minuten per task
 CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # Soft limit 25 minuten
 
+# Queue per pipeline stage (zie collector/tasks.py)
+# Waarom: Scout is goedkoop, capture is zwaar (Chromium), Gemini heeft een quota.
+# Met eigen queues schaal je elke stage los: zie Procfile / docker-compose.
+# Niet gerouteerde tasks (persist, alerts, beat) gaan naar de default queue 'celery'.
+CELERY_TASK_ROUTES = {
+    'collector.tasks.scout_batch_task': {'queue': 'scout'},
+    'collector.tasks.scan_target_task': {'queue': 'scout'},
+    'collector.tasks.capture_task': {'queue': 'capture'},
+    'collector.tasks.analyze_task': {'queue': 'analysis'},
+}
+
+# Max Gemini calls per analysis worker (Celery rate_limit formaat: '10/m')
+GEMINI_RATE_LIMIT = os.environ.get('GEMINI_RATE_LIMIT', '10/m')
+
+# Per-target scan lease (collector/scanner/lease.py)
+# Waarom = task time limit: Langer dan dat kan één stage niet lopen,
+# daarna is de lease van een gecrashte worker weer vrij
+SCAN_LEASE_TTL = int(os.environ.get('SCAN_LEASE_TTL', CELERY_TASK_TIME_LIMIT))
+
+# Retry van een mislukte stage: exponentieel (60s, 120s, 240s)
+SCAN_RETRY_BASE_SECONDS = int(os.environ.get('SCAN_RETRY_BASE_SECONDS', 60))
+
+# Circuit breaker per domein (collector/scanner/breaker.py)
+# Na N mislukte scouts/captures op rij: domein overslaan, eerst BASE sec,
+# daarna elke keer dubbel zo lang (max MAX sec), met één proefscan ertussen
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get('BREAKER_FAILURE_THRESHOLD', 3))
+BREAKER_BASE_SECONDS = int(os.environ.get('BREAKER_BASE_SECONDS', 5 * 60))
+BREAKER_MAX_SECONDS = int(os.environ.get('BREAKER_MAX_SECONDS', 6 * 60 * 60))
+
+# Interactieve scans (dashboard 'scan' knop) op een eigen queue
+# Waarom: Anders staat een handmatige scan achter honderden geplande scans.
+# De 'interactive' worker (Procfile) is gereserveerde capaciteit: alle stages
+# van een interactieve scan (scout, capture, Gemini, persist) draaien daar.
+INTERACTIVE_QUEUE = os.environ.get('INTERACTIVE_QUEUE', 'interactive')
+# Gelijk aan --concurrency van de interactive worker (voor de ETA)
+INTERACTIVE_CONCURRENCY = int(os.environ.get('INTERACTIVE_CONCURRENCY', 2))
+# ETA: mediaan van de laatste N scans met stage tijden, anders de default (sec)
+INTERACTIVE_ETA_SAMPLE = int(os.environ.get('INTERACTIVE_ETA_SAMPLE', 20))
+INTERACTIVE_SCAN_SECONDS = int(os.environ.get('INTERACTIVE_SCAN_SECONDS', 20))
+
 # Beat schedule (stored in database)
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+
+# ======================
+# SCOUT CONFIGURATION
+# ======================
+
+# Max gelijktijdige scout requests in een batch
+# Waarom: Eén crawl voor alle DUE targets, maar niet honderden requests tegelijk
+SCOUT_CONCURRENCY = int(os.environ.get('SCOUT_CONCURRENCY', 20))
+
+# Max targets per scout_batch_task
+# Waarom: Tienduizenden DUE targets niet in één task (één crawl, één worker),
+# de batches gaan als Celery group naar de scout queue
+SCOUT_BATCH_SIZE = int(os.environ.get('SCOUT_BATCH_SIZE', 200))
+
+# Extractor backend voor text/images/hash
+# 'lxml': streaming parser (snel), 'soup': BeautifulSoup (origineel)
+# Waarom configureerbaar: Beide geven dezelfde hash, 'soup' als fallback
+SCOUT_EXTRACTOR = os.environ.get('SCOUT_EXTRACTOR', 'lxml')
+
+# SimHash similarity (0-1) waaronder een wijziging naar capture + Gemini gaat
+# Waarom niet exact: Eén teken in de footer is geen screenshot + AI call waard
+# Per target te overschrijven met Target.similarity_threshold.
+# Gewijzigde prijsblokken gaan altijd door, ongeacht de similarity.
+SCOUT_SIMILARITY_THRESHOLD = float(os.environ.get('SCOUT_SIMILARITY_THRESHOLD', 0.95))
+
+# Aantal recent geanalyseerde hashes per target (Target.known_variants)
+# Waarom: A/B tests wisselen tussen dezelfde 2-3 varianten, een bekende
+# variant hergebruikt z'n analyse in plaats van capture + Gemini
+SCOUT_KNOWN_VARIANTS = int(os.environ.get('SCOUT_KNOWN_VARIANTS', 5))
+
+# ======================
+# CAPTURE CONFIGURATION
+# ======================
+
+# Browser pool (per worker process)
+# Waarom: Chromium launchen kost seconden, warme browsers hergebruiken
+CAPTURE_BROWSER_POOL_SIZE = int(os.environ.get('CAPTURE_BROWSER_POOL_SIZE', 2))
+
+# Browser recyclen na X captures of boven X MB geheugen
+# Waarom: Chromium lekt geheugen bij lang draaien
+CAPTURE_BROWSER_MAX_PAGES = int(os.environ.get('CAPTURE_BROWSER_MAX_PAGES', 50))
+CAPTURE_BROWSER_MAX_RSS_MB = int(os.environ.get('CAPTURE_BROWSER_MAX_RSS_MB', 1024))
+
+# Screenshot formaat (collector/scanner/encoding.py)
+# Waarom: Full-page PNG's zijn meerdere MB's, WebP is een fractie daarvan
+CAPTURE_SCREENSHOT_FORMAT = os.environ.get('CAPTURE_SCREENSHOT_FORMAT', 'webp')  # webp, avif, jpeg, png
+CAPTURE_SCREENSHOT_QUALITY = int(os.environ.get('CAPTURE_SCREENSHOT_QUALITY', 80))
+# Hogere pagina's: afkappen (truncate) of in delen opslaan (tile)
+CAPTURE_SCREENSHOT_MAX_HEIGHT = int(os.environ.get('CAPTURE_SCREENSHOT_MAX_HEIGHT', 16000))
+CAPTURE_SCREENSHOT_OVERFLOW = os.environ.get('CAPTURE_SCREENSHOT_OVERFLOW', 'truncate')
+
+# Thumbnails/previews voor de dashboard timeline (collector/scanner/derivatives.py)
+# Waarom: De timeline hoeft geen full-size screenshots te laden (srcset)
+SCREENSHOT_DERIVATIVE_WIDTHS = [
+    int(w) for w in os.environ.get('SCREENSHOT_DERIVATIVE_WIDTHS', '480,960').split(',') if w
+]
+SCREENSHOT_DERIVATIVE_QUALITY = int(os.environ.get('SCREENSHOT_DERIVATIVE_QUALITY', 75))
+SCREENSHOT_DERIVATIVE_DIR = os.environ.get('SCREENSHOT_DERIVATIVE_DIR', str(MEDIA_ROOT / 'derivatives'))
+
+# Visual diff vóór de Gemini analyse (collector/scanner/visual_diff.py)
+# Waarom: Een andere hash met een visueel gelijke pagina hoeft niet naar Gemini
+VISUAL_DIFF_ENABLED = os.environ.get('VISUAL_DIFF_ENABLED', 'True') == 'True'
+# Gewijzigd deel van de tegels (0-1) waarbij Gemini nog overgeslagen wordt
+# Waarom default 0: Eén gewijzigde prijs is maar één tegel, en die moet naar Gemini
+VISUAL_DIFF_THRESHOLD = float(os.environ.get('VISUAL_DIFF_THRESHOLD', 0.0))
+# Vergelijken op deze breedte, in tegels van X pixels
+# Waarom default 1920 (niet schalen): Op halve breedte valt een ander cijfer weg
+VISUAL_DIFF_WIDTH = int(os.environ.get('VISUAL_DIFF_WIDTH', 1920))
+VISUAL_DIFF_TILE = int(os.environ.get('VISUAL_DIFF_TILE', 32))
+# Grijswaarde verschil (0-255) dat nog ruis is (anti-aliasing, encoding)
+VISUAL_DIFF_PIXEL_NOISE = int(os.environ.get('VISUAL_DIFF_PIXEL_NOISE', 32))
+# Deel van de pixels van een tegel dat moet wijzigen voor een gewijzigde tegel
+# Waarom default 0: Een komma i.p.v. een punt is maar een paar pixels
+VISUAL_DIFF_TILE_FRACTION = float(os.environ.get('VISUAL_DIFF_TILE_FRACTION', 0.0))
+
+# Request filtering bij capture (collector/scanner/blocking.py)
+# Waarom: Trackers, ads, chat widgets en video maken captures traag en
+# zijn niet nodig voor de screenshot. Per target uit te zonderen (capture_allowlist).
+CAPTURE_BLOCKING_ENABLED = os.environ.get('CAPTURE_BLOCKING_ENABLED', 'True') == 'True'
+CAPTURE_BLOCK_RESOURCE_TYPES = os.environ.get(
+    'CAPTURE_BLOCK_RESOURCE_TYPES', 'media,font,websocket,eventsource,manifest,texttrack'
+).split(',')
+# Extra domeinen bovenop de ingebouwde lijst (komma gescheiden)
+CAPTURE_BLOCK_DOMAINS = [d for d in os.environ.get('CAPTURE_BLOCK_DOMAINS', '').split(',') if d]
+
+# Cookie consent per domein (collector/scanner/consent.py)
+# Opgeslagen in gedeelde storage, net als de screenshots
+CAPTURE_CONSENT_DIR = os.environ.get('CAPTURE_CONSENT_DIR', str(BASE_DIR / 'storage' / 'consent'))
+# Max wachten op een banner bij een onbekend domein / bij een bekend domein (ms)
+CAPTURE_CONSENT_TIMEOUT_MS = int(os.environ.get('CAPTURE_CONSENT_TIMEOUT_MS', 3000))
+CAPTURE_CONSENT_RECHECK_MS = int(os.environ.get('CAPTURE_CONSENT_RECHECK_MS', 500))
+# Daarna opnieuw accepteren (cookies verlopen, banner kan veranderd zijn)
+CAPTURE_CONSENT_MAX_AGE_DAYS = int(os.environ.get('CAPTURE_CONSENT_MAX_AGE_DAYS', 30))
+
+# Pagina klaar voor de screenshot (collector/scanner/readiness.py)
+# Waarom: Wachten op echte signalen (netwerk, images, DOM) i.p.v. vaste sleeps
+# Harde bovengrens voor scrollen + settelen samen (ms)
+CAPTURE_READY_MAX_MS = int(os.environ.get('CAPTURE_READY_MAX_MS', 10000))
+# Zo lang geen nieuwe requests / DOM mutaties = stil (ms)
+CAPTURE_READY_NETWORK_QUIET_MS = int(os.environ.get('CAPTURE_READY_NETWORK_QUIET_MS', 500))
+CAPTURE_READY_DOM_QUIET_MS = int(os.environ.get('CAPTURE_READY_DOM_QUIET_MS', 300))
+# Zoveel openstaande requests tellen nog als stil (long polling, beacons)
+CAPTURE_READY_MAX_INFLIGHT = int(os.environ.get('CAPTURE_READY_MAX_INFLIGHT', 2))
+# Max wachten per scroll stap op lazy loading (ms)
+CAPTURE_READY_SCROLL_STEP_MS = int(os.environ.get('CAPTURE_READY_SCROLL_STEP_MS', 1000))
+
+# ======================
+# POLITENESS CONFIGURATION
+# ======================
+
+# Token bucket per domein, gedeeld door scout en capture op alle workers
+# (collector/scanner/politeness.py). Redis weg: in-memory per process.
+POLITENESS_ENABLED = os.environ.get('POLITENESS_ENABLED', 'True') == 'True'
+POLITENESS_REDIS_URL = os.environ.get('POLITENESS_REDIS_URL', CELERY_BROKER_URL)
+
+# Default: gemiddeld 1 request/sec per domein, pieken van 3
+POLITENESS_RATE = float(os.environ.get('POLITENESS_RATE', 1.0))
+POLITENESS_BURST = float(os.environ.get('POLITENESS_BURST', 3))
+
+# Per domein afwijken (JSON), geldt ook voor subdomeinen:
+# POLITENESS_LIMITS='{"ziggo.nl": {"rate": 0.5, "burst": 1}}'
+POLITENESS_LIMITS = json.loads(os.environ.get('POLITENESS_LIMITS', '{}'))
+
+# Langer wachten dan dit: request gaat niet, URL wordt deze ronde overgeslagen
+POLITENESS_MAX_WAIT = float(os.environ.get('POLITENESS_MAX_WAIT', 30))
+
+# ======================
+# SCAN PIPELINE CONFIGURATION
+# ======================
+
+# Max targets tegelijk in de pipeline (scout → capture → Gemini → DB)
+# Waarom begrensd: Eén event loop per batch, maar niet alle screenshots
+# en Gemini calls tegelijk (capture wacht daarnaast op de browser pool)
+SCAN_PIPELINE_CONCURRENCY = int(os.environ.get('SCAN_PIPELINE_CONCURRENCY', 4))
+
+# ======================
+# SCHEDULER CONFIGURATION
+# ======================
+
+# Max targets tegelijk onderweg (gedispatcht, scan nog niet klaar), 0 = geen limiet
+# Waarom: Een piek DUE targets zou workers, browser pool en Gemini quota
+# in één keer vol zetten, de rest wacht nu bij de scheduler (oudste eerst)
+SCAN_MAX_IN_FLIGHT = int(os.environ.get('SCAN_MAX_IN_FLIGHT', 100))
+
+# Na zoveel seconden telt een gedispatchte target niet meer mee (hangende scan)
+SCAN_IN_FLIGHT_TIMEOUT = int(os.environ.get('SCAN_IN_FLIGHT_TIMEOUT', 30 * 60))
+
+# Adaptief interval (Target.adaptive_interval, zie collector/scheduler/adaptive.py)
+# Grenzen in minuten, venster voor de schatting, en welk deel van de
+# gemiddelde tijd tussen wijzigingen we als interval nemen
+ADAPTIVE_INTERVAL_MIN = int(os.environ.get('ADAPTIVE_INTERVAL_MIN', 5))
+ADAPTIVE_INTERVAL_MAX = int(os.environ.get('ADAPTIVE_INTERVAL_MAX', 24 * 60))
+ADAPTIVE_INTERVAL_WINDOW_DAYS = int(os.environ.get('ADAPTIVE_INTERVAL_WINDOW_DAYS', 14))
+ADAPTIVE_INTERVAL_FRACTION = float(os.environ.get('ADAPTIVE_INTERVAL_FRACTION', 0.25))
+
+# Daemon: DUE targets die niet in het budget pasten, opnieuw proberen na X sec
+SCHEDULER_BUDGET_RETRY = float(os.environ.get('SCHEDULER_BUDGET_RETRY', 5))
+
+# run_scheduler daemon (collector/scheduler/daemon.py)
+# Change feed: Target save/delete → Redis pub/sub → timer heap van de daemon
+SCHEDULER_REDIS_URL = os.environ.get('SCHEDULER_REDIS_URL', CELERY_BROKER_URL)
+SCHEDULER_CHANNEL = os.environ.get('SCHEDULER_CHANNEL', 'meerkat:targets')
+
+# Alles opnieuw uit de DB laden (pub/sub berichten kunnen gemist worden)
+SCHEDULER_RESYNC_SECONDS = int(os.environ.get('SCHEDULER_RESYNC_SECONDS', 300))
+
+# Max slaaptijd per iteratie, ook als de volgende deadline verder weg ligt
+SCHEDULER_MAX_SLEEP = float(os.environ.get('SCHEDULER_MAX_SLEEP', 30))
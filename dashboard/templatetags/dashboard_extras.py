@@ -11,3 +11,13 @@ def get_item(dictionary, key):
     if not dictionary:
         return None
     return dictionary.get(key)
+
+
+@register.filter
+def screenshot_srcset(scan):
+    """
+    srcset met thumbnails/previews van een scan (leeg als die er niet zijn).
+    Usage: <img srcset="{{ scan|screenshot_srcset }}" ...>
+    """
+    from collector.scanner.derivatives import srcset
+    return srcset(scan)
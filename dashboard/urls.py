@@ -17,6 +17,10 @@ urlpatterns = [
     path('api/targets/<int:target_id>/delete/', views.delete_target, name='delete_target'),
     path('api/scans/<int:scan_id>/delete/', views.delete_scan, name='delete_scan'),
     
+    # Thumbnails/previews (nginx serveert ze direct, dit maakt ontbrekende aan)
+    # Waarom onder media/: Zelfde URL als het bestand op disk (MEDIA_ROOT/derivatives)
+    path('media/derivatives/<slug:digest>-<int:width>.webp', views.screenshot_derivative, name='screenshot_derivative'),
+    
     # Help section
     path('help/', views.help_index, name='help_index'),
     path('help/getting-started/', views.help_getting_started, name='help_getting_started'),
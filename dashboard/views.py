@@ -3,15 +3,17 @@ Dashboard Views
 """
 
 from django.shortcuts import render
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.http import FileResponse, Http404, JsonResponse
+from django.views.decorators.http import require_GET, require_POST
 from django.core.cache import cache
 from shared.models import Target
+from collector.scheduler.lanes import clear_queued, mark_queued, queue_estimate, typical_scan_seconds
 
 
 # Scan progress states
 SCAN_STATES = {
     'idle': {'step': 0, 'message': 'Klaar'},
+    'queued': {'step': 0, 'message': 'In de wachtrij...'},
     'starting': {'step': 1, 'message': 'Scan starten...'},
     'scout': {'step': 2, 'message': 'Wijzigingen detecteren...'},
     'no_change': {'step': 2, 'message': 'Geen wijzigingen gevonden'},
@@ -63,6 +65,14 @@ def index(request):
         selected_target = targets.first()
         scans = selected_target.scans.filter(status='success').order_by('-scanned_at')[:20]
     
+    # Circuit breaker per domein: badge bij targets die overgeslagen worden
+    from collector.scanner.breaker import breaker_states
+    breakers = breaker_states(target.domain for target in targets)
+    for target in targets:
+        target.breaker = breakers.get(target.domain)
+    if selected_target is not None:
+        selected_target.breaker = breakers.get(selected_target.domain)
+    
     context = {
         'targets': targets,
         'selected_target': selected_target,
@@ -122,10 +132,26 @@ def trigger_scan(request, target_id):
     Fallback naar threading als Celery niet draait
     
     Manual scans use force_capture=True to skip scout check for speed
+    
+    Loopt er al een scan van deze target (scan lease), dan start er niks
+    nieuws: de response zegt 'coalesced' en de UI pollt de lopende scan.
+    
+    Waarom INTERACTIVE_QUEUE: Een handmatige scan wacht niet achter de
+    geplande scans, scan_status toont de positie in die queue.
     """
     try:
         target = Target.objects.get(id=target_id)
         
+        from collector.scanner.lease import acquire_scan_lease
+        lease = acquire_scan_lease(target_id)
+        if lease is None:
+            return JsonResponse({
+                'success': True,
+                'coalesced': True,
+                'message': f'Scan already running for {target.name}',
+                'progress': get_scan_progress(target_id)
+            })
+        
         # Probeer Celery task te starten
         # Waarom try/except: Celery kan niet draaien in development
         try:
@@ -135,10 +161,18 @@ def trigger_scan(request, target_id):
                 raise Exception("Development mode: Use threading fallback")
 
             from collector.tasks import scan_target_task
-            scan_target_task.delay(target_id)
+            mark_queued(target_id)
+            scan_target_task.apply_async(
+                (target_id,),
+                {'lease': lease, 'interactive': True},
+                queue=settings.INTERACTIVE_QUEUE
+            )
+            state = 'queued'
         except Exception:
             # Fallback naar threading als Celery niet werkt
             # Use force_capture=True to skip scout check (faster for manual scans)
+            clear_queued(target_id)
+            state = 'starting'
             import threading
             from collector.scanner.full_scan import perform_full_scan
             
@@ -146,7 +180,7 @@ def trigger_scan(request, target_id):
                 try:
                     set_scan_progress(target_id, 'starting')
                     # Use force_capture=False to check for changes first (saves resources)
-                    perform_full_scan(target_id, force_capture=False)
+                    perform_full_scan(target_id, force_capture=False, lease=lease)
                     set_scan_progress(target_id, 'complete')
                 except Exception as e:
                     set_scan_progress(target_id, 'failed', str(e))
@@ -156,12 +190,15 @@ def trigger_scan(request, target_id):
             thread.start()
         
         # Set initial progress
-        set_scan_progress(target_id, 'starting')
+        set_scan_progress(target_id, state)
         
+        estimate = queue_estimate(target_id)
+        seconds = round(estimate.get('estimated_wait', 0) + typical_scan_seconds())
         return JsonResponse({
             'success': True,
             'message': f'Scan started for {target.name}',
-            'estimated_time': '~15-20 seconds'
+            'estimated_time': f'~{seconds} seconds',
+            **estimate
         })
         
     except Target.DoesNotExist:
@@ -177,9 +214,15 @@ def trigger_scan(request, target_id):
 
 
 def scan_status(request, target_id):
-    """Get current scan progress for a target"""
+    """
+    Get current scan progress for a target
+    
+    Wacht er een interactieve scan in de queue: ook queue_position,
+    estimated_start en estimated_wait (zie collector/scheduler/lanes.py).
+    """
     progress = get_scan_progress(target_id)
     progress['target_id'] = target_id
+    progress.update(queue_estimate(target_id))
     return JsonResponse(progress)
 
 
@@ -219,16 +262,20 @@ def create_target(request):
         )
         
         # Start eerste scan automatisch via Celery
+        # Waarom de lease hier al: Een nieuwe target is meteen DUE, de
+        # scheduler mag er niet nog een scan naast starten
+        from collector.scanner.lease import acquire_scan_lease
+        lease = acquire_scan_lease(target.id)
         try:
             from collector.tasks import scan_target_task
-            scan_target_task.delay(target.id)
+            scan_target_task.delay(target.id, lease=lease)
         except Exception:
             # Fallback naar threading
             import threading
             from collector.scanner.full_scan import perform_full_scan
             
             def run_scan():
-                perform_full_scan(target.id)
+                perform_full_scan(target.id, lease=lease)
             
             thread = threading.Thread(target=run_scan)
             thread.daemon = True
@@ -269,6 +316,35 @@ def delete_target(request, target_id):
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 
+@require_GET
+def screenshot_derivative(request, digest, width):
+    """
+    Thumbnail/preview van een screenshot (collector/scanner/derivatives.py).
+    
+    Normaal serveert nginx deze bestanden direct van disk. Hier komen we
+    alleen als het bestand er (nog) niet is: dan maken we het alsnog.
+    
+    Waarom immutable: De naam is de content hash, deze URL verandert nooit van inhoud.
+    """
+    from django.conf import settings
+    from shared.models import Scan
+    from collector.scanner.derivatives import derivative_path, make_derivatives, screenshot_file
+    
+    if width not in settings.SCREENSHOT_DERIVATIVE_WIDTHS:
+        raise Http404('Onbekende breedte')
+    
+    path = derivative_path(digest, width)
+    if not path.exists():
+        scan = Scan.objects.filter(screenshot_digest=digest).exclude(screenshot_path='').first()
+        if scan is None or not screenshot_file(scan.screenshot_path).exists():
+            raise Http404('Screenshot niet gevonden')
+        make_derivatives(screenshot_file(scan.screenshot_path), digest=digest, widths=[width])
+    
+    response = FileResponse(open(path, 'rb'), content_type='image/webp')
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
 @require_POST
 def delete_scan(request, scan_id):
     """Delete individual scan and its screenshot"""
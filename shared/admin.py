@@ -3,7 +3,7 @@ Django Admin configuratie voor Meerkat Intelligence
 """
 
 from django.contrib import admin
-from .models import Target, Scan
+from .models import DomainHealth, Target, Scan
 
 
 @admin.register(Target)
@@ -17,21 +17,46 @@ class TargetAdmin(admin.ModelAdmin):
         'interval',
         'status',
         'last_scan_at',
+        'next_scan_at',
         'created_at'
     ]
     list_filter = ['status', 'interval', 'created_at']
     search_fields = ['name', 'url']
-    readonly_fields = ['created_at', 'updated_at', 'last_hash', 'last_scan_at']
+    readonly_fields = [
+        'created_at',
+        'updated_at',
+        'last_hash',
+        'last_scan_at',
+        'next_scan_at',
+        'http_etag',
+        'http_last_modified',
+        'body_digest',
+        'last_simhash',
+        'known_variants',
+        'effective_interval',
+        'scan_lease_until',
+        'scan_requested_at'
+    ]
     
     fieldsets = [
         ('Basis Informatie', {
             'fields': ['name', 'url']
         }),
         ('Scan Configuratie', {
-            'fields': ['interval', 'status']
+            'fields': ['interval', 'adaptive_interval', 'effective_interval', 'status', 'similarity_threshold']
+        }),
+        ('Capture', {
+            'fields': ['capture_allowlist'],
+            'description': 'Trackers, ads, video en fonts worden bij capture geblokkeerd, behalve wat hier staat',
+            'classes': ['collapse']
+        }),
+        ('Noise Filters', {
+            'fields': ['noise_rules'],
+            'description': 'Test nieuwe rules eerst met: python manage.py replay_noise_rules --target &lt;id&gt; --rules \'{...}\'',
+            'classes': ['collapse']
         }),
         ('Scan State', {
-            'fields': ['last_hash', 'last_scan_at'],
+            'fields': ['last_hash', 'last_simhash', 'last_scan_at', 'next_scan_at', 'scan_lease_until', 'scan_requested_at', 'http_etag', 'http_last_modified', 'body_digest', 'known_variants'],
             'classes': ['collapse']
         }),
         ('Metadata', {
@@ -66,9 +91,16 @@ class ScanAdmin(admin.ModelAdmin):
     readonly_fields = [
         'target',
         'screenshot_path',
+        'screenshot_digest',
+        'visual_hash',
+        'visual_diff',
         'content_hash',
+        'simhash',
         'scanned_at',
-        'analysis_json_formatted'
+        'stage_seconds',
+        'capture_stats',
+        'analysis_json_formatted',
+        'changed_sections_formatted'
     ]
     
     fieldsets = [
@@ -79,16 +111,26 @@ class ScanAdmin(admin.ModelAdmin):
             'fields': [
                 'status',
                 'content_hash',
+                'simhash',
                 'screenshot_path',
+                'screenshot_digest',
                 'error_message'
             ]
         }),
+        ('Visual Diff', {
+            'fields': ['visual_hash', 'visual_diff'],
+            'classes': ['collapse']
+        }),
         ('Gemini Analyse', {
             'fields': ['analysis_json_formatted'],
             'classes': ['collapse']
         }),
+        ('Secties', {
+            'fields': ['changed_sections_formatted'],
+            'classes': ['collapse']
+        }),
         ('Metadata', {
-            'fields': ['scanned_at']
+            'fields': ['scanned_at', 'stage_seconds', 'capture_stats']
         }),
     ]
     
@@ -100,8 +142,36 @@ class ScanAdmin(admin.ModelAdmin):
         return 'Geen analyse beschikbaar'
     analysis_json_formatted.short_description = 'Analyse (JSON)'
     
+    def changed_sections_formatted(self, obj):
+        """Gewijzigde secties, één per regel"""
+        if obj.changed_sections:
+            return '\n'.join(f"{s['change']}: {s['key']}" for s in obj.changed_sections)
+        return 'Geen sectie vergelijking beschikbaar'
+    changed_sections_formatted.short_description = 'Gewijzigde secties'
+    
     def change_detected(self, obj):
         """Was dit een wijziging?"""
         return obj.is_change_detected()
     change_detected.boolean = True
     change_detected.short_description = 'Wijziging?'
+
+
+@admin.register(DomainHealth)
+class DomainHealthAdmin(admin.ModelAdmin):
+    """
+    Circuit breaker per domein (zie collector/scanner/breaker.py)
+    
+    Reset: Site is weer in orde, niet wachten op de volgende proefscan.
+    """
+    list_display = ['domain', 'state', 'consecutive_failures', 'retry_at', 'last_failure_at']
+    list_filter = ['state']
+    search_fields = ['domain', 'last_error']
+    readonly_fields = ['domain', 'state', 'consecutive_failures', 'retry_at', 'last_error', 'last_failure_at', 'updated_at']
+    actions = ['reset_breaker']
+    
+    @admin.action(description='Breaker resetten (weer scannen)')
+    def reset_breaker(self, request, queryset):
+        from collector.scanner.breaker import reset_breaker
+        for health in queryset:
+            reset_breaker(health.domain)
+        self.message_user(request, f"{queryset.count()} domein(en) gereset")
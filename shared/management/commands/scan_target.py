@@ -8,7 +8,7 @@ Usage:
 
 from django.core.management.base import BaseCommand
 from shared.models import Target
-from collector.scanner.full_scan import perform_full_scan
+from collector.scanner.full_scan import perform_full_scan, perform_full_scans, scout_targets
 
 
 class Command(BaseCommand):
@@ -29,10 +29,13 @@ class Command(BaseCommand):
     
     def handle(self, *args, **options):
         if options['all']:
-            targets = Target.objects.filter(status='active')
-            self.stdout.write(f"🔍 Scanning {targets.count()} active targets...\n")
-            for target in targets:
-                self.scan_target(target.id)
+            target_ids = list(Target.objects.filter(status='active').values_list('id', flat=True))
+            self.stdout.write(f"🔍 Scanning {len(target_ids)} active targets...\n")
+            
+            # Eerst alle targets in één batch scouten,
+            # daarna alleen de gewijzigde targets capturen (samen in één event loop)
+            summary = scout_targets(target_ids)
+            perform_full_scans(summary['changed'])
         elif options['target_id']:
             self.scan_target(options['target_id'])
         else:
@@ -40,9 +43,9 @@ class Command(BaseCommand):
                 self.style.ERROR('❌ Geef een target_id of gebruik --all')
             )
     
-    def scan_target(self, target_id):
+    def scan_target(self, target_id, scout_result=None):
         """Scan een enkele target"""
-        result = perform_full_scan(target_id)
+        result = perform_full_scan(target_id, scout_result=scout_result)
         
         # Output is al geprint door perform_full_scan
         # Hier hoeven we niks extra te doen
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0002_alert'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='target',
+            name='body_digest',
+            field=models.CharField(blank=True, help_text='MD5 van de ruwe HTML body (skip parsing als die gelijk is)', max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='target',
+            name='http_etag',
+            field=models.CharField(blank=True, help_text='ETag header van de laatste scout response', max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name='target',
+            name='http_last_modified',
+            field=models.CharField(blank=True, help_text='Last-Modified header van de laatste scout response', max_length=100, null=True),
+        ),
+    ]
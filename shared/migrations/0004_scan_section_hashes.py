@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0003_target_conditional_get'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scan',
+            name='changed_sections',
+            field=models.JSONField(blank=True, help_text="Gewijzigde secties t.o.v. de vorige scan: [{'key', 'change', 'preview'}]", null=True),
+        ),
+        migrations.AddField(
+            model_name='scan',
+            name='section_hashes',
+            field=models.JSONField(blank=True, help_text="{'root': Merkle root, 'sections': [{'key', 'hash', 'preview'}]}", null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0004_scan_section_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scan',
+            name='page_images',
+            field=models.JSONField(blank=True, help_text='Image URLs van de pagina op het moment van de scan', null=True),
+        ),
+        migrations.AddField(
+            model_name='scan',
+            name='page_text',
+            field=models.TextField(blank=True, help_text='Zichtbare tekst van de pagina op het moment van de scan', null=True),
+        ),
+        migrations.AddField(
+            model_name='target',
+            name='noise_rules',
+            field=models.JSONField(blank=True, default=dict, help_text='Filters vóór het hashen: drop_selectors, text_patterns, image_strip_query, image_sort'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:17
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0005_noise_rules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scan',
+            name='simhash',
+            field=models.CharField(blank=True, help_text='SimHash fingerprint van tekst + images (collector/scanner/fingerprint.py)', max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='target',
+            name='last_simhash',
+            field=models.CharField(blank=True, help_text='SimHash van de laatst geanalyseerde pagina (voor similarity)', max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='target',
+            name='similarity_threshold',
+            field=models.FloatField(blank=True, help_text='SimHash similarity (0-1) waaronder we capturen. Leeg = SCOUT_SIMILARITY_THRESHOLD', null=True, validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(1.0)]),
+        ),
+    ]
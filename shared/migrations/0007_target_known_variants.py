@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0006_simhash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='target',
+            name='known_variants',
+            field=models.JSONField(blank=True, default=list, help_text="[{'hash', 'simhash', 'scan_id', 'seen_at'}] - bekende varianten met hun Scan"),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:26
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_next_scan_at(apps, schema_editor):
+    # Bestaande targets: last_scan_at + interval (nog nooit gescand = nu DUE)
+    Target = apps.get_model('shared', 'Target')
+    now = timezone.now()
+    for target in Target.objects.all():
+        if target.last_scan_at:
+            target.next_scan_at = target.last_scan_at + timedelta(minutes=target.interval)
+        else:
+            target.next_scan_at = now
+        target.save(update_fields=['next_scan_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0007_target_known_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='target',
+            name='next_scan_at',
+            field=models.DateTimeField(blank=True, help_text='Wanneer is de volgende scan gepland? (last_scan_at + interval)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='target',
+            index=models.Index(fields=['status', 'next_scan_at'], name='shared_targ_status_ec6a77_idx'),
+        ),
+        migrations.RunPython(fill_next_scan_at, migrations.RunPython.noop),
+    ]
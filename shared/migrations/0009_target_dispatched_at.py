@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0008_target_next_scan_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='target',
+            name='dispatched_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Door de scheduler naar de scout queue gestuurd, scan nog niet klaar', null=True),
+        ),
+        migrations.AlterField(
+            model_name='target',
+            name='next_scan_at',
+            field=models.DateTimeField(blank=True, help_text='Wanneer is de volgende scan gepland? (grid slot na last_scan_at)', null=True),
+        ),
+    ]
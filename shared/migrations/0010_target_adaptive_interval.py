@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0009_target_dispatched_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='target',
+            name='adaptive_interval',
+            field=models.BooleanField(default=False, help_text='Interval aanpassen aan hoe vaak de pagina verandert (binnen ADAPTIVE_INTERVAL_MIN/MAX)'),
+        ),
+        migrations.AddField(
+            model_name='target',
+            name='effective_interval',
+            field=models.IntegerField(blank=True, help_text='Berekend interval in minuten (alleen bij adaptive_interval, leeg = interval)', null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0010_target_adaptive_interval'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='target',
+            name='scan_lease_token',
+            field=models.CharField(blank=True, help_text='Token van de lopende scan', max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='target',
+            name='scan_lease_until',
+            field=models.DateTimeField(blank=True, help_text='Lease verloopt (daarna mag een nieuwe scan)', null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0011_target_scan_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scan',
+            name='stage_seconds',
+            field=models.JSONField(blank=True, help_text='Duur van capture en analyse (sec)', null=True),
+        ),
+        migrations.AddField(
+            model_name='target',
+            name='scan_requested_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Interactieve scan wacht in de queue sinds (zie collector/scheduler/lanes.py)', null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0012_interactive_lane'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DomainHealth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=255, unique=True)),
+                ('state', models.CharField(choices=[('closed', 'Gezond'), ('open', 'Open (overgeslagen)'), ('half_open', 'Proefscan')], default='closed', help_text='closed = scannen, open = overslaan, half_open = één proefscan', max_length=10)),
+                ('consecutive_failures', models.PositiveIntegerField(default=0, help_text='Mislukte scans op rij (scout of capture)')),
+                ('retry_at', models.DateTimeField(blank=True, help_text='Open: eerstvolgende proefscan. Half open: deadline van de proefscan', null=True)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('last_failure_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Domain health',
+                'verbose_name_plural': 'Domain health',
+                'ordering': ['domain'],
+            },
+        ),
+    ]
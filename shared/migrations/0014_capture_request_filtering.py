@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0013_domain_health'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scan',
+            name='capture_stats',
+            field=models.JSONField(blank=True, help_text='Geladen en geblokkeerde requests van de capture', null=True),
+        ),
+        migrations.AddField(
+            model_name='target',
+            name='capture_allowlist',
+            field=models.JSONField(blank=True, default=list, help_text='Niet blokkeren bij capture: domeinen en/of resource types, bijv. ["font", "fonts.example.com"]'),
+        ),
+    ]
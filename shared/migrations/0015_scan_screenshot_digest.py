@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0014_capture_request_filtering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scan',
+            name='screenshot_digest',
+            field=models.CharField(blank=True, db_index=True, help_text='Content hash van het screenshot (naam van de thumbnails)', max_length=16),
+        ),
+    ]
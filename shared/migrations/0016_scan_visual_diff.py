@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0015_scan_screenshot_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scan',
+            name='visual_diff',
+            field=models.JSONField(blank=True, help_text="Gewijzigde regio's t.o.v. het vorige screenshot", null=True),
+        ),
+        migrations.AddField(
+            model_name='scan',
+            name='visual_hash',
+            field=models.CharField(blank=True, help_text='Perceptuele hash van het screenshot (dHash per tegel)', max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='scan',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Bezig'), ('success', 'Succesvol'), ('unchanged', 'Visueel gelijk'), ('failed', 'Mislukt')], default='pending', help_text='Status van deze scan', max_length=10),
+        ),
+    ]
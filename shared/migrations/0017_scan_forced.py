@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0016_scan_visual_diff'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scan',
+            name='forced',
+            field=models.BooleanField(default=False, help_text='Handmatig gestart zonder scout check'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0017_scan_forced'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scan',
+            name='visual_hash',
+            field=models.CharField(blank=True, help_text='MD5 van de grijze pixels van het screenshot (zie visual_diff.py)', max_length=32),
+        ),
+    ]
@@ -5,6 +5,7 @@ Target: Websites die we monitoren (competitors)
 Scan: Individuele scan resultaten met screenshots en analyses
 """
 
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -43,6 +44,18 @@ class Target(models.Model):
         help_text="Hoe vaak scannen we deze target?"
     )
     
+    # Adaptief interval (zie collector/scheduler/adaptive.py)
+    # Waarom optioneel: Sommige targets willen we gewoon op een vast interval
+    adaptive_interval = models.BooleanField(
+        default=False,
+        help_text="Interval aanpassen aan hoe vaak de pagina verandert (binnen ADAPTIVE_INTERVAL_MIN/MAX)"
+    )
+    effective_interval = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="Berekend interval in minuten (alleen bij adaptive_interval, leeg = interval)"
+    )
+    
     STATUS_CHOICES = [
         ('active', 'Actief'),
         ('paused', 'Gepauzeerd'),
@@ -54,6 +67,22 @@ class Target(models.Model):
         help_text="Is deze target actief?"
     )
     
+    # Noise rules (zie collector/scanner/noise.py)
+    # Waarom per target: Elke site heeft z'n eigen timestamps / tellers / carrousels
+    noise_rules = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Filters vóór het hashen: drop_selectors, text_patterns, image_strip_query, image_sort"
+    )
+    
+    # Waarom per target: Drukke pagina's mogen meer afwijken dan een rustige prijspagina
+    similarity_threshold = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0.0), MaxValueValidator(1.0)],
+        help_text="SimHash similarity (0-1) waaronder we capturen. Leeg = SCOUT_SIMILARITY_THRESHOLD"
+    )
+    
     # Scan state
     last_hash = models.CharField(
         max_length=32,
@@ -66,6 +95,86 @@ class Target(models.Model):
         blank=True,
         help_text="Wanneer was de laatste scan?"
     )
+    # Waarom opgeslagen (en geïndexeerd): De scheduler selecteert DUE targets
+    # met één range query i.p.v. alle targets in Python door te rekenen
+    # Wordt bijgewerkt in save() (zie compute_next_scan_at)
+    next_scan_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Wanneer is de volgende scan gepland? (grid slot na last_scan_at)"
+    )
+    # Waarom: SCAN_MAX_IN_FLIGHT telt targets die gedispatcht zijn maar nog
+    # geen last_scan_at daarna hebben. Wordt in save() gewist als de scan klaar is.
+    dispatched_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="Door de scheduler naar de scout queue gestuurd, scan nog niet klaar"
+    )
+    last_simhash = models.CharField(
+        max_length=16,
+        null=True,
+        blank=True,
+        help_text="SimHash van de laatst geanalyseerde pagina (voor similarity)"
+    )
+    
+    # Recent geanalyseerde varianten, nieuwste eerst (max SCOUT_KNOWN_VARIANTS)
+    # Waarom: A/B tests wisselen tussen dezelfde hashes, die zijn al geanalyseerd
+    known_variants = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="[{'hash', 'simhash', 'scan_id', 'seen_at'}] - bekende varianten met hun Scan"
+    )
+    
+    # Request filtering bij capture (zie collector/scanner/blocking.py)
+    # Waarom per target: Sommige sites renderen niet goed zonder hun fonts of een CDN
+    capture_allowlist = models.JSONField(
+        default=list,
+        blank=True,
+        help_text='Niet blokkeren bij capture: domeinen en/of resource types, bijv. ["font", "fonts.example.com"]'
+    )
+    
+    # Scan lease (zie collector/scanner/lease.py)
+    # Waarom: Maximaal één scan tegelijk per target (dashboard, scheduler, retries)
+    scan_lease_token = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        help_text="Token van de lopende scan"
+    )
+    scan_lease_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Lease verloopt (daarna mag een nieuwe scan)"
+    )
+    scan_requested_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="Interactieve scan wacht in de queue sinds (zie collector/scheduler/lanes.py)"
+    )
+    
+    # Conditional GET (scout)
+    # Waarom: 304 Not Modified = geen download, geen parsing, geen hashing
+    # Deze velden horen altijd bij de response van last_hash
+    http_etag = models.CharField(
+        max_length=500,
+        null=True,
+        blank=True,
+        help_text="ETag header van de laatste scout response"
+    )
+    http_last_modified = models.CharField(
+        max_length=100,
+        null=True,
+        blank=True,
+        help_text="Last-Modified header van de laatste scout response"
+    )
+    body_digest = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        help_text="MD5 van de ruwe HTML body (skip parsing als die gelijk is)"
+    )
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -75,10 +184,70 @@ class Target(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Target'
         verbose_name_plural = 'Targets'
+        indexes = [
+            # Scheduler: status='active' AND next_scan_at <= now
+            models.Index(fields=['status', 'next_scan_at']),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.url})"
     
+    # Alleen via collector/scanner/lease.py en collector/scheduler/lanes.py (QuerySet.update)
+    LEASE_FIELDS = ('scan_lease_token', 'scan_lease_until', 'scan_requested_at')
+    
+    def save(self, *args, **kwargs):
+        """
+        next_scan_at + dispatched_at bijwerken bij elke save.
+        
+        Waarom hier: Scan afgerond (last_scan_at) en interval gewijzigd
+        gaan allebei via save(), zo loopt de kolom nooit achter.
+        Let op: QuerySet.update() slaat dit over.
+        
+        Een volledige save schrijft de scan lease niet: die wordt alleen via
+        collector/scanner/lease.py gezet, een target die vóór de lease geladen
+        is zou hem anders overschrijven.
+        """
+        self.next_scan_at = self.compute_next_scan_at()
+        if self.dispatched_at and self.last_scan_at and self.last_scan_at >= self.dispatched_at:
+            # Scan klaar: telt niet meer mee voor SCAN_MAX_IN_FLIGHT
+            self.dispatched_at = None
+        if kwargs.get('update_fields') is None and not self._state.adding and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.LEASE_FIELDS
+            ]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'last_scan_at', 'interval', 'effective_interval', 'adaptive_interval'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'next_scan_at', 'dispatched_at'}
+        super().save(*args, **kwargs)
+    
+    def clean(self):
+        """Ongeldige noise rules (selector/regex) en allowlist al in de admin afvangen"""
+        from django.core.exceptions import ValidationError
+        from collector.scanner.noise import build_noise_rules
+        
+        try:
+            build_noise_rules(self.noise_rules)
+        except ValueError as e:
+            raise ValidationError({'noise_rules': str(e)})
+        
+        allowlist = self.capture_allowlist or []
+        if not isinstance(allowlist, list) or not all(isinstance(entry, str) for entry in allowlist):
+            raise ValidationError({'capture_allowlist': 'Lijst van domeinen en/of resource types verwacht'})
+    
+    @property
+    def domain(self) -> str:
+        """Domein voor de circuit breaker (zonder www.)"""
+        from collector.scanner.breaker import domain_of
+        return domain_of(self.url)
+    
+    @property
+    def scan_interval(self) -> int:
+        """Interval in minuten waarmee gepland wordt (adaptief of vast)"""
+        if self.adaptive_interval and self.effective_interval:
+            return self.effective_interval
+        return self.interval
+    
     def should_scan(self):
         """
         Moet deze target nu gescand worden?
@@ -92,17 +261,33 @@ class Target(models.Model):
         
         # Check of interval verstreken is
         time_since_scan = timezone.now() - self.last_scan_at
-        interval_seconds = self.interval * 60
+        interval_seconds = self.scan_interval * 60
         
         return time_since_scan.total_seconds() >= interval_seconds
     
-    def next_scan_at(self):
-        """Wanneer is de volgende scan gepland?"""
+    def compute_next_scan_at(self):
+        """
+        Wanneer is de volgende scan gepland?
+        
+        Het eerste slot na last_scan_at op het grid van deze target
+        (vaste fase uit het id, zie collector/scheduler/phase.py).
+        Waarom: Targets die samen aangemaakt zijn vallen anders elke
+        interval allemaal in dezelfde minuut.
+        
+        Nog nooit gescand: de oude next_scan_at (of nu), dan blijft hij DUE.
+        Nog geen id (nieuwe target): last_scan_at + interval, de eerste
+        scan zet hem daarna op z'n grid.
+        """
         if not self.last_scan_at:
-            return timezone.now()
+            return self.next_scan_at or timezone.now()
         
-        from datetime import timedelta
-        return self.last_scan_at + timedelta(minutes=self.interval)
+        from datetime import datetime, timedelta
+        if self.pk is None:
+            return self.last_scan_at + timedelta(minutes=self.scan_interval)
+        
+        from collector.scheduler.phase import next_slot
+        slot = next_slot(self.last_scan_at.timestamp(), self.pk, self.scan_interval * 60)
+        return datetime.fromtimestamp(slot, tz=self.last_scan_at.tzinfo)
 
 
 class Scan(models.Model):
@@ -124,13 +309,54 @@ class Scan(models.Model):
         max_length=500,
         help_text="Pad naar screenshot bestand (bijv. '/storage/screenshots/abc123.png')"
     )
+    # Waarom: Thumbnails/previews heten naar de inhoud (collector/scanner/derivatives.py),
+    # zo kunnen browser en nginx ze oneindig cachen
+    screenshot_digest = models.CharField(
+        max_length=16,
+        blank=True,
+        db_index=True,
+        help_text="Content hash van het screenshot (naam van de thumbnails)"
+    )
     
     # Content hash voor change detection
     content_hash = models.CharField(
         max_length=32,
         help_text="MD5 hash van pagina content (tekst + image URLs)"
     )
-    
+    simhash = models.CharField(
+        max_length=16,
+        null=True,
+        blank=True,
+        help_text="SimHash fingerprint van tekst + images (collector/scanner/fingerprint.py)"
+    )
+
+    # Hash per DOM sectie + Merkle root (zie collector/scanner/sections.py)
+    # Waarom: Zonder screenshot kunnen we zien WAAR de pagina veranderd is
+    section_hashes = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="{'root': Merkle root, 'sections': [{'key', 'hash', 'preview'}]}"
+    )
+
+    changed_sections = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Gewijzigde secties t.o.v. de vorige scan: [{'key', 'change', 'preview'}]"
+    )
+
+    # Pagina tekst + images zoals scout ze zag (vóór text/image noise rules)
+    # Waarom bewaren: replay_noise_rules kan nieuwe rules testen op oude scans
+    page_text = models.TextField(
+        null=True,
+        blank=True,
+        help_text="Zichtbare tekst van de pagina op het moment van de scan"
+    )
+    page_images = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Image URLs van de pagina op het moment van de scan"
+    )
+
     # Gemini AI analyse (als JSON)
     analysis_json = models.JSONField(
         null=True,
@@ -138,10 +364,48 @@ class Scan(models.Model):
         help_text="Gestructureerde analyse van Gemini (type, title, summary, etc.)"
     )
     
+    # Requests bij capture: {'requests', 'requests_blocked', 'blocked_by_reason', 'bytes_loaded', ...}
+    # Waarom: Besparing van request filtering zichtbaar maken (manage.py capture_stats)
+    capture_stats = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Geladen en geblokkeerde requests van de capture"
+    )
+    
+    # Visuele vergelijking met het vorige geanalyseerde screenshot (collector/scanner/visual_diff.py)
+    # {'baseline_scan_id', 'identical', 'change', 'tiles_changed', 'tiles', 'regions': [[x, y, w, h], ...]}
+    # Waarom: Gemini overslaan als de pagina er hetzelfde uitziet
+    visual_hash = models.CharField(
+        max_length=32,
+        blank=True,
+        help_text="MD5 van de grijze pixels van het screenshot (zie visual_diff.py)"
+    )
+    visual_diff = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Gewijzigde regio's t.o.v. het vorige screenshot"
+    )
+    
+    # Handmatige scan zonder scout (force_capture, "Scan nu")
+    # Waarom: Telt niet als wijziging voor het adaptieve interval (collector/scheduler/adaptive.py)
+    forced = models.BooleanField(
+        default=False,
+        help_text="Handmatig gestart zonder scout check"
+    )
+    
+    # Duur per stage in seconden: {'capture': 4.2, 'analysis': 9.8}
+    # Waarom: ETA van interactieve scans (zie collector/scheduler/lanes.py)
+    stage_seconds = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Duur van capture en analyse (sec)"
+    )
+    
     # Status tracking
     STATUS_CHOICES = [
         ('pending', 'Bezig'),
         ('success', 'Succesvol'),
+        ('unchanged', 'Visueel gelijk'),
         ('failed', 'Mislukt'),
     ]
     status = models.CharField(
@@ -229,3 +493,45 @@ class Alert(models.Model):
     def __str__(self):
         return f"Alert voor {self.scan} aan {self.recipient}"
 
+
+
+class DomainHealth(models.Model):
+    """
+    Circuit breaker per domein (zie collector/scanner/breaker.py).
+    
+    Waarom per domein: Een site die plat ligt of ons blokkeert doet dat
+    voor al zijn targets. Met de breaker open kost zo'n domein geen
+    scout requests en geen browser slots meer, tot de proefscan slaagt.
+    """
+    STATE_CHOICES = [
+        ('closed', 'Gezond'),
+        ('open', 'Open (overgeslagen)'),
+        ('half_open', 'Proefscan'),
+    ]
+    domain = models.CharField(max_length=255, unique=True)
+    state = models.CharField(
+        max_length=10,
+        choices=STATE_CHOICES,
+        default='closed',
+        help_text="closed = scannen, open = overslaan, half_open = één proefscan"
+    )
+    consecutive_failures = models.PositiveIntegerField(
+        default=0,
+        help_text="Mislukte scans op rij (scout of capture)"
+    )
+    retry_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Open: eerstvolgende proefscan. Half open: deadline van de proefscan"
+    )
+    last_error = models.TextField(null=True, blank=True)
+    last_failure_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['domain']
+        verbose_name = 'Domain health'
+        verbose_name_plural = 'Domain health'
+    
+    def __str__(self):
+        return f"{self.domain} ({self.get_state_display()})"